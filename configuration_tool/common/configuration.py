@@ -11,7 +11,7 @@ from configuration_tool.common.tosca_reserved_keys import CLOUNI
 
 from configuration_tool.common import utils
 
-import logging, os, json
+import logging, os, json, copy, threading
 
 CONFIG_FILE_EXT = '.cfg'
 
@@ -20,6 +20,43 @@ PARAMS_SEPARATOR = '\n'
 PARAM_KEY_VALUE_SEPARATOR = '='
 PARAM_LIST_SEPARATOR = ','
 
+# NOTE: configuration files parsed once per process in format {filename: ParsedConfiguration}
+_configuration_registry = {}
+_configuration_registry_lock = threading.Lock()
+
+
+class ParsedConfiguration(object):
+    """
+    Parsed configuration file shared by all Configuration objects with the same file,
+    post-processed sections are cached here too
+    """
+
+    def __init__(self, filename, mtime):
+        self.filename = filename
+        self.mtime = mtime
+        self.config = configparser.ConfigParser()
+        self.config.read(filename)
+        self.sections = {}
+
+
+def get_parsed_configuration(filename):
+    """
+    Get parsed configuration file from registry, file is parsed again only if its mtime is changed
+    :param filename: absolute path to configuration file
+    :return: ParsedConfiguration
+    """
+    mtime = os.path.getmtime(filename)
+    parsed = _configuration_registry.get(filename)
+    if parsed is not None and parsed.mtime == mtime:
+        return parsed
+    with _configuration_registry_lock:
+        parsed = _configuration_registry.get(filename)
+        if parsed is None or parsed.mtime != mtime:
+            logging.debug("Configuration file \'%s\' is parsed" % filename)
+            parsed = ParsedConfiguration(filename, mtime)
+            _configuration_registry[filename] = parsed
+    return parsed
+
 
 class Configuration:
     MAIN_SECTION = 'main'
@@ -58,9 +95,9 @@ class Configuration:
 
         self.config_directory = os.path.dirname(self.config_filename)
 
-        self.config = configparser.ConfigParser()
-
-        self.config.read(self.config_filename)
+        self.parsed_config = get_parsed_configuration(self.config_filename)
+        # NOTE: config object is shared between instances, it must not be changed
+        self.config = self.parsed_config.config
 
         if not self.MAIN_SECTION in self.config.sections():
             logging.error("Main section is missing in configuration file")
@@ -81,6 +118,12 @@ class Configuration:
         return r
 
     def get_section(self, sec):
+        sections = self.parsed_config.sections
+        if sec not in sections:
+            sections[sec] = self._parse_section(sec)
+        return copy.deepcopy(sections[sec])
+
+    def _parse_section(self, sec):
         r_sec_config = None
         if sec in self.config.sections():
             r_sec_config = dict(self.config[sec])
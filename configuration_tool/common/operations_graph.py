@@ -0,0 +1,276 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from configuration_tool.common import utils
+
+DURATIONS_FILENAME = 'operation_durations.json'
+DEFAULT_OPERATION_WEIGHT = 1.0
+# NOTE: weight of the last duration in the moving average
+DURATION_SMOOTHING = 0.3
+
+
+def get_successors(operations_graph):
+    """
+    Reverse the graph of dependencies
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :return: dict in format {operation: list of operations which depend on it}, contains all operations of the graph
+    """
+    successors = {}
+    for operation, dependencies in operations_graph.items():
+        successors.setdefault(operation, [])
+        for dependency in dependencies:
+            successors.setdefault(dependency, []).append(operation)
+    return successors
+
+
+def get_critical_path_lengths(operations_graph, get_weight):
+    """
+    Calculate length of the longest path from every operation to the end of the graph, including operation itself
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :param get_weight: function which returns weight of the operation
+    :return: dict in format {operation: length}
+    """
+    successors = get_successors(operations_graph)
+    lengths = {}
+    for root in successors:
+        if root in lengths:
+            continue
+        # NOTE: iterative depth-first search, chains of operations may be longer than the recursion limit
+        stack = [(root, False)]
+        while stack:
+            operation, expanded = stack.pop()
+            if operation in lengths:
+                continue
+            if expanded:
+                lengths[operation] = get_weight(operation) + max(
+                    (lengths[s] for s in successors[operation]), default=0)
+                continue
+            stack.append((operation, True))
+            for successor in successors[operation]:
+                if successor not in lengths:
+                    stack.append((successor, False))
+    return lengths
+
+
+def get_graph_levels(operations_graph):
+    """
+    Calculate level of every operation: number of operations on the longest chain of dependencies ending with it
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :return: dict in format {operation: level}, operations without dependencies have level 1
+    """
+    successors = get_successors(operations_graph)
+    dependencies_count = {operation: 0 for operation in successors}
+    for operation, operation_successors in successors.items():
+        for successor in operation_successors:
+            dependencies_count[successor] += 1
+    levels = {}
+    ready = [operation for operation, count in dependencies_count.items() if count == 0]
+    for operation in ready:
+        levels[operation] = 1
+    while ready:
+        operation = ready.pop()
+        for successor in successors[operation]:
+            levels[successor] = max(levels.get(successor, 0), levels[operation] + 1)
+            dependencies_count[successor] -= 1
+            if dependencies_count[successor] == 0:
+                ready.append(successor)
+    if len(levels) < len(successors) or any(dependencies_count.values()):
+        logging.error("Operations graph contains cycle of dependencies")
+        raise Exception("Operations graph contains cycle of dependencies")
+    return levels
+
+
+def get_critical_path(operations_graph, get_weight):
+    """
+    Find the longest path of the graph by sum of weights of operations
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :param get_weight: function which returns weight of the operation
+    :return: tuple (list of operations in order of execution, length of path)
+    """
+    lengths = get_critical_path_lengths(operations_graph, get_weight)
+    if not lengths:
+        return [], 0
+    successors = get_successors(operations_graph)
+    # NOTE: the first of operations with the same length is taken in order of sorting to make result stable
+    operation = max(sorted(lengths, key=str), key=lambda x: lengths[x])
+    path = [operation]
+    while successors[operation]:
+        operation = max(sorted(successors[operation], key=str), key=lambda x: lengths[x])
+        path.append(operation)
+    return path, lengths[path[0]]
+
+
+def get_graph_metrics(operations_graph, get_weight):
+    """
+    Calculate metrics of the graph of operations
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :param get_weight: function which returns weight (expected duration) of the operation
+    :return: dict with number of operations and dependencies, depth, number of operations on every level,
+    maximum number of operations executed at once, average parallelism (sum of weights divided by length
+    of critical path), critical path and its length
+    """
+    levels = get_graph_levels(operations_graph)
+    depth = max(levels.values(), default=0)
+    widths = [0] * depth
+    for level in levels.values():
+        widths[level - 1] += 1
+    critical_path, critical_path_length = get_critical_path(operations_graph, get_weight)
+    total_weight = sum(get_weight(operation) for operation in levels)
+    return {
+        'operations': len(levels),
+        'dependencies': sum(len(set(dependencies)) for dependencies in operations_graph.values()),
+        'depth': depth,
+        'widths': widths,
+        'max_parallelism': max(widths, default=0),
+        'average_parallelism': total_weight / critical_path_length if critical_path_length else 0,
+        'total_weight': total_weight,
+        'critical_path': critical_path,
+        'critical_path_length': critical_path_length
+    }
+
+
+def get_operation_weight(operation, is_delete=False, durations=None):
+    """
+    Get weight of operation of ProviderToscaTemplate graph
+    :param durations: OperationDurations with historical durations, every operation has default weight if None
+    :return: expected duration of operation
+    """
+    if is_delete:
+        if operation.operation != 'create':
+            # skipped in delete mode
+            return 0
+        if durations is None:
+            return DEFAULT_OPERATION_WEIGHT
+        return durations.get_weight(operation.type, 'delete')
+    if durations is None:
+        return DEFAULT_OPERATION_WEIGHT
+    return durations.get_weight(operation.type, operation.operation)
+
+
+def graph_to_dot(operations_graph, get_name, highlighted_path=()):
+    """
+    Represent graph of operations in DOT format, edges are directed from dependency to dependent operation
+    :param get_name: function which returns name of the operation
+    :param highlighted_path: list of operations in order of execution which is colored, e.g. critical path
+    :return: string
+    """
+    quote = lambda x: '"' + get_name(x).replace('\\', '\\\\').replace('"', '\\"') + '"'
+    highlighted = set(highlighted_path)
+    highlighted_edges = set(zip(highlighted_path, highlighted_path[1:]))
+    lines = ['digraph operations {']
+    for operation in sorted(get_successors(operations_graph), key=get_name):
+        if operation in highlighted:
+            lines.append('    %s [color=red];' % quote(operation))
+        else:
+            lines.append('    %s;' % quote(operation))
+    for operation in sorted(operations_graph, key=get_name):
+        for dependency in sorted(set(operations_graph[operation]), key=get_name):
+            if (dependency, operation) in highlighted_edges:
+                lines.append('    %s -> %s [color=red];' % (quote(dependency), quote(operation)))
+            else:
+                lines.append('    %s -> %s;' % (quote(dependency), quote(operation)))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def export_operations_graph(operations_graph, get_name, get_weight):
+    """
+    Export graph of operations with its metrics
+    :param operations_graph: dict in format {operation: iterable of operations it depends on}
+    :param get_name: function which returns unique name of the operation
+    :param get_weight: function which returns weight (expected duration) of the operation
+    :return: dict in format {'graph': JSON serializable graph, 'dot': graph in DOT format, 'metrics': JSON
+    serializable metrics}, operations are replaced with their names
+    """
+    metrics = get_graph_metrics(operations_graph, get_weight)
+    levels = get_graph_levels(operations_graph)
+    operations = []
+    for operation in sorted(levels, key=lambda x: (levels[x], get_name(x))):
+        operations.append({
+            'name': get_name(operation),
+            'dependencies': sorted(set(get_name(x) for x in operations_graph.get(operation, []))),
+            'level': levels[operation],
+            'weight': get_weight(operation)
+        })
+    dot = graph_to_dot(operations_graph, get_name, metrics['critical_path'])
+    metrics['critical_path'] = [get_name(operation) for operation in metrics['critical_path']]
+    return {'graph': {'operations': operations}, 'dot': dot, 'metrics': metrics}
+
+
+class OperationDurations(object):
+    """
+    Historical durations of operations by node type and operation name, stored in json file as moving averages
+    """
+
+    def __init__(self, filename=None):
+        if filename is None:
+            filename = os.path.join(utils.get_tmp_clouni_dir(), DURATIONS_FILENAME)
+        self.filename = filename
+        self.durations = None
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def get_key(self, type_name, operation):
+        return type_name + ':' + operation
+
+    def _load(self):
+        try:
+            with open(self.filename, 'r') as f:
+                durations = json.load(f)
+            if isinstance(durations, dict):
+                return durations
+            logging.warning("Invalid content of operation durations file %s, it will be overwritten" % self.filename)
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            logging.warning("Can't read operation durations file %s: %s" % (self.filename, e))
+        return {}
+
+    def _update(self, durations, key, duration):
+        if key in durations:
+            durations[key] = DURATION_SMOOTHING * duration + (1 - DURATION_SMOOTHING) * durations[key]
+        else:
+            durations[key] = duration
+
+    def get_weight(self, type_name, operation):
+        with self.lock:
+            if self.durations is None:
+                self.durations = self._load()
+            return self.durations.get(self.get_key(type_name, operation), DEFAULT_OPERATION_WEIGHT)
+
+    def record(self, type_name, operation, duration):
+        key = self.get_key(type_name, operation)
+        with self.lock:
+            if self.durations is None:
+                self.durations = self._load()
+            self._update(self.durations, key, duration)
+            self.pending.append((key, duration))
+
+    def save(self):
+        """
+        Write recorded durations to the file, durations recorded by other processes since the last load are kept
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            durations = self._load()
+            for key, duration in self.pending:
+                self._update(durations, key, duration)
+            try:
+                directory = os.path.dirname(self.filename)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=DURATIONS_FILENAME)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(durations, f)
+                os.replace(tmp_filename, self.filename)
+            except OSError as e:
+                logging.warning("Can't write operation durations file %s: %s" % (self.filename, e))
+                return
+            self.durations = durations
+            self.pending = []
+
+
+operation_durations = OperationDurations()
@@ -2,27 +2,38 @@ import copy
 import json
 import logging
 import os
+import tempfile
 from threading import Thread
 
 import requests
 import six
 import yaml
+from toscaparser.common.exception import ValidationError
 from toscaparser.tosca_template import ToscaTemplate
 from yaml import Loader
 
 from configuration_tool.common.tosca_reserved_keys import IMPORTS, DEFAULT_ARTIFACTS_DIRECTORY, \
     EXECUTOR, NAME, TOSCA_ELEMENTS_MAP_FILE, TOSCA_ELEMENTS_DEFINITION_FILE, TOPOLOGY_TEMPLATE, TYPE, \
-    TOSCA_ELEMENTS_DEFINITION_DB_CLUSTER_NAME, NODE_TEMPLATES, RELATIONSHIP_TEMPLATES
+    TOSCA_ELEMENTS_DEFINITION_DB_CLUSTER_NAME, NODE_TEMPLATES, RELATIONSHIP_TEMPLATES, PROVIDERS
 from configuration_tool.common import utils
 from configuration_tool.common.configuration import Configuration
-from configuration_tool.configuration_tools.ansible.instance_model.instance_model import update_instance_model
-from configuration_tool.configuration_tools.combined.combine_configuration_tools import get_configuration_tool_class
+from configuration_tool.common.operations_graph import export_operations_graph, get_operation_weight, \
+    operation_durations
+from configuration_tool.common.validation_cache import validation_cache
+from configuration_tool.configuration_tools.ansible.instance_model.instance_model import init_instance_model, \
+    release_instance_model
+from configuration_tool.configuration_tools.combined.combine_configuration_tools import get_configuration_tool_class, \
+    CONFIGURATION_TOOLS
+from configuration_tool.configuration_tools.common.tool_config import ConfigurationToolConfiguration
 from configuration_tool.providers.common.provider_configuration import ProviderConfiguration
-from configuration_tool.providers.common.tosca_template import ProviderToscaTemplate
+from configuration_tool.providers.common.tosca_template import ProviderToscaTemplate, load_provider_definitions, \
+    SEPARATOR
 
 REQUIRED_CONFIGURATION_PARAMS = (TOSCA_ELEMENTS_DEFINITION_FILE, DEFAULT_ARTIFACTS_DIRECTORY, TOSCA_ELEMENTS_MAP_FILE)
 
 REQUIRED_CONFIGURATION_PARAMS = (TOSCA_ELEMENTS_DEFINITION_FILE, DEFAULT_ARTIFACTS_DIRECTORY, TOSCA_ELEMENTS_MAP_FILE)
+# NOTE: name of the file with template loaded to the database
+TEMPLATE_FILENAME = 'template.yaml'
 
 
 def load_to_db(node_templates, relationship_templates, config, database_api_endpoint, template, cluster_name):
@@ -40,25 +51,52 @@ def load_to_db(node_templates, relationship_templates, config, database_api_endp
         if response['status'] != 200:
             raise Exception("Error in db! Status code: %s, msg: %s" % (response['status'], response['message']))
         definitions = utils.deep_update_dict(definitions, response['result'])
-    with open(os.path.join(utils.get_tmp_clouni_dir(), 'template.yaml'), "w") as f:
-        template = utils.deep_update_dict(template, definitions)
-        del template[IMPORTS]
-        print(yaml.dump(template, Dumper=utils.NoAliasDumper), file=f)
-    with open(os.path.join(utils.get_tmp_clouni_dir(), 'template.yaml'), "r") as f:
-        files = {'file': f}
-        res = requests.post(utils.get_url_for_loading_to_db(cluster_name, database_api_endpoint), files=files)
-        try:
-            response = res.json()
-        except Exception:
-            raise Exception("Failed to parse json response from db on loading template")
-        if response['status'] != 200:
-            raise Exception("Error in db! Status code: %s, msg: %s" % (response['status'], response['message']))
+    # NOTE: file is unique for the request, so concurrent requests don't overwrite templates of each other
+    os.makedirs(utils.get_tmp_clouni_dir(), exist_ok=True)
+    fd, template_filename = tempfile.mkstemp(dir=utils.get_tmp_clouni_dir(), prefix='template_', suffix='.yaml')
+    try:
+        with os.fdopen(fd, "w") as f:
+            template = utils.deep_update_dict(template, definitions)
+            del template[IMPORTS]
+            print(yaml.dump(template, Dumper=utils.NoAliasDumper), file=f)
+        with open(template_filename, "r") as f:
+            files = {'file': (TEMPLATE_FILENAME, f)}
+            res = requests.post(utils.get_url_for_loading_to_db(cluster_name, database_api_endpoint), files=files)
+    finally:
+        os.remove(template_filename)
+    try:
+        response = res.json()
+    except Exception:
+        raise Exception("Failed to parse json response from db on loading template")
+    if response['status'] != 200:
+        raise Exception("Error in db! Status code: %s, msg: %s" % (response['status'], response['message']))
 
 
+def preload_translation_resources():
+    """
+    Load configuration files and TOSCA definitions of all providers to process-wide caches,
+    so the first translation doesn't pay for it
+    """
+    Configuration()
+    for provider in PROVIDERS:
+        try:
+            load_provider_definitions(provider)
+        except Exception as e:
+            logging.warning("Failed to preload definitions of provider \'%s\': %s" % (provider, e))
+    for tool_class in CONFIGURATION_TOOLS:
+        try:
+            ConfigurationToolConfiguration(tool_class.TOOL_NAME)
+        except Exception as e:
+            logging.warning("Failed to preload configuration of tool \'%s\': %s" % (tool_class.TOOL_NAME, e))
 
-def translate(provider_template, validate_only, configuration_tool, cluster_name, is_delete=False,
-              extra=None, log_level='info', debug=False, host_ip_parameter='public_address',
-              database_api_endpoint=None, grpc_cotea_endpoint=None):
+
+def prepare_template(provider_template, log_level='info'):
+    """
+    Parse template, detect its provider and add default imports of TOSCA definitions
+    :param provider_template: string with TOSCA template
+    :param log_level: level of logging
+    :return: tuple (template, provider, config)
+    """
     log_map = dict(
         debug=logging.DEBUG,
         info=logging.INFO,
@@ -123,6 +161,64 @@ def translate(provider_template, validate_only, configuration_tool, cluster_name
     template[IMPORTS].extend(default_import_files)
     for i in range(len(template[IMPORTS])):
         template[IMPORTS][i] = os.path.abspath(template[IMPORTS][i])
+    return template, provider, config
+
+
+def validate_template(template):
+    """
+    Validate template with imported definitions by OpenStack tosca-parser
+    :param template: dict returned by prepare_template
+    """
+    # NOTE: the same templates are validated many times, outcome of validation is cached by content
+    validation_key = validation_cache.get_key(template, template[IMPORTS])
+    found, validation_error = validation_cache.get(validation_key)
+    if not found:
+        copy_of_template = copy.deepcopy(template)
+        try:
+            ToscaTemplate(yaml_dict_tpl=copy_of_template)
+        except ValidationError as e:
+            validation_cache.put(validation_key, str(e))
+            logging.exception("Got exception from OpenStack tosca-parser: %s" % e)
+            raise Exception("Got exception from OpenStack tosca-parser: %s" % e)
+        except Exception as e:
+            logging.exception("Got exception from OpenStack tosca-parser: %s" % e)
+            raise Exception("Got exception from OpenStack tosca-parser: %s" % e)
+        validation_cache.put(validation_key)
+    logging.debug("Validation cache statistics: %s" % json.dumps(validation_cache.get_stats()))
+    if validation_error is not None:
+        logging.error("Got exception from OpenStack tosca-parser: %s" % validation_error)
+        raise Exception("Got exception from OpenStack tosca-parser: %s" % validation_error)
+
+
+def get_operations_graph(provider_template, configuration_tool, cluster_name, is_delete=False, log_level='info',
+                         host_ip_parameter='public_address', use_durations=False):
+    """
+    Build graph of operations of the template without deployment and calculate its metrics
+    :param provider_template: string with TOSCA template
+    :param configuration_tool: name of configuration tool
+    :param cluster_name: name of cluster, instance model is not changed
+    :param is_delete: graph of deletion is built
+    :param log_level: level of logging
+    :param host_ip_parameter: parameter of host, which is used to connect to it
+    :param use_durations: historical durations of operations are used as weights, every operation has
+    default weight otherwise
+    :return: dict in format {'graph': {'operations': [...]}, 'dot': string, 'metrics': {...}}
+    """
+    template, provider, _ = prepare_template(provider_template, log_level)
+    validate_template(template)
+    tosca = ProviderToscaTemplate(template, provider, configuration_tool, cluster_name,
+                                  host_ip_parameter, is_delete, None)
+    durations = operation_durations if use_durations else None
+    return export_operations_graph(
+        tosca.reversed_provider_operations if is_delete else tosca.provider_operations,
+        lambda operation: operation.name + SEPARATOR + operation.operation,
+        lambda operation: get_operation_weight(operation, is_delete, durations))
+
+
+def translate(provider_template, validate_only, configuration_tool, cluster_name, is_delete=False,
+              extra=None, log_level='info', debug=False, host_ip_parameter='public_address',
+              database_api_endpoint=None, grpc_cotea_endpoint=None, progress_callback=None):
+    template, provider, config = prepare_template(provider_template, log_level)
     if template.get(TOPOLOGY_TEMPLATE):
         tmpl = template.get(TOPOLOGY_TEMPLATE)
         if database_api_endpoint:
@@ -130,23 +226,15 @@ def translate(provider_template, validate_only, configuration_tool, cluster_name
                 tmpl[NODE_TEMPLATES] = {}
             if not tmpl.get(RELATIONSHIP_TEMPLATES):
                 tmpl[RELATIONSHIP_TEMPLATES] = {}
-            load_to_db(tmpl[NODE_TEMPLATES], tmpl[RELATIONSHIP_TEMPLATES], config, database_api_endpoint, template, cluster_name)
+            # NOTE: imports are removed from the template loaded to the database, the copy is loaded
+            load_to_db(tmpl[NODE_TEMPLATES], tmpl[RELATIONSHIP_TEMPLATES], config, database_api_endpoint,
+                       copy.deepcopy(template), cluster_name)
         else:
-            if tmpl.get(NODE_TEMPLATES):
-                node_templates = tmpl.get(NODE_TEMPLATES)
-                for elem in node_templates:
-                    update_instance_model(cluster_name, node_templates[elem], node_templates[elem][TYPE], elem, [], [], is_delete, init=True)
-            if tmpl.get(RELATIONSHIP_TEMPLATES):
-                rel_templates = tmpl.get(RELATIONSHIP_TEMPLATES)
-                for elem in rel_templates:
-                    update_instance_model(cluster_name, rel_templates[elem], rel_templates[elem][TYPE], elem, [], [], is_delete, init=True)
-
-    copy_of_template = copy.deepcopy(template)
-    try:
-        tosca_parser_template_object = ToscaTemplate(yaml_dict_tpl=copy_of_template)
-    except Exception as e:
-        logging.exception("Got exception from OpenStack tosca-parser: %s" % e)
-        raise Exception("Got exception from OpenStack tosca-parser: %s" % e)
+            # NOTE: instance model is loaded again, it could be changed by other process since the last translation
+            release_instance_model(cluster_name)
+            init_instance_model(cluster_name, tmpl, is_delete)
+
+    validate_template(template)
 
     # After validation, all templates are imported
     if validate_only:
@@ -164,5 +252,6 @@ def translate(provider_template, validate_only, configuration_tool, cluster_name
     configuration_content = tool.to_dsl(provider, tosca.provider_operations, tosca.reversed_provider_operations,
                                         tosca.cluster_name, is_delete, target_directory=default_artifacts_directory,
                                         extra=extra, debug=debug,
-                                        grpc_cotea_endpoint=grpc_cotea_endpoint)
+                                        grpc_cotea_endpoint=grpc_cotea_endpoint,
+                                        progress_callback=progress_callback)
     return configuration_content
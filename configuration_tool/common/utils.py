@@ -1,8 +1,10 @@
+import hashlib
 import itertools
 import os
 import importlib
 import sys
 import logging
+import threading
 
 import six
 import yaml
@@ -10,6 +12,10 @@ import yaml
 from random import randint, seed
 from time import time
 
+# NOTE: content hashes of files in format {path: (mtime, size, hash)}
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
 
 def tosca_type_parse(_type):
     tosca_type = _type.split(".", 2)
@@ -63,10 +69,45 @@ def get_project_root_path():
     return os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 
 
+def get_file_hash(filename):
+    """
+    Get sha256 hash of file content, file is read again only if its mtime or size is changed
+    :param filename: path to file
+    :return: hex digest string
+    """
+    stat = os.stat(filename)
+    cached = _file_hashes.get(filename)
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        return cached[2]
+    with open(filename, 'rb') as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[filename] = (stat.st_mtime, stat.st_size, file_hash)
+    return file_hash
+
+
+def get_file_fingerprint(filename):
+    """
+    Get tuple which identifies the file state
+    :param filename: path to file
+    :return: tuple (path, mtime, content hash)
+    """
+    return filename, os.path.getmtime(filename), get_file_hash(filename)
+
+
 def get_tmp_clouni_dir():
     return '/tmp/clouni/'
 
 
+def get_data_clouni_dir():
+    """
+    Directory of persistent state, like instance model of deployed clusters, $XDG_DATA_HOME/clouni
+    or ~/.local/share/clouni
+    """
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(data_home, 'clouni')
+
+
 def get_random_int(start, end):
     seed(time())
     r = randint(start, end)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import six
+import yaml
+
+from configuration_tool.common import utils
+from configuration_tool.common.tosca_reserved_keys import IMPORTS
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_MEMORY = 32 * 1024 * 1024
+
+# NOTE: approximate size of the entry without key and error text
+ENTRY_OVERHEAD = 256
+
+
+class ValidationCache(object):
+    """
+    LRU cache of tosca-parser validation outcomes, keyed by hash of the template and of the files it imports
+    directly or through other imported files.
+    Outcome is None for successful validation or the text of ValidationError
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_memory=DEFAULT_MAX_MEMORY):
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.hits = 0
+        self.misses = 0
+        self.memory = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # NOTE: imports of the file in format {file hash: list of paths or None}, so files are parsed only once
+        self._nested_imports = {}
+
+    def get_key(self, template, import_files):
+        """
+        Calculate the key of the template
+        :param template: dict with template, imports must be already resolved to absolute paths
+        :param import_files: list of imported files, files imported by them are also hashed
+        :return: hex digest string or None if template can't be cached
+        """
+        try:
+            normalized = json.dumps(template, sort_keys=True, separators=(',', ':'), default=str)
+        except TypeError:
+            # keys of different types can't be sorted
+            normalized = str(template)
+        key_hash = hashlib.sha256(normalized.encode('utf-8'))
+        visited = set()
+        queue = list(import_files)
+        while queue:
+            import_file = queue.pop(0)
+            if import_file in visited:
+                continue
+            visited.add(import_file)
+            if not os.path.isfile(import_file):
+                # NOTE: content of remote and missing imports can change without notice
+                return None
+            file_hash = utils.get_file_hash(import_file)
+            nested_imports = self._get_nested_imports(import_file, file_hash)
+            if nested_imports is None:
+                return None
+            key_hash.update(import_file.encode('utf-8'))
+            key_hash.update(file_hash.encode('utf-8'))
+            queue.extend(nested_imports)
+        return key_hash.hexdigest()
+
+    def _get_nested_imports(self, import_file, file_hash):
+        """
+        Get imports of the imported file
+        :param import_file: path to file
+        :param file_hash: hash of the file content
+        :return: list of absolute paths or None if imports can't be resolved to local files
+        """
+        with self._lock:
+            if (import_file, file_hash) in self._nested_imports:
+                return self._nested_imports[(import_file, file_hash)]
+        nested_imports = []
+        try:
+            with open(import_file, 'r') as f:
+                definitions = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            definitions = None
+            nested_imports = None
+        if isinstance(definitions, dict):
+            for import_value in definitions.get(IMPORTS) or []:
+                if isinstance(import_value, dict):
+                    import_value = next(iter(import_value.values()), None)
+                    if isinstance(import_value, dict):
+                        if import_value.get('repository') is not None:
+                            import_value = None
+                        else:
+                            import_value = import_value.get('file')
+                if not isinstance(import_value, six.string_types) or '://' in import_value:
+                    nested_imports = None
+                    break
+                nested_imports.append(os.path.abspath(os.path.join(os.path.dirname(import_file), import_value)))
+        with self._lock:
+            self._nested_imports[(import_file, file_hash)] = nested_imports
+        return nested_imports
+
+    def get(self, key):
+        """
+        :param key: key of the template
+        :return: tuple (found, error text or None)
+        """
+        with self._lock:
+            if key is None or key not in self._entries:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, self._entries[key][0]
+
+    def put(self, key, error=None):
+        if key is None:
+            return
+        size = ENTRY_OVERHEAD + sys.getsizeof(key) + (sys.getsizeof(error) if error is not None else 0)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_memory:
+                return
+            self._entries[key] = (error, size)
+            self.memory += size
+            while len(self._entries) > self.max_entries or self.memory > self.max_memory:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, size = self._entries.pop(key)
+        self.memory -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nested_imports.clear()
+            self.memory = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'memory': self.memory
+            }
+
+
+validation_cache = ValidationCache()
@@ -6,18 +6,22 @@ from graphlib import TopologicalSorter
 from toscaparser.functions import GetAttribute, Concat, Token, GetProperty, GetInput
 
 from configuration_tool.common import utils
+from configuration_tool.common.operations_graph import get_critical_path_lengths, get_operation_weight, \
+    operation_durations
 from configuration_tool.common.tosca_reserved_keys import PARAMETERS, VALUE, EXTRA, SOURCE, INPUTS, NODE_FILTER, NAME, \
     NODES, GET_OPERATION_OUTPUT, IMPLEMENTATION, ANSIBLE, GET_INPUT, RELATIONSHIPS, ATTRIBUTES, GET_ATTRIBUTE, CONCAT, \
     JOIN, TOKEN, REQUIREMENTS, NODE, CAPABILITIES, DEFAULT, GET_PROPERTY, PROPERTIES, INTERFACES, OUTPUTS, ID, TYPE, \
     DEPLOY_PATH, CHECKSUM, CHECKSUM_ALGORITHM, TIMEOUT
 from configuration_tool.configuration_tools.ansible.instance_model.instance_model import update_instance_model, \
-    get_actual_state_of_instance_model, delete_cluster_from_instance_model
+    get_actual_state_of_instance_model, delete_cluster_from_instance_model, flush_instance_model, \
+    release_instance_model
 
 from configuration_tool.providers.common.provider_configuration import ProviderConfiguration
 from configuration_tool.configuration_tools.common.configuration_tool import ConfigurationTool, \
-    OUTPUT_IDS, OUTPUT_ID_RANGE_START, OUTPUT_ID_RANGE_END
+    OUTPUT_IDS, OUTPUT_ID_RANGE_START, OUTPUT_ID_RANGE_END, OPERATION_STARTED, OPERATION_FINISHED, OPERATION_FAILED
 
-from configuration_tool.configuration_tools.ansible.runner.runner import grpc_cotea_run_ansible, run_ansible
+from configuration_tool.configuration_tools.ansible.runner.runner import grpc_cotea_run_ansible, run_ansible, \
+    OperationError, DEFAULT_MAX_PARALLEL_OPERATIONS
 
 import copy, yaml, os, itertools, six, logging
 
@@ -33,6 +37,8 @@ ANSIBLE_RESERVED_KEYS = \
      ' is undefined', 'include', 'copy', 'src', 'dest', 'stat', 'fail', 'msg', 'when', 'with_list', 'async')
 
 REQUIRED_CONFIG_PARAMS = (INITIAL_ARTIFACTS_DIRECTORY, DEFAULT_HOST) = ("initial_artifacts_directory", "default_host")
+MAX_PARALLEL_OPERATIONS = 'max_parallel_operations'
+COTEA_SESSION_IDLE_TIMEOUT = 'cotea_session_idle_timeout'
 
 
 class AnsibleConfigurationTool(ConfigurationTool):
@@ -54,8 +60,18 @@ class AnsibleConfigurationTool(ConfigurationTool):
         for param in REQUIRED_CONFIG_PARAMS:
             setattr(self, param, main_config[param])
 
+        self.max_parallel_operations = DEFAULT_MAX_PARALLEL_OPERATIONS
+        if main_config.get(MAX_PARALLEL_OPERATIONS):
+            self.max_parallel_operations = int(main_config[MAX_PARALLEL_OPERATIONS])
+            if self.max_parallel_operations < 1:
+                logging.error("Configuration parameter \'%s\' should be greater than 0" % MAX_PARALLEL_OPERATIONS)
+                raise Exception("Configuration parameter \'%s\' should be greater than 0" % MAX_PARALLEL_OPERATIONS)
+        # NOTE: 0 - session of cotea is stopped right after the operation. Reused session keeps facts and registered
+        # variables of previous operations with the same hosts, even of other clusters, so reuse is opt-in
+        self.cotea_session_idle_timeout = float(main_config.get(COTEA_SESSION_IDLE_TIMEOUT, 0))
+
     def to_dsl(self, provider, operations_graph, reversed_operations_graph, cluster_name, is_delete,
-               target_directory=None, extra=None, debug=False, grpc_cotea_endpoint=None):
+               target_directory=None, extra=None, debug=False, grpc_cotea_endpoint=None, progress_callback=None):
 
         provider_config = ProviderConfiguration(self.provider)
         ansible_config = provider_config.get_section(ANSIBLE)
@@ -68,6 +84,7 @@ class AnsibleConfigurationTool(ConfigurationTool):
         # of the form Node/Relationship: {the set of opers of Nodes/Relationships on which it depends}
 
         self.operations_graph = operations_graph
+        self.build_operations_indexes(operations_graph)
         self.cluster_name = cluster_name
 
         elements = TopologicalSorter(operations_graph)
@@ -79,41 +96,58 @@ class AnsibleConfigurationTool(ConfigurationTool):
         elements.prepare()
         # first operations from on top of the graph in state 'ready'
 
+        critical_path_lengths = get_critical_path_lengths(
+            reversed_operations_graph if is_delete else operations_graph,
+            lambda operation: get_operation_weight(operation, is_delete, operation_durations))
+        # ready operations with the longest remaining path to the end of the graph are started first
+
         ansible_playbook = []
         q = Queue()
-        # queue for node names + operations
-        active = []
-        # list of parallel active operations
+        # queue for node names + operations, results are put by coroutines of the process-wide runner
+        active = {}
+        # parallel active operations in format {(node, op): operation}
+        start_times = {}
+        # start times of operations sent to cotea in format {node.op: timestamp}
+        scheduling_latencies = []
+        # delays between finish of operation and start of operations released by it
+        released_time = None
         first = True
 
         while elements.is_active():
-            node_values = None
-            # try to get new finished operation from queue and find it in list of active
-            # if get - mark done this operation (but before it find in graph)
-            # if ready operations exists - get it and execute, remove from active
-            try:
-                node_values = q.get_nowait()
-            except Exception:
-                time.sleep(1)
-            if isinstance(node_values, Exception):
-                logging.error("Deploy failed with %s" % node_values)
-                raise Exception("Deploy failed with %s" % node_values)
-            if node_values is not None:
+            ready = sorted(elements.get_ready(), key=lambda x: critical_path_lengths.get(x, 0), reverse=True)
+            if not ready:
+                # NOTE: all ready operations are already sent, so wait for the next finished one without polling
+                if not active:
+                    logging.error("No active operations, but graph isn't done")
+                    raise Exception("No active operations, but graph isn't done")
+                node_values = q.get()
+                released_time = time.time()
+                if isinstance(node_values, Exception):
+                    if isinstance(node_values, OperationError):
+                        self.report_progress(progress_callback, OPERATION_FAILED, node_values.name,
+                                             node_values.operation, start_times, error=str(node_values))
+                    logging.error("Deploy failed with %s" % node_values)
+                    raise Exception("Deploy failed with %s" % node_values)
                 if isinstance(node_values, dict) and len(node_values) == 1:
                     node_name = list(node_values.keys())[0]
-                    for node in active:
-                        if node.name == node_name.split(SEPARATOR)[0] and node.operation == node_name.split(SEPARATOR)[
-                            1]:
-                            active.remove(node)
-                            elements.done(node)
-                            update_instance_model(self.cluster_name, node.tmpl, node.type, node.name,
-                                                  node_values[node_name].get(ATTRIBUTES, []),
-                                                  node_values[node_name].get(PROPERTIES, []), is_delete)
-                            self.resolve_outputs(node_values[node_name][OUTPUTS], node, is_delete)
+                    node = active.pop(tuple(node_name.split(SEPARATOR)[:2]), None)
+                    if node is not None:
+                        elements.done(node)
+                        self.report_progress(progress_callback, OPERATION_FINISHED, node.name, node.operation,
+                                             start_times)
+                        operation_durations.record(node.type, node.operation,
+                                                   released_time - start_times[node.name + SEPARATOR +
+                                                                               node.operation])
+                        update_instance_model(self.cluster_name, node.tmpl, node.type, node.name,
+                                              node_values[node_name].get(ATTRIBUTES, []),
+                                              node_values[node_name].get(PROPERTIES, []), is_delete)
+                        self.resolve_outputs(node_values[node_name][OUTPUTS], node, is_delete)
+                        flush_instance_model(self.cluster_name)
                 else:
                     logging.error('Bad element in queue')
                     raise Exception('Bad element in queue')
-            for v in elements.get_ready():
+                continue
+            for v in ready:
                 # in delete mode we skip all operations exept delete and create operation transforms to delete
                 if is_delete:
                     if v.operation == 'create':
@@ -172,17 +206,13 @@ class AnsibleConfigurationTool(ConfigurationTool):
                     # operations for relationships executes on target/source host depends on operation
                     elif element_type == RELATIONSHIPS:
                         if v.operation == 'pre_configure_target' or v.operation == 'post_configure_target' or v.operation == 'add_source':
-                            for elem in operations_graph:
-                                if elem.name == v.target:
-                                    if elem.is_software_component:
-                                        host = v.host
-                                    break
+                            elem = self.get_first_operation_by_name(v.target)
+                            if elem is not None and elem.is_software_component:
+                                host = v.host
                         elif v.operation == 'pre_configure_source' or v.operation == 'post_configure_source':
-                            for elem in operations_graph:
-                                if elem.name == v.source:
-                                    if elem.is_software_component:
-                                        host = elem.host
-                                    break
+                            elem = self.get_first_operation_by_name(v.source)
+                            if elem is not None and elem.is_software_component:
+                                host = elem.host
                         else:
                             logging.error("Unsupported operation for relationship in operation graph")
                             raise Exception("Unsupported operation for relationship in operation graph")
@@ -207,16 +237,62 @@ class AnsibleConfigurationTool(ConfigurationTool):
                             properties = list(v.tmpl.get(PROPERTIES).keys())
                         else:
                             properties = []
+                        start_times[v.name + SEPARATOR + v.operation] = time.time()
+                        if released_time is not None:
+                            scheduling_latencies.append(start_times[v.name + SEPARATOR + v.operation] - released_time)
+                        self.report_progress(progress_callback, OPERATION_STARTED, v.name, v.operation, start_times)
+                        active[(v.name, v.operation)] = v
                         self.run(ansible_tasks, grpc_cotea_endpoint, host, v.name, v.operation, q, extra,
                                  ansible_config, self.get_defined_attributes(v),
-                                 outputs, properties)
+                                 outputs, properties, priority=-critical_path_lengths.get(v, 0))
                     else:
                         elements.done(v)
-                    active.append(v)
+        self.scheduling_latencies = scheduling_latencies
+        operation_durations.save()
+        if scheduling_latencies:
+            logging.info("Scheduling latency of %s operations: average %.6f s, max %.6f s" %
+                         (len(scheduling_latencies), sum(scheduling_latencies) / len(scheduling_latencies),
+                          max(scheduling_latencies)))
         if not debug and is_delete:
             delete_cluster_from_instance_model(cluster_name)
+        else:
+            release_instance_model(cluster_name)
         return yaml.dump(ansible_playbook, default_flow_style=False)
 
+    def build_operations_indexes(self, operations_graph):
+        """
+        Build indexes of operations graph, so lookups don't scan the whole graph
+        :param operations_graph: dict with operations as keys
+        :return: None
+        """
+        self.operations_by_name_and_operation = {}
+        self.operations_by_name = {}
+        self.relationships_ends = {}
+        for v in operations_graph:
+            self.operations_by_name_and_operation.setdefault((v.name, v.operation), v)
+            self.operations_by_name.setdefault(v.name, []).append(v)
+            # NOTE: all operations of the relationship have the same source and target
+            self.relationships_ends[v.name] = (v.source, v.target)
+
+    def get_first_operation_by_name(self, name):
+        operations = self.operations_by_name.get(name)
+        if operations:
+            return operations[0]
+        return None
+
+    def report_progress(self, progress_callback, event_type, name, operation, start_times, error=None):
+        if progress_callback is None:
+            return
+        start_time = start_times.get(name + SEPARATOR + operation)
+        finish_time = None
+        if event_type != OPERATION_STARTED:
+            finish_time = time.time()
+        try:
+            progress_callback(event_type, name, operation, start_time, finish_time, error)
+        except Exception:
+            logging.exception("Progress callback failed on event %s of operation %s" % (event_type,
+                                                                                      name + ':' + operation))
+
     def get_ansible_tasks_for_create(self, element_object, target_directory, node_filter_config, description_by_type,
                                      module_by_type, additional_args=None):
         """
@@ -330,11 +406,10 @@ class AnsibleConfigurationTool(ConfigurationTool):
                     if 'operation_host' in implementations:
                         if isinstance(implementations['operation_host'], six.string_types):
                             host = self._resolve_tosca_travers([implementations['operation_host'], ''], element_object.name)
-                            for v in self.operations_graph:
-                                if v.name == host[0] and v.operation == 'create':
-                                    element_object.host = v.host  # if operation_host defined - we try to find
-                                    # operation create of target node and get host of this operation
-                                    break
+                            v = self.operations_by_name_and_operation.get((host[0], 'create'))
+                            if v is not None:
+                                element_object.host = v.host  # if operation_host defined - we try to find
+                                # operation create of target node and get host of this operation
                         else:
                             logging.error('Operation_host must be a string value')
                             raise Exception('Operation_host must be a string value')
@@ -478,7 +553,7 @@ class AnsibleConfigurationTool(ConfigurationTool):
         return '.yaml'
 
     def run(self, ansible_tasks, grpc_cotea_endpoint, hosts, name, op, q, extra,
-            ansible_config, attributes, outputs, properties):
+            ansible_config, attributes, outputs, properties, priority=0):
         extra_env = {}
         extra_vars = extra.get('global')
         plugins_path = os.path.join(utils.get_tmp_clouni_dir(), 'ansible_plugins/plugins/modules/cloud/', self.provider)
@@ -487,21 +562,22 @@ class AnsibleConfigurationTool(ConfigurationTool):
                                ansible_library=plugins_path,
                                attributes=attributes,
                                outputs=outputs,
-                               properties=properties)
+                               properties=properties,
+                               max_parallel_operations=self.max_parallel_operations,
+                               priority=priority,
+                               session_idle_timeout=self.cotea_session_idle_timeout)
 
     def resolve_outputs(self, outputs_val, resource, is_delete):
         outputs, attrs = self.get_outputs(resource)
         for output, attr in zip(outputs, attrs):
             attr = self._resolve_tosca_travers(attr, resource.name)
-            found = False
-            for v in self.operations_graph:
-                if v.name == attr[0]:
-                    found = True
-                    for output_val in outputs_val:
-                        if output_val.get(output):
-                            update_instance_model(self.cluster_name, v.tmpl, v.type, v.name,
-                                                  [{attr[1]: output_val[output]}], [], is_delete)
-            if not found:
+            operations = self.operations_by_name.get(attr[0])
+            for v in operations or []:
+                for output_val in outputs_val:
+                    if output_val.get(output):
+                        update_instance_model(self.cluster_name, v.tmpl, v.type, v.name,
+                                              [{attr[1]: output_val[output]}], [], is_delete)
+            if not operations:
                 logging.error('Template with name %s not found' % attr[0])
                 raise Exception('Template with name %s not found' % attr[0])
 
@@ -558,6 +634,8 @@ class AnsibleConfigurationTool(ConfigurationTool):
                                         "list of string expressions and delimiter")
                 elif key == TOKEN:
                     if isinstance(value, list) and len(value) == 3:
+                        # NOTE: template is shared by operations of the node, its arguments are not replaced
+                        value = list(value)
                         if isinstance(value[0], (six.string_types, int, float)):
                             value[0] = str(value[0])
                         else:
@@ -610,6 +688,7 @@ class AnsibleConfigurationTool(ConfigurationTool):
         elif isinstance(data, Token):
             value = data.args
             if isinstance(value, list) and len(value) == 3:
+                value = list(value)
                 if isinstance(value[0], (six.string_types, int, float)):
                     value[0] = str(value[0])
                 else:
@@ -644,28 +723,18 @@ class AnsibleConfigurationTool(ConfigurationTool):
             raise Exception('Parameter of get_input should be a list')
 
     def _resolve_tosca_travers(self, value, tmpl_name):
+        # NOTE: template is shared by operations of the node, its arguments are not replaced
+        value = list(value)
         if value[0] == 'SELF':
             value[0] = tmpl_name
         if value[0] == 'HOST':
             value = [tmpl_name, 'host'] + value[1:]
-        if value[0] == 'SOURCE':
-            found = False
-            for v in self.operations_graph:
-                if v.name == tmpl_name:
-                    found = True
-                    value[0] = v.source
-            if not found:
-                logging.error("Relationship %s not found" % tmpl_name)
-                raise Exception("Relationship %s not found" % tmpl_name)
-        if value[0] == 'TARGET':
-            found = False
-            for v in self.operations_graph:
-                if v.name == tmpl_name:
-                    found = True
-                    value[0] = v.target
-            if not found:
+        if value[0] == 'SOURCE' or value[0] == 'TARGET':
+            if tmpl_name not in self.relationships_ends:
                 logging.error("Relationship %s not found" % tmpl_name)
                 raise Exception("Relationship %s not found" % tmpl_name)
+            (source, target) = self.relationships_ends[tmpl_name]
+            value[0] = source if value[0] == 'SOURCE' else target
 
         template = get_actual_state_of_instance_model(self.cluster_name, value[0], 1)
         (_, type, _) = utils.tosca_type_parse(template.get(TYPE))
@@ -1,74 +1,693 @@
+import atexit
 import copy
 import logging
 import os
+import sqlite3
+import tempfile
+import threading
+import time
 
 import yaml
 from yaml import Loader
 
+try:
+    import fcntl
+except ImportError:
+    # NOTE: processes are not synchronized on platforms without flock
+    fcntl = None
+
 from configuration_tool.common import utils
 from configuration_tool.common.tosca_reserved_keys import NODES, NODE_TYPES, ATTRIBUTES, NODE_TEMPLATES, NAME, \
-    RELATIONSHIP_TEMPLATES, RELATIONSHIPS, PROPERTIES
+    RELATIONSHIP_TEMPLATES, RELATIONSHIPS, PROPERTIES, ANSIBLE, TYPE
+from configuration_tool.configuration_tools.common.tool_config import ConfigurationToolConfiguration
 
+INSTANCE_MODEL_BACKENDS = (YAML_BACKEND, SQLITE_BACKEND) = ('yaml', 'sqlite')
+INSTANCE_MODEL_BACKEND = 'instance_model_backend'
+INSTANCE_MODEL_DATABASE = 'instance_model_database'
+DEFAULT_INSTANCE_MODEL_DATABASE = 'instance_model.sqlite'
+# NOTE: node template is returned before relationship template with the same name if type isn't specified
+ELEM_TYPES_ORDER = (NODE_TEMPLATES, RELATIONSHIP_TEMPLATES)
+# NOTE: YAML file of cluster is renamed after import to the database, so outdated states aren't imported again
+MIGRATED_SUFFIX = '.migrated'
+INSTANCE_MODEL_CACHE = 'instance_model_cache'
+INSTANCE_MODEL_FLUSH_INTERVAL = 'instance_model_flush_interval'
+DEFAULT_INSTANCE_MODEL_FLUSH_INTERVAL = 5
+INSTANCE_MODEL_HISTORY = 'instance_model_history'
+INSTANCE_MODEL_COMPACTION_SIZE = 'instance_model_compaction_size'
+INSTANCE_MODEL_COMPACTION_RATIO = 'instance_model_compaction_ratio'
+# NOTE: file of instance model is compacted when it's larger than DEFAULT_INSTANCE_MODEL_COMPACTION_SIZE bytes
+# and DEFAULT_INSTANCE_MODEL_COMPACTION_RATIO times larger than after the previous compaction
+DEFAULT_INSTANCE_MODEL_COMPACTION_SIZE = 1024 * 1024
+DEFAULT_INSTANCE_MODEL_COMPACTION_RATIO = 2
+# NOTE: seconds to wait for the lock of the database held by other process or thread
+SQLITE_TIMEOUT = 60
+LOCKS_DIRECTORY = 'locks'
 
-def update_instance_model(cluster_name, tmpl, type, name, attributes, properties, delete, init=False):
-    with open('instance_model_' + cluster_name + '.yaml', 'a+') as instance_model:
-        curr_state = {}
-        if not delete:
-            (_, tosca_type, _) = utils.tosca_type_parse(type)
-            if tosca_type == NODES:
-                if NODE_TEMPLATES not in curr_state:
-                    curr_state[NODE_TEMPLATES] = {}
-                    elem_type = NODE_TEMPLATES
-            elif tosca_type == RELATIONSHIPS:
-                if RELATIONSHIP_TEMPLATES not in curr_state:
-                    curr_state[RELATIONSHIP_TEMPLATES] = {}
-                    elem_type = RELATIONSHIP_TEMPLATES
-            else:
-                logging.error('Unknown tosca type: %s' % type)
-                raise Exception('Unknown tosca type: %s' % type)
-            if init:
-                name = name + '_' + str(1)
-                curr_state[elem_type][name] = copy.deepcopy(tmpl)
-                print(yaml.dump([curr_state]), file=instance_model, flush=True)
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# NOTE: process-wide stores in format {(backend, database, cache, flush interval, compaction parameters): store}
+_stores = {}
+_stores_lock = threading.Lock()
+# NOTE: store resolved from configuration in format (configuration filename, mtime, store)
+_current_store = None
+# NOTE: locks of clusters in format {cluster_name: ClusterLock}
+_cluster_locks = {}
+_cluster_locks_lock = threading.Lock()
+
+
+class ClusterLock(object):
+    """
+    Advisory lock of cluster shared by threads of the process and by processes, it's reentrant
+    in the thread which holds it. Processes are synchronized with flock on the lock file of cluster
+    """
+
+    def __init__(self, cluster_name):
+        self.filename = os.path.join(utils.get_tmp_clouni_dir(), LOCKS_DIRECTORY,
+                                     cluster_name.replace(os.sep, '_') + '.lock')
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        if self.depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+                self.file = open(self.filename, 'a')
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+            except Exception:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.lock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.depth -= 1
+        if self.depth == 0 and self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        self.lock.release()
+
+
+def get_cluster_lock(cluster_name):
+    with _cluster_locks_lock:
+        cluster_lock = _cluster_locks.get(cluster_name)
+        if cluster_lock is None:
+            cluster_lock = ClusterLock(cluster_name)
+            _cluster_locks[cluster_name] = cluster_lock
+        return cluster_lock
+
+
+def get_yaml_filename(cluster_name):
+    return 'instance_model_' + cluster_name + '.yaml'
+
+
+def get_elem_type(type):
+    (_, tosca_type, _) = utils.tosca_type_parse(type)
+    if tosca_type == NODES:
+        return NODE_TEMPLATES
+    if tosca_type == RELATIONSHIPS:
+        return RELATIONSHIP_TEMPLATES
+    logging.error('Unknown tosca type: %s' % type)
+    raise Exception('Unknown tosca type: %s' % type)
+
+
+class InstanceModelStore(object):
+    """
+    Storage of states of instances of templates by cluster name, template name and index of instance
+    """
+
+    def add_states(self, cluster_name, elem_type, states):
+        """
+        Save states of instances in one transaction
+        :param states: list of tuples (template name, index of instance, state)
+        """
+        self.add_batches(cluster_name, [(elem_type, states)])
+
+    def add_batches(self, cluster_name, batches):
+        """
+        Save states of instances of different element types in one transaction
+        :param batches: list of tuples (elem_type, list of tuples (template name, index of instance, state))
+        """
+        raise NotImplementedError()
+
+    def get_state(self, cluster_name, name, index, elem_type=None):
+        """
+        :param elem_type: type of template, node template is returned before relationship template
+        with the same name if None
+        :return: the last saved state of instance or None
+        """
+        raise NotImplementedError()
+
+    def load_cluster(self, cluster_name):
+        """
+        :return: the last states of all instances of cluster in format
+        {(elem_type, template name, index of instance): state}
+        """
+        raise NotImplementedError()
+
+    def delete_cluster(self, cluster_name):
+        raise NotImplementedError()
+
+    def get_version(self, cluster_name):
+        """
+        :return: value which is changed by every write of states of cluster by any process, None if cluster
+        has no states
+        """
+        raise NotImplementedError()
+
+    def flush(self, cluster_name=None):
+        pass
+
+    def release(self, cluster_name):
+        pass
+
+    def compact(self, cluster_name, history=None):
+        """
+        Remove outdated states of instances of cluster
+        :param history: number of previous states kept for every instance, default of the store if None
+        """
+        pass
+
+
+def read_yaml_instance_model(filename):
+    """
+    Parse instance model written by YamlInstanceModelStore
+    :return: list of tuples ((template name, index of instance), elem_type, state) in order of writing
+    """
+    if not os.path.isfile(filename):
+        return []
+    with open(filename, 'r') as instance_model:
+        curr_state = yaml.load(instance_model, Loader=Loader) or []
+    entries = []
+    for elem in curr_state:
+        for elem_type in ELEM_TYPES_ORDER:
+            for key, state in (elem.get(elem_type) or {}).items():
+                name, index = key.rsplit('_', 1)
+                entries.append(((name, int(index)), elem_type, state))
+    return entries
+
+
+def load_yaml_instance_model(filename):
+    """
+    :return: the last states of instances in format {(elem_type, template name, index of instance): state}
+    """
+    return {(elem_type,) + key: state for key, elem_type, state in read_yaml_instance_model(filename)}
+
+
+class YamlInstanceModelStore(InstanceModelStore):
+    """
+    States are appended to instance_model_<cluster_name>.yaml, the file is parsed on every read.
+    The file is compacted to the last states of instances when it grows compaction_ratio times
+    since the previous compaction and is larger than compaction_size bytes
+    """
+
+    def __init__(self, history=0, compaction_size=DEFAULT_INSTANCE_MODEL_COMPACTION_SIZE,
+                 compaction_ratio=DEFAULT_INSTANCE_MODEL_COMPACTION_RATIO):
+        self.history = history
+        self.compaction_size = compaction_size
+        self.compaction_ratio = compaction_ratio
+        # NOTE: sizes of files after compaction in format {cluster_name: size}
+        self.compacted_sizes = {}
+
+    def add_batches(self, cluster_name, batches):
+        curr_state = []
+        for elem_type, states in batches:
+            curr_state.append({elem_type: {name + '_' + str(index): state for name, index, state in states}})
+        if not curr_state:
+            return
+        with get_cluster_lock(cluster_name):
+            with open(get_yaml_filename(cluster_name), 'a+') as instance_model:
+                print(yaml.dump(curr_state, Dumper=utils.NoAliasDumper), file=instance_model, flush=True)
+                os.fsync(instance_model.fileno())
+                size = instance_model.tell()
+            if size > self.compaction_size and \
+                    size > self.compaction_ratio * self.compacted_sizes.get(cluster_name, 0):
+                self.compact(cluster_name)
+
+    def compact(self, cluster_name, history=None):
+        if history is None:
+            history = self.history
+        filename = get_yaml_filename(cluster_name)
+        with get_cluster_lock(cluster_name):
+            entries = read_yaml_instance_model(filename)
+            kept = {}
+            for i, (key, elem_type, state) in enumerate(entries):
+                versions = kept.setdefault((elem_type, key), [])
+                versions.append(i)
+                if len(versions) > history + 1:
+                    versions.pop(0)
+            kept_indexes = sorted(i for versions in kept.values() for i in versions)
+            directory = os.path.dirname(os.path.abspath(filename))
+            fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename))
+            with os.fdopen(fd, 'w') as instance_model:
+                for i in kept_indexes:
+                    (name, index), elem_type, state = entries[i]
+                    print(yaml.dump([{elem_type: {name + '_' + str(index): state}}], Dumper=utils.NoAliasDumper),
+                          file=instance_model)
+                size = instance_model.tell()
+            os.replace(tmp_filename, filename)
+            self.compacted_sizes[cluster_name] = size
+        logging.info("Instance model of cluster %s is compacted from %s to %s states" %
+                     (cluster_name, len(entries), len(kept_indexes)))
+
+    def get_state(self, cluster_name, name, index, elem_type=None):
+        with get_cluster_lock(cluster_name):
+            with open(get_yaml_filename(cluster_name), 'r+') as instance_model:
+                curr_state = yaml.load(instance_model, Loader=Loader)
+        return get_elem(curr_state or [], name + '_' + str(index), elem_type)
+
+    def load_cluster(self, cluster_name):
+        with get_cluster_lock(cluster_name):
+            return load_yaml_instance_model(get_yaml_filename(cluster_name))
+
+    def get_version(self, cluster_name):
+        try:
+            stat = os.stat(get_yaml_filename(cluster_name))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def delete_cluster(self, cluster_name):
+        with get_cluster_lock(cluster_name):
+            os.remove(get_yaml_filename(cluster_name))
+            self.compacted_sizes.pop(cluster_name, None)
+
+
+class SqliteInstanceModelStore(InstanceModelStore):
+    """
+    The last states of instances are kept in SQLite database indexed by (cluster, elem_type, template name,
+    index of instance), so node and relationship templates with the same name don't replace each other.
+    Instance model of cluster stored in YAML file is imported on the first access to the cluster
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.local = threading.local()
+        self.migrated = set()
+        self.lock = threading.Lock()
+        directory = os.path.dirname(database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.get_connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS instance_model ('
+                               'cluster_name TEXT NOT NULL, name TEXT NOT NULL, instance_index INTEGER NOT NULL, '
+                               'elem_type TEXT NOT NULL, state TEXT NOT NULL, '
+                               'PRIMARY KEY (cluster_name, elem_type, name, instance_index))')
+            connection.execute('CREATE TABLE IF NOT EXISTS migrated_clusters (cluster_name TEXT PRIMARY KEY)')
+            connection.execute('CREATE TABLE IF NOT EXISTS cluster_versions ('
+                               'cluster_name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+
+    def get_connection(self):
+        # NOTE: sqlite connections can't be shared between threads
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database, timeout=SQLITE_TIMEOUT)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self.local.connection = connection
+        return connection
+
+    def _insert(self, connection, cluster_name, elem_type, states):
+        connection.executemany('INSERT OR REPLACE INTO instance_model VALUES (?, ?, ?, ?, ?)',
+                               [(cluster_name, name, index, elem_type, yaml.dump(state, Dumper=utils.NoAliasDumper))
+                                for name, index, state in states])
+        self._increment_version(connection, cluster_name)
+
+    def _increment_version(self, connection, cluster_name):
+        connection.execute('INSERT OR IGNORE INTO cluster_versions VALUES (?, 0)', (cluster_name,))
+        connection.execute('UPDATE cluster_versions SET version = version + 1 WHERE cluster_name = ?',
+                           (cluster_name,))
+
+    def migrate(self, cluster_name, filename=None):
+        """
+        Import instance model of cluster from YAML file, it's done once per cluster.
+        The file is renamed after import because it isn't updated anymore
+        :param filename: YAML file written by YamlInstanceModelStore
+        """
+        if cluster_name in self.migrated:
+            return
+        if filename is None:
+            filename = get_yaml_filename(cluster_name)
+        with self.lock:
+            if cluster_name in self.migrated:
                 return
-            update_attributes_or_properties(cluster_name, name, curr_state, elem_type,
-                                            attributes, ATTRIBUTES, instance_model)
-            update_attributes_or_properties(cluster_name, name, curr_state, elem_type,
-                                            properties, PROPERTIES, instance_model)
+            connection = self.get_connection()
+            imported = False
+            with connection:
+                if connection.execute('SELECT 1 FROM migrated_clusters WHERE cluster_name = ?',
+                                      (cluster_name,)).fetchone() is None:
+                    if os.path.isfile(filename):
+                        logging.info("Importing instance model of cluster %s from %s" % (cluster_name, filename))
+                        states = load_yaml_instance_model(filename)
+                        for (elem_type, name, index), state in states.items():
+                            self._insert(connection, cluster_name, elem_type, [(name, index, state)])
+                        imported = True
+                    connection.execute('INSERT INTO migrated_clusters VALUES (?)', (cluster_name,))
+            if imported:
+                os.replace(filename, filename + MIGRATED_SUFFIX)
+            self.migrated.add(cluster_name)
 
+    def add_batches(self, cluster_name, batches):
+        self.migrate(cluster_name)
+        with self.get_connection() as connection:
+            for elem_type, states in batches:
+                self._insert(connection, cluster_name, elem_type, states)
 
-def update_attributes_or_properties(cluster_name, name, curr_state, elem_type, parameters, parameter_type,
-                                    instance_model):
+    def get_state(self, cluster_name, name, index, elem_type=None):
+        self.migrate(cluster_name)
+        for current_elem_type in ELEM_TYPES_ORDER if elem_type is None else (elem_type,):
+            row = self.get_connection().execute(
+                'SELECT state FROM instance_model '
+                'WHERE cluster_name = ? AND elem_type = ? AND name = ? AND instance_index = ?',
+                (cluster_name, current_elem_type, name, index)).fetchone()
+            if row is not None:
+                return yaml.load(row[0], Loader=SafeLoader)
+        return None
+
+    def load_cluster(self, cluster_name):
+        self.migrate(cluster_name)
+        rows = self.get_connection().execute(
+            'SELECT elem_type, name, instance_index, state FROM instance_model WHERE cluster_name = ?',
+            (cluster_name,))
+        return {(elem_type, name, index): yaml.load(state, Loader=SafeLoader)
+                for elem_type, name, index, state in rows}
+
+    def get_version(self, cluster_name):
+        self.migrate(cluster_name)
+        row = self.get_connection().execute('SELECT version FROM cluster_versions WHERE cluster_name = ?',
+                                            (cluster_name,)).fetchone()
+        return None if row is None else row[0]
+
+    def compact(self, cluster_name, history=None):
+        # NOTE: only the last states are kept in the database, so only write-ahead log is truncated
+        self.get_connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def delete_cluster(self, cluster_name):
+        with self.lock:
+            with self.get_connection() as connection:
+                connection.execute('DELETE FROM instance_model WHERE cluster_name = ?', (cluster_name,))
+                connection.execute('DELETE FROM migrated_clusters WHERE cluster_name = ?', (cluster_name,))
+                # NOTE: version isn't reset, so caches of other processes don't match a new cluster with the same name
+                self._increment_version(connection, cluster_name)
+            self.migrated.discard(cluster_name)
+            for filename in (get_yaml_filename(cluster_name), get_yaml_filename(cluster_name) + MIGRATED_SUFFIX):
+                if os.path.isfile(filename):
+                    os.remove(filename)
+
+
+class CachedInstanceModelStore(InstanceModelStore):
+    """
+    Instance model of cluster is loaded from the store once and is read from memory, writes are buffered
+    and flushed to the store in batches: by flush, when flush interval has passed since the previous flush
+    of the cluster, on release of the cluster and at exit. States are shared with callers, so they must
+    not be modified. Cache of cluster is revalidated under the cluster lock before every access by the version
+    of the cluster in the store, so states written by other processes are loaded again
+    """
+
+    def __init__(self, store, flush_interval=DEFAULT_INSTANCE_MODEL_FLUSH_INTERVAL):
+        self.store = store
+        self.flush_interval = flush_interval
+        # NOTE: loaded clusters in format {cluster_name: {(elem_type, template name, index of instance): state}}
+        self.clusters = {}
+        # NOTE: buffered writes in format {cluster_name: [(elem_type, states)]}
+        self.pending = {}
+        self.flushed_times = {}
+        # NOTE: versions of clusters in the store which loaded states correspond to in format {cluster_name: version}
+        self.versions = {}
+        # NOTE: the lock guards only memory, the store is called without it, so cluster locks are taken before it
+        self.lock = threading.Lock()
+
+    def _get_cluster(self, cluster_name):
+        """
+        Get states of cluster, they are loaded again if the cluster is changed in the store by other process.
+        The caller must hold the cluster lock while it uses the returned states
+        """
+        with get_cluster_lock(cluster_name):
+            version = self.store.get_version(cluster_name)
+            with self.lock:
+                states = self.clusters.get(cluster_name)
+                if states is not None and self.versions.get(cluster_name) == version:
+                    return states
+            if states is not None:
+                logging.debug("Instance model of cluster %s is changed by other process, it's loaded again"
+                              % cluster_name)
+            states = self.store.load_cluster(cluster_name)
+            with self.lock:
+                # NOTE: writes of this process which aren't flushed yet are applied over the loaded states
+                for elem_type, batch_states in self.pending.get(cluster_name, []):
+                    for name, index, state in batch_states:
+                        states[(elem_type, name, index)] = state
+                self.clusters[cluster_name] = states
+                self.versions[cluster_name] = version
+                self.flushed_times.setdefault(cluster_name, time.time())
+            return states
+
+    def add_batches(self, cluster_name, batches):
+        with get_cluster_lock(cluster_name):
+            cluster = self._get_cluster(cluster_name)
+            with self.lock:
+                for elem_type, states in batches:
+                    for name, index, state in states:
+                        cluster[(elem_type, name, index)] = state
+                self.pending.setdefault(cluster_name, []).extend(batches)
+                is_overdue = time.time() - self.flushed_times.get(cluster_name, 0) >= self.flush_interval
+            if is_overdue:
+                self.flush(cluster_name)
+
+    def get_state(self, cluster_name, name, index, elem_type=None):
+        with get_cluster_lock(cluster_name):
+            cluster = self._get_cluster(cluster_name)
+            for current_elem_type in ELEM_TYPES_ORDER if elem_type is None else (elem_type,):
+                state = cluster.get((current_elem_type, name, index))
+                if state is not None:
+                    return state
+        return None
+
+    def load_cluster(self, cluster_name):
+        with get_cluster_lock(cluster_name):
+            cluster = self._get_cluster(cluster_name)
+            with self.lock:
+                return dict(cluster)
+
+    def _update_store(self, cluster_name, update, *args):
+        """
+        Call update of the store, loaded states stay valid if the cluster wasn't changed by other process before.
+        The caller must hold the cluster lock
+        """
+        version = self.store.get_version(cluster_name)
+        update(cluster_name, *args)
+        new_version = self.store.get_version(cluster_name)
+        with self.lock:
+            if cluster_name in self.versions and self.versions[cluster_name] == version:
+                self.versions[cluster_name] = new_version
+
+    def flush(self, cluster_name=None):
+        """
+        Write buffered states to the store
+        :param cluster_name: cluster which states are written, all clusters if None
+        """
+        if cluster_name is None:
+            with self.lock:
+                cluster_names = list(self.pending.keys())
+            for name in cluster_names:
+                self.flush(name)
+            return
+        with get_cluster_lock(cluster_name):
+            with self.lock:
+                batches = self.pending.pop(cluster_name, [])
+                self.flushed_times[cluster_name] = time.time()
+            if not batches:
+                return
+            try:
+                self._update_store(cluster_name, self.store.add_batches, batches)
+            except Exception:
+                with self.lock:
+                    self.pending[cluster_name] = batches + self.pending.get(cluster_name, [])
+                raise
+
+    def release(self, cluster_name):
+        """
+        Flush states of cluster and unload it, so the next translation reads it from the store again
+        """
+        with get_cluster_lock(cluster_name):
+            self.flush(cluster_name)
+            with self.lock:
+                self.clusters.pop(cluster_name, None)
+                self.flushed_times.pop(cluster_name, None)
+                self.versions.pop(cluster_name, None)
+
+    def compact(self, cluster_name, history=None):
+        with get_cluster_lock(cluster_name):
+            self.flush(cluster_name)
+            self._update_store(cluster_name, self.store.compact, history)
+
+    def delete_cluster(self, cluster_name):
+        with get_cluster_lock(cluster_name):
+            with self.lock:
+                self.pending.pop(cluster_name, None)
+                self.clusters.pop(cluster_name, None)
+                self.flushed_times.pop(cluster_name, None)
+                self.versions.pop(cluster_name, None)
+            self.store.delete_cluster(cluster_name)
+
+
+def flush_stores():
+    for store in list(_stores.values()):
+        try:
+            store.flush()
+        except Exception as e:
+            logging.error("Failed to write instance model: %s" % e)
+
+
+# NOTE: buffered states of instance model are written when the process exits
+atexit.register(flush_stores)
+
+
+def get_instance_model_store():
+    """
+    Get store of instance model configured in Ansible configuration. The store is resolved once and is reused
+    until mtime of configuration file is changed, so the configuration isn't read for every operation
+    """
+    current_store = _current_store
+    if current_store is not None:
+        config_filename, mtime, store = current_store
+        try:
+            if os.path.getmtime(config_filename) == mtime:
+                return store
+        except OSError:
+            pass
+    return resolve_instance_model_store()
+
+
+def resolve_instance_model_store():
+    """
+    Read parameters of instance model from Ansible configuration and get the store with these parameters
+    """
+    global _current_store
+    config = ConfigurationToolConfiguration(ANSIBLE)
+    main_config = config.get_section('main')
+    backend = main_config.get(INSTANCE_MODEL_BACKEND) or SQLITE_BACKEND
+    if backend not in INSTANCE_MODEL_BACKENDS:
+        logging.error("Configuration parameter \'%s\' should be one of %s" % (INSTANCE_MODEL_BACKEND,
+                                                                             INSTANCE_MODEL_BACKENDS))
+        raise Exception("Configuration parameter \'%s\' should be one of %s" % (INSTANCE_MODEL_BACKEND,
+                                                                               INSTANCE_MODEL_BACKENDS))
+    database = None
+    if backend == SQLITE_BACKEND:
+        # NOTE: instance model is needed to delete deployed clusters, so it's kept in the data directory of user,
+        # not in temporary directory, relative path is relative to the directory of configuration file
+        database = main_config.get(INSTANCE_MODEL_DATABASE)
+        if database:
+            database = os.path.join(config.config_directory, database)
+        else:
+            database = os.path.join(utils.get_data_clouni_dir(), DEFAULT_INSTANCE_MODEL_DATABASE)
+    cache = str(main_config.get(INSTANCE_MODEL_CACHE, True)).lower() not in ('false', 'no', '0')
+    flush_interval = float(main_config.get(INSTANCE_MODEL_FLUSH_INTERVAL, DEFAULT_INSTANCE_MODEL_FLUSH_INTERVAL))
+    history = int(main_config.get(INSTANCE_MODEL_HISTORY, 0))
+    compaction_size = int(main_config.get(INSTANCE_MODEL_COMPACTION_SIZE, DEFAULT_INSTANCE_MODEL_COMPACTION_SIZE))
+    compaction_ratio = float(main_config.get(INSTANCE_MODEL_COMPACTION_RATIO, DEFAULT_INSTANCE_MODEL_COMPACTION_RATIO))
+    key = (backend, database, cache, flush_interval, history, compaction_size, compaction_ratio)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == SQLITE_BACKEND:
+                store = SqliteInstanceModelStore(database)
+            else:
+                store = YamlInstanceModelStore(history, compaction_size, compaction_ratio)
+            if cache:
+                store = CachedInstanceModelStore(store, flush_interval)
+            _stores[key] = store
+        _current_store = (config.config_filename, config.parsed_config.mtime, store)
+        return store
+
+
+def init_instance_model(cluster_name, topology_template, delete):
+    """
+    Save initial states of all node and relationship templates of topology template in one transaction
+    """
+    if delete:
+        return
+    batches = {}
+    for templates in (topology_template.get(NODE_TEMPLATES), topology_template.get(RELATIONSHIP_TEMPLATES)):
+        for name, tmpl in (templates or {}).items():
+            batches.setdefault(get_elem_type(tmpl[TYPE]), []).append((name, 1, tmpl))
+    if not batches:
+        return
+    store = get_instance_model_store()
+    with get_cluster_lock(cluster_name):
+        store.add_batches(cluster_name, copy.deepcopy(list(batches.items())))
+
+
+def update_instance_model(cluster_name, tmpl, type, name, attributes, properties, delete, init=False):
+    if delete:
+        return
+    elem_type = get_elem_type(type)
+    store = get_instance_model_store()
+    with get_cluster_lock(cluster_name):
+        if init:
+            store.add_states(cluster_name, elem_type, [(name, 1, copy.deepcopy(tmpl))])
+            return
+        states = {}
+        update_attributes_or_properties(store, cluster_name, name, states, attributes, ATTRIBUTES, elem_type)
+        update_attributes_or_properties(store, cluster_name, name, states, properties, PROPERTIES, elem_type)
+        if states:
+            store.add_states(cluster_name, elem_type, [(name, index, state) for index, state in states.items()])
+
+
+def update_attributes_or_properties(store, cluster_name, name, states, parameters, parameter_type, elem_type=None):
+    """
+    :param states: states updated by the current call in format {index: state}, they are saved together
+    """
     for i in range(len(parameters)):
-        tmpl = get_actual_state_of_instance_model(cluster_name, name, i + 1, init=True)
+        tmpl = states.get(i + 1)
+        if tmpl is None:
+            tmpl = get_actual_state_of_instance_model(cluster_name, name, i + 1, init=True, store=store,
+                                                      elem_type=elem_type)
         if not tmpl:
             logging.error('Cant get actual state of template with name: %s' % name)
             raise Exception('Cant get actual state of template with name: %s' % name)
-        curr_state[elem_type][name + '_' + str(i + 1)] = utils.deep_update_dict(copy.deepcopy(tmpl),
-                                                                                {parameter_type: parameters[i]})
-        print(yaml.dump([curr_state], Dumper=utils.NoAliasDumper), file=instance_model, flush=True)
+        states[i + 1] = utils.deep_update_dict(copy.deepcopy(tmpl), {parameter_type: parameters[i]})
 
 
-def get_elem(curr_state, name):
+def get_elem(curr_state, name, elem_type=None):
     for elem in curr_state[::-1]:
-        if elem.get(NODE_TEMPLATES) and name in elem.get(NODE_TEMPLATES):
-            return elem[NODE_TEMPLATES][name]
-        if elem.get(RELATIONSHIP_TEMPLATES) and name in elem.get(RELATIONSHIP_TEMPLATES):
-            return elem[RELATIONSHIP_TEMPLATES][name]
+        for current_elem_type in ELEM_TYPES_ORDER if elem_type is None else (elem_type,):
+            if elem.get(current_elem_type) and name in elem.get(current_elem_type):
+                return elem[current_elem_type][name]
     return None
 
 
-def get_actual_state_of_instance_model(cluster_name, name, index, init=False):
-    with open('instance_model_' + cluster_name + '.yaml', 'r+') as instance_model:
-        curr_state = yaml.load(instance_model, Loader=Loader)
-        elem = get_elem(curr_state, name + '_' + str(index))
-        if elem:
-            return elem
-        if init:
-            # if can't find elem in template with index - get from 1 index
-            return get_elem(curr_state, name + '_' + '1')
-        return None
+def get_actual_state_of_instance_model(cluster_name, name, index, init=False, store=None, elem_type=None):
+    if store is None:
+        store = get_instance_model_store()
+    elem = store.get_state(cluster_name, name, index, elem_type)
+    if elem:
+        return elem
+    if init:
+        # if can't find elem in template with index - get from 1 index
+        return store.get_state(cluster_name, name, 1, elem_type)
+    return None
+
+
+def flush_instance_model(cluster_name):
+    get_instance_model_store().flush(cluster_name)
+
+
+def release_instance_model(cluster_name):
+    get_instance_model_store().release(cluster_name)
+
+
+def compact_instance_model(cluster_name, history=None):
+    """
+    Rewrite instance model of cluster to the last states of instances
+    :param history: number of previous states kept for every instance, instance_model_history if None
+    """
+    get_instance_model_store().compact(cluster_name, history)
 
 
 def delete_cluster_from_instance_model(cluster_name):
-    os.remove('instance_model_' + cluster_name + '.yaml')
+    get_instance_model_store().delete_cluster(cluster_name)
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0b\x63otea.proto\"<\n\x0fStartSessionMSG\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\n\n\x02ID\x18\x02 \x01(\t\x12\x11\n\terror_msg\x18\x03 \x01(\t\"\x1f\n\tSessionID\x12\x12\n\nsession_ID\x18\x01 \x01(\t\"\n\n\x08\x45mptyMsg\"+\n\rMapFieldEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\"\xa6\x01\n\x06\x43onfig\x12\x12\n\nsession_ID\x18\x01 \x01(\t\x12\r\n\x05hosts\x18\x02 \x01(\t\x12\x10\n\x08inv_path\x18\x03 \x01(\t\x12\x12\n\nextra_vars\x18\x04 \x01(\t\x12 \n\x08\x65nv_vars\x18\x05 \x03(\x0b\x32\x0e.MapFieldEntry\x12\x17\n\x0f\x61nsible_library\x18\x06 \x01(\t\x12\x18\n\x10not_gather_facts\x18\x07 \x01(\x08\"\x98\x01\n\x0cWorkerConfig\x12\r\n\x05hosts\x18\x01 \x01(\t\x12\x10\n\x08inv_path\x18\x02 \x01(\t\x12\x12\n\nextra_vars\x18\x03 \x01(\t\x12 \n\x08\x65nv_vars\x18\x04 \x03(\x0b\x32\x0e.MapFieldEntry\x12\x17\n\x0f\x61nsible_library\x18\x05 \x01(\t\x12\x18\n\x10not_gather_facts\x18\x06 \x01(\x08\"=\n\x04Task\x12\x12\n\nsession_ID\x18\x01 \x01(\t\x12\x10\n\x08task_str\x18\x02 \x01(\t\x12\x0f\n\x07is_dict\x18\x03 \x01(\x08\"/\n\nWorkerTask\x12\x10\n\x08task_str\x18\x01 \x01(\t\x12\x0f\n\x07is_dict\x18\x02 \x01(\x08\"\x80\x02\n\nTaskResult\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10results_dict_str\x18\x02 \x01(\t\x12\x11\n\ttask_name\x18\x03 \x01(\t\x12\x12\n\nis_changed\x18\x04 \x01(\x08\x12\x11\n\tis_failed\x18\x05 \x01(\x08\x12\x12\n\nis_skipped\x18\x06 \x01(\x08\x12\x16\n\x0eis_unreachable\x18\x07 \x01(\x08\x12\x19\n\x11is_ignored_errors\x18\x08 \x01(\x08\x12\x1e\n\x16is_ignored_unreachable\x18\t \x01(\x08\x12\x0e\n\x06stdout\x18\n \x01(\t\x12\x0e\n\x06stderr\x18\x0b \x01(\t\x12\x0b\n\x03msg\x18\x0c \x01(\t\"c\n\x0bTaskResults\x12\x16\n\x0etask_adding_ok\x18\x01 \x01(\x08\x12\x19\n\x11task_adding_error\x18\x02 \x01(\t\x12!\n\x0ctask_results\x18\x03 \x03(\x0b\x32\x0b.TaskResult\"\'\n\x06Status\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x11\n\terror_msg\x18\x02 \x01(\t\"X\n\x12WorkerHealthStatus\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10\x65xecutions_count\x18\x02 \x01(\x05\x12\x1c\n\x14\x65xecuted_tasks_count\x18\x03 \x01(\x05\x32\xac\x01\n\x0c\x43oteaGateway\x12-\n\x0cStartSession\x12\t.EmptyMsg\x1a\x10.StartSessionMSG\"\x00\x12#\n\rInitExecution\x12\x07.Config\x1a\x07.Status\"\x00\x12 \n\x07RunTask\x12\x05.Task\x1a\x0c.TaskResults\"\x00\x12&\n\rStopExecution\x12\n.SessionID\x1a\x07.Status\"\x00\x32\xb8\x01\n\x0b\x43oteaWorker\x12)\n\rInitExecution\x12\r.WorkerConfig\x1a\x07.Status\"\x00\x12&\n\x07RunTask\x12\x0b.WorkerTask\x1a\x0c.TaskResults\"\x00\x12%\n\rStopExecution\x12\t.EmptyMsg\x1a\x07.Status\"\x00\x12/\n\x0bHealthCheck\x12\t.EmptyMsg\x1a\x13.WorkerHealthStatus\"\x00\x62\x06proto3'
+  serialized_pb=b'\n\x0b\x63otea.proto\"<\n\x0fStartSessionMSG\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\n\n\x02ID\x18\x02 \x01(\t\x12\x11\n\terror_msg\x18\x03 \x01(\t\"\x1f\n\tSessionID\x12\x12\n\nsession_ID\x18\x01 \x01(\t\"\n\n\x08\x45mptyMsg\"+\n\rMapFieldEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\"\xa6\x01\n\x06\x43onfig\x12\x12\n\nsession_ID\x18\x01 \x01(\t\x12\r\n\x05hosts\x18\x02 \x01(\t\x12\x10\n\x08inv_path\x18\x03 \x01(\t\x12\x12\n\nextra_vars\x18\x04 \x01(\t\x12 \n\x08\x65nv_vars\x18\x05 \x03(\x0b\x32\x0e.MapFieldEntry\x12\x17\n\x0f\x61nsible_library\x18\x06 \x01(\t\x12\x18\n\x10not_gather_facts\x18\x07 \x01(\x08\"\x98\x01\n\x0cWorkerConfig\x12\r\n\x05hosts\x18\x01 \x01(\t\x12\x10\n\x08inv_path\x18\x02 \x01(\t\x12\x12\n\nextra_vars\x18\x03 \x01(\t\x12 \n\x08\x65nv_vars\x18\x04 \x03(\x0b\x32\x0e.MapFieldEntry\x12\x17\n\x0f\x61nsible_library\x18\x05 \x01(\t\x12\x18\n\x10not_gather_facts\x18\x06 \x01(\x08\"=\n\x04Task\x12\x12\n\nsession_ID\x18\x01 \x01(\t\x12\x10\n\x08task_str\x18\x02 \x01(\t\x12\x0f\n\x07is_dict\x18\x03 \x01(\x08\"B\n\x08TaskList\x12\x12\n\nsession_ID\x18\x01 \x01(\t\x12\x11\n\ttask_strs\x18\x02 \x03(\t\x12\x0f\n\x07is_dict\x18\x03 \x01(\x08\"/\n\nWorkerTask\x12\x10\n\x08task_str\x18\x01 \x01(\t\x12\x0f\n\x07is_dict\x18\x02 \x01(\x08\"\x80\x02\n\nTaskResult\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10results_dict_str\x18\x02 \x01(\t\x12\x11\n\ttask_name\x18\x03 \x01(\t\x12\x12\n\nis_changed\x18\x04 \x01(\x08\x12\x11\n\tis_failed\x18\x05 \x01(\x08\x12\x12\n\nis_skipped\x18\x06 \x01(\x08\x12\x16\n\x0eis_unreachable\x18\x07 \x01(\x08\x12\x19\n\x11is_ignored_errors\x18\x08 \x01(\x08\x12\x1e\n\x16is_ignored_unreachable\x18\t \x01(\x08\x12\x0e\n\x06stdout\x18\n \x01(\t\x12\x0e\n\x06stderr\x18\x0b \x01(\t\x12\x0b\n\x03msg\x18\x0c \x01(\t\"c\n\x0bTaskResults\x12\x16\n\x0etask_adding_ok\x18\x01 \x01(\x08\x12\x19\n\x11task_adding_error\x18\x02 \x01(\t\x12!\n\x0ctask_results\x18\x03 \x03(\x0b\x32\x0b.TaskResult\"0\n\x0fTaskListResults\x12\x1d\n\x07results\x18\x01 \x03(\x0b\x32\x0c.TaskResults\"\'\n\x06Status\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x11\n\terror_msg\x18\x02 \x01(\t\"X\n\x12WorkerHealthStatus\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10\x65xecutions_count\x18\x02 \x01(\x05\x12\x1c\n\x14\x65xecuted_tasks_count\x18\x03 \x01(\x05\";\n\x13GatewayHealthStatus\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x18\n\x10\x65xecutions_count\x18\x02 \x01(\x05\x32\x89\x02\n\x0c\x43oteaGateway\x12-\n\x0cStartSession\x12\t.EmptyMsg\x1a\x10.StartSessionMSG\"\x00\x12#\n\rInitExecution\x12\x07.Config\x1a\x07.Status\"\x00\x12 \n\x07RunTask\x12\x05.Task\x1a\x0c.TaskResults\"\x00\x12)\n\x08RunTasks\x12\t.TaskList\x1a\x10.TaskListResults\"\x00\x12&\n\rStopExecution\x12\n.SessionID\x1a\x07.Status\"\x00\x12\x30\n\x0bHealthCheck\x12\t.EmptyMsg\x1a\x14.GatewayHealthStatus\"\x00\x32\xb8\x01\n\x0b\x43oteaWorker\x12)\n\rInitExecution\x12\r.WorkerConfig\x1a\x07.Status\"\x00\x12&\n\x07RunTask\x12\x0b.WorkerTask\x1a\x0c.TaskResults\"\x00\x12%\n\rStopExecution\x12\t.EmptyMsg\x1a\x07.Status\"\x00\x12/\n\x0bHealthCheck\x12\t.EmptyMsg\x1a\x13.WorkerHealthStatus\"\x00\x62\x06proto3'
 )
 
 
@@ -354,6 +354,52 @@ _TASK = _descriptor.Descriptor(
 )
 
 
+_TASKLIST = _descriptor.Descriptor(
+  name='TaskList',
+  full_name='TaskList',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='session_ID', full_name='TaskList.session_ID', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='task_strs', full_name='TaskList.task_strs', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='is_dict', full_name='TaskList.is_dict', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=554,
+  serialized_end=620,
+)
+
+
 _WORKERTASK = _descriptor.Descriptor(
   name='WorkerTask',
   full_name='WorkerTask',
@@ -388,8 +434,8 @@ _WORKERTASK = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=554,
-  serialized_end=601,
+  serialized_start=622,
+  serialized_end=669,
 )
 
 
@@ -497,8 +543,8 @@ _TASKRESULT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=604,
-  serialized_end=860,
+  serialized_start=672,
+  serialized_end=928,
 )
 
 
@@ -543,8 +589,40 @@ _TASKRESULTS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=862,
-  serialized_end=961,
+  serialized_start=930,
+  serialized_end=1029,
+)
+
+
+_TASKLISTRESULTS = _descriptor.Descriptor(
+  name='TaskListResults',
+  full_name='TaskListResults',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='results', full_name='TaskListResults.results', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1031,
+  serialized_end=1079,
 )
 
 
@@ -582,8 +660,8 @@ _STATUS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=963,
-  serialized_end=1002,
+  serialized_start=1081,
+  serialized_end=1120,
 )
 
 
@@ -628,13 +706,53 @@ _WORKERHEALTHSTATUS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1004,
-  serialized_end=1092,
+  serialized_start=1122,
+  serialized_end=1210,
+)
+
+
+_GATEWAYHEALTHSTATUS = _descriptor.Descriptor(
+  name='GatewayHealthStatus',
+  full_name='GatewayHealthStatus',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='ok', full_name='GatewayHealthStatus.ok', index=0,
+      number=1, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='executions_count', full_name='GatewayHealthStatus.executions_count', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1212,
+  serialized_end=1271,
 )
 
 _CONFIG.fields_by_name['env_vars'].message_type = _MAPFIELDENTRY
 _WORKERCONFIG.fields_by_name['env_vars'].message_type = _MAPFIELDENTRY
 _TASKRESULTS.fields_by_name['task_results'].message_type = _TASKRESULT
+_TASKLISTRESULTS.fields_by_name['results'].message_type = _TASKRESULTS
 DESCRIPTOR.message_types_by_name['StartSessionMSG'] = _STARTSESSIONMSG
 DESCRIPTOR.message_types_by_name['SessionID'] = _SESSIONID
 DESCRIPTOR.message_types_by_name['EmptyMsg'] = _EMPTYMSG
@@ -642,11 +760,14 @@ DESCRIPTOR.message_types_by_name['MapFieldEntry'] = _MAPFIELDENTRY
 DESCRIPTOR.message_types_by_name['Config'] = _CONFIG
 DESCRIPTOR.message_types_by_name['WorkerConfig'] = _WORKERCONFIG
 DESCRIPTOR.message_types_by_name['Task'] = _TASK
+DESCRIPTOR.message_types_by_name['TaskList'] = _TASKLIST
 DESCRIPTOR.message_types_by_name['WorkerTask'] = _WORKERTASK
 DESCRIPTOR.message_types_by_name['TaskResult'] = _TASKRESULT
 DESCRIPTOR.message_types_by_name['TaskResults'] = _TASKRESULTS
+DESCRIPTOR.message_types_by_name['TaskListResults'] = _TASKLISTRESULTS
 DESCRIPTOR.message_types_by_name['Status'] = _STATUS
 DESCRIPTOR.message_types_by_name['WorkerHealthStatus'] = _WORKERHEALTHSTATUS
+DESCRIPTOR.message_types_by_name['GatewayHealthStatus'] = _GATEWAYHEALTHSTATUS
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 StartSessionMSG = _reflection.GeneratedProtocolMessageType('StartSessionMSG', (_message.Message,), {
@@ -698,6 +819,13 @@ Task = _reflection.GeneratedProtocolMessageType('Task', (_message.Message,), {
   })
 _sym_db.RegisterMessage(Task)
 
+TaskList = _reflection.GeneratedProtocolMessageType('TaskList', (_message.Message,), {
+  'DESCRIPTOR' : _TASKLIST,
+  '__module__' : 'cotea_pb2'
+  # @@protoc_insertion_point(class_scope:TaskList)
+  })
+_sym_db.RegisterMessage(TaskList)
+
 WorkerTask = _reflection.GeneratedProtocolMessageType('WorkerTask', (_message.Message,), {
   'DESCRIPTOR' : _WORKERTASK,
   '__module__' : 'cotea_pb2'
@@ -719,6 +847,13 @@ TaskResults = _reflection.GeneratedProtocolMessageType('TaskResults', (_message.
   })
 _sym_db.RegisterMessage(TaskResults)
 
+TaskListResults = _reflection.GeneratedProtocolMessageType('TaskListResults', (_message.Message,), {
+  'DESCRIPTOR' : _TASKLISTRESULTS,
+  '__module__' : 'cotea_pb2'
+  # @@protoc_insertion_point(class_scope:TaskListResults)
+  })
+_sym_db.RegisterMessage(TaskListResults)
+
 Status = _reflection.GeneratedProtocolMessageType('Status', (_message.Message,), {
   'DESCRIPTOR' : _STATUS,
   '__module__' : 'cotea_pb2'
@@ -733,6 +868,13 @@ WorkerHealthStatus = _reflection.GeneratedProtocolMessageType('WorkerHealthStatu
   })
 _sym_db.RegisterMessage(WorkerHealthStatus)
 
+GatewayHealthStatus = _reflection.GeneratedProtocolMessageType('GatewayHealthStatus', (_message.Message,), {
+  'DESCRIPTOR' : _GATEWAYHEALTHSTATUS,
+  '__module__' : 'cotea_pb2'
+  # @@protoc_insertion_point(class_scope:GatewayHealthStatus)
+  })
+_sym_db.RegisterMessage(GatewayHealthStatus)
+
 
 
 _COTEAGATEWAY = _descriptor.ServiceDescriptor(
@@ -742,8 +884,8 @@ _COTEAGATEWAY = _descriptor.ServiceDescriptor(
   index=0,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1095,
-  serialized_end=1267,
+  serialized_start=1274,
+  serialized_end=1539,
   methods=[
   _descriptor.MethodDescriptor(
     name='StartSession',
@@ -775,16 +917,36 @@ _COTEAGATEWAY = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='RunTasks',
+    full_name='CoteaGateway.RunTasks',
+    index=3,
+    containing_service=None,
+    input_type=_TASKLIST,
+    output_type=_TASKLISTRESULTS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
   _descriptor.MethodDescriptor(
     name='StopExecution',
     full_name='CoteaGateway.StopExecution',
-    index=3,
+    index=4,
     containing_service=None,
     input_type=_SESSIONID,
     output_type=_STATUS,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='HealthCheck',
+    full_name='CoteaGateway.HealthCheck',
+    index=5,
+    containing_service=None,
+    input_type=_EMPTYMSG,
+    output_type=_GATEWAYHEALTHSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_COTEAGATEWAY)
 
@@ -798,8 +960,8 @@ _COTEAWORKER = _descriptor.ServiceDescriptor(
   index=1,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1270,
-  serialized_end=1454,
+  serialized_start=1542,
+  serialized_end=1726,
   methods=[
   _descriptor.MethodDescriptor(
     name='InitExecution',
@@ -29,11 +29,21 @@ class CoteaGatewayStub(object):
                 request_serializer=cotea__pb2.Task.SerializeToString,
                 response_deserializer=cotea__pb2.TaskResults.FromString,
                 )
+        self.RunTasks = channel.unary_unary(
+                '/CoteaGateway/RunTasks',
+                request_serializer=cotea__pb2.TaskList.SerializeToString,
+                response_deserializer=cotea__pb2.TaskListResults.FromString,
+                )
         self.StopExecution = channel.unary_unary(
                 '/CoteaGateway/StopExecution',
                 request_serializer=cotea__pb2.SessionID.SerializeToString,
                 response_deserializer=cotea__pb2.Status.FromString,
                 )
+        self.HealthCheck = channel.unary_unary(
+                '/CoteaGateway/HealthCheck',
+                request_serializer=cotea__pb2.EmptyMsg.SerializeToString,
+                response_deserializer=cotea__pb2.GatewayHealthStatus.FromString,
+                )
 
 
 class CoteaGatewayServicer(object):
@@ -57,12 +67,26 @@ class CoteaGatewayServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RunTasks(self, request, context):
+        """runs tasks in order until the first failed one, results are returned only for the executed tasks
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def StopExecution(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def HealthCheck(self, request, context):
+        """load of the gateway: number of executions run by all its workers
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_CoteaGatewayServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -81,11 +105,21 @@ def add_CoteaGatewayServicer_to_server(servicer, server):
                     request_deserializer=cotea__pb2.Task.FromString,
                     response_serializer=cotea__pb2.TaskResults.SerializeToString,
             ),
+            'RunTasks': grpc.unary_unary_rpc_method_handler(
+                    servicer.RunTasks,
+                    request_deserializer=cotea__pb2.TaskList.FromString,
+                    response_serializer=cotea__pb2.TaskListResults.SerializeToString,
+            ),
             'StopExecution': grpc.unary_unary_rpc_method_handler(
                     servicer.StopExecution,
                     request_deserializer=cotea__pb2.SessionID.FromString,
                     response_serializer=cotea__pb2.Status.SerializeToString,
             ),
+            'HealthCheck': grpc.unary_unary_rpc_method_handler(
+                    servicer.HealthCheck,
+                    request_deserializer=cotea__pb2.EmptyMsg.FromString,
+                    response_serializer=cotea__pb2.GatewayHealthStatus.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'CoteaGateway', rpc_method_handlers)
@@ -147,6 +181,23 @@ class CoteaGateway(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def RunTasks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/CoteaGateway/RunTasks',
+            cotea__pb2.TaskList.SerializeToString,
+            cotea__pb2.TaskListResults.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def StopExecution(request,
             target,
@@ -164,6 +215,23 @@ class CoteaGateway(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def HealthCheck(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/CoteaGateway/HealthCheck',
+            cotea__pb2.EmptyMsg.SerializeToString,
+            cotea__pb2.GatewayHealthStatus.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class CoteaWorkerStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -1,45 +1,312 @@
+import asyncio
+import atexit
 import json
 import logging
 import os
+import itertools
 import random
 import time
-from threading import Thread
+from threading import Thread, Lock, Event
 
 import grpc
+from grpc import aio
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 from configuration_tool.common import utils
 from configuration_tool.common.tosca_reserved_keys import ATTRIBUTES, OUTPUTS, PROPERTIES
 
 from configuration_tool.configuration_tools.ansible.runner import cotea_pb2_grpc
 from configuration_tool.configuration_tools.ansible.runner.cotea_pb2 import EmptyMsg, Config, MapFieldEntry, \
-    Task, SessionID
+    Task, SessionID, TaskList
 
 SEPARATOR = '.'
+DEFAULT_MAX_PARALLEL_OPERATIONS = 32
+# NOTE: sessions which are not needed anymore are stopped with short timeout, so unavailable cotea doesn't block exit
+DISCARD_SESSION_TIMEOUT = 10
+# NOTE: load of cotea gateways is requested not more often than every HEALTH_CHECK_INTERVAL seconds,
+# failed gateways are not used for EJECTION_TIME seconds and then are checked again
+HEALTH_CHECK_INTERVAL = 5
+HEALTH_CHECK_TIMEOUT = 5
+EJECTION_TIME = 30
+
+CHANNEL_OPTIONS = [('grpc.max_send_message_length', 100 * 1024 * 1024),
+                   ('grpc.max_receive_message_length', 100 * 1024 * 1024),
+                   # NOTE: servers with default settings reject pings sent more often than every 5 minutes
+                   ('grpc.keepalive_time_ms', 300000),
+                   ('grpc.keepalive_timeout_ms', 20000)]
+
+# endpoints of cotea without RunTasks
+_batch_unsupported_endpoints = set()
+
+_async_runner = None
+_async_runner_lock = Lock()
+# NOTE: compiled rules of result extraction in format {(rules of provider, operation): TaskResultExtractor}
+_result_extractors = {}
+
+
+class OperationError(Exception):
+    """
+    Exception of operation run, it is passed to the queue instead of the result
+    """
+    def __init__(self, name, operation, error):
+        super(OperationError, self).__init__(str(error))
+        self.name = name
+        self.operation = operation
+        self.error = error
+
+
+class SessionUnusableError(Exception):
+    """
+    Reused session of cotea doesn't accept tasks
+    """
+    pass
+
+
+def get_endpoints(grpc_cotea_endpoint):
+    """
+    :param grpc_cotea_endpoint: endpoint of cotea or comma-separated list of endpoints
+    :return: list of endpoints
+    """
+    return [endpoint.strip() for endpoint in grpc_cotea_endpoint.split(',') if endpoint.strip()]
+
+
+class CoteaEndpointState(object):
+    def __init__(self):
+        # NOTE: executions of other clients reported by the last HealthCheck, 0 if gateway doesn't implement it
+        self.external_load = 0
+        self.in_flight = 0
+        self.checked_time = None
+        self.checking = False
+        self.ejected_until = None
+
+
+class CoteaEndpointBalancer(object):
+    """
+    Spreads sessions among several cotea gateways by least load. Load of gateway is the number of executions:
+    operations run on it by this process plus executions of other clients reported by HealthCheck of gateway.
+    Gateways which fail health check or are unavailable are ejected and admitted again after successful
+    health check
+    """
+    def __init__(self, check_interval=HEALTH_CHECK_INTERVAL, ejection_time=EJECTION_TIME):
+        self.check_interval = check_interval
+        self.ejection_time = ejection_time
+        self.states = {}
+        self.lock = Lock()
+
+    def _get_state(self, grpc_cotea_endpoint):
+        state = self.states.get(grpc_cotea_endpoint)
+        if state is None:
+            state = CoteaEndpointState()
+            self.states[grpc_cotea_endpoint] = state
+        return state
+
+    def get_load(self, state):
+        return state.in_flight + state.external_load
+
+    def get_endpoints_to_check(self, endpoints):
+        """
+        Mark endpoints which health must be checked by the caller, the result must be passed to set_health
+        or set_health_error. Single endpoint is never checked as there is no choice
+        """
+        if len(endpoints) < 2:
+            return []
+        now = time.time()
+        to_check = []
+        with self.lock:
+            for grpc_cotea_endpoint in endpoints:
+                state = self._get_state(grpc_cotea_endpoint)
+                if state.checking:
+                    continue
+                if state.ejected_until is not None:
+                    if now < state.ejected_until:
+                        continue
+                elif state.checked_time is not None and now - state.checked_time < self.check_interval:
+                    continue
+                state.checking = True
+                to_check.append(grpc_cotea_endpoint)
+        return to_check
+
+    def set_health(self, grpc_cotea_endpoint, ok, executions_count=None):
+        """
+        :param executions_count: number of executions on gateway including operations of this process,
+        None if gateway doesn't report it
+        """
+        if not ok:
+            self.eject(grpc_cotea_endpoint, "health check failed")
+            return
+        with self.lock:
+            state = self._get_state(grpc_cotea_endpoint)
+            state.checking = False
+            state.checked_time = time.time()
+            state.external_load = 0
+            if executions_count is not None:
+                state.external_load = max(0, executions_count - state.in_flight)
+            if state.ejected_until is not None:
+                logging.info("Grpc cotea %s is admitted again" % grpc_cotea_endpoint)
+                state.ejected_until = None
+
+    def set_health_error(self, grpc_cotea_endpoint, error):
+        if error.code() == grpc.StatusCode.UNIMPLEMENTED:
+            self.set_health(grpc_cotea_endpoint, True)
+        else:
+            self.eject(grpc_cotea_endpoint, error)
+
+    def eject(self, grpc_cotea_endpoint, reason):
+        with self.lock:
+            state = self._get_state(grpc_cotea_endpoint)
+            state.checking = False
+            state.checked_time = time.time()
+            if state.ejected_until is None:
+                logging.warning("Grpc cotea %s is ejected for %s seconds: %s" %
+                                (grpc_cotea_endpoint, self.ejection_time, reason))
+            state.ejected_until = state.checked_time + self.ejection_time
+
+    def get_available(self, endpoints):
+        with self.lock:
+            return [e for e in endpoints if self._get_state(e).ejected_until is None]
+
+    def acquire(self, endpoints):
+        """
+        Take the least loaded of available endpoints, all endpoints are tried if none is available
+        :param endpoints: list of endpoints to choose from
+        :return: endpoint which must be passed to release after the run
+        """
+        with self.lock:
+            states = [(e, self._get_state(e)) for e in endpoints]
+            available = [(e, state) for e, state in states if state.ejected_until is None]
+            if not available:
+                if len(endpoints) > 1:
+                    logging.warning("All grpc cotea endpoints are ejected: %s" % ', '.join(endpoints))
+                available = states
+            grpc_cotea_endpoint, state = min(available, key=lambda item: self.get_load(item[1]))
+            state.in_flight += 1
+        return grpc_cotea_endpoint
+
+    def release(self, grpc_cotea_endpoint):
+        with self.lock:
+            self._get_state(grpc_cotea_endpoint).in_flight -= 1
+
+    def get_in_flight(self, grpc_cotea_endpoint):
+        with self.lock:
+            return self._get_state(grpc_cotea_endpoint).in_flight
+
+
+endpoint_balancer = CoteaEndpointBalancer()
+
+
+def acquire_endpoint(endpoints, hosts, ansible_library, extra_vars, extra_env, session_idle_timeout):
+    """
+    Choose endpoint of cotea for the run, idle session on any available endpoint is preferred to new session
+    :return: tuple (endpoint, key of the session pool or None, id of idle session or None)
+    """
+    if session_idle_timeout > 0:
+        for grpc_cotea_endpoint in endpoint_balancer.get_available(endpoints) or endpoints:
+            session_key = session_pool.get_key(grpc_cotea_endpoint, hosts, ansible_library, extra_vars, extra_env)
+            session_id = session_pool.acquire(session_key)
+            if session_id is not None:
+                return endpoint_balancer.acquire([grpc_cotea_endpoint]), session_key, session_id
+    grpc_cotea_endpoint = endpoint_balancer.acquire(endpoints)
+    session_key = None
+    if session_idle_timeout > 0:
+        session_key = session_pool.get_key(grpc_cotea_endpoint, hosts, ansible_library, extra_vars, extra_env)
+    return grpc_cotea_endpoint, session_key, None
 
 
-def close_session(session_id, stub):
+def release_endpoint(grpc_cotea_endpoint, error=None):
+    """
+    :param error: exception of the run, endpoint is ejected if it is unavailable
+    """
+    endpoint_balancer.release(grpc_cotea_endpoint)
+    if isinstance(error, grpc.RpcError) and error.code() == grpc.StatusCode.UNAVAILABLE:
+        endpoint_balancer.eject(grpc_cotea_endpoint, error.details())
+
+
+async def close_session(session_id, stub, timeout=1000):
     request = SessionID()
     request.session_ID = session_id
-    response = stub.StopExecution(request, timeout=1000)
+    response = await stub.StopExecution(request, timeout=timeout)
     if not response.ok:
         logging.error("Can't close session with grpc cotea because of: %s", response.error_msg)
         raise Exception(response.error_msg)
 
 
-def run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, ansible_config=None,
-                target_parameter=None, ansible_library=None, operation=None, attributes=None,
-                outputs=None, properties=None):
-    options = [('grpc.max_send_message_length', 100 * 1024 * 1024),
-               ('grpc.max_receive_message_length', 100 * 1024 * 1024)]
-    channel = grpc.insecure_channel(grpc_cotea_endpoint, options=options)
-    stub = cotea_pb2_grpc.CoteaGatewayStub(channel)
-    request = EmptyMsg()
-    response = stub.StartSession(request, timeout=1000)
-    if not response.ok:
-        logging.error("Can't init session with grpc cotea because of: %s", response.error_msg)
-        raise Exception(response.error_msg)
-    session_id = response.ID
+class CoteaSessionPool(object):
+    """
+    Idle initialized cotea sessions in format {(endpoint, hosts, ansible_library, extra_vars, env): [sessions]}.
+    Session is taken by one operation at a time and returned after all tasks of the operation succeeded,
+    sessions which stay idle longer than their idle timeout are stopped by the runner.
+    Facts and registered variables of previous operations stay in the reused session, so operations must not
+    rely on variables which they don't set themselves
+    """
+    def __init__(self):
+        self.idle = {}
+        self.lock = Lock()
+
+    def get_key(self, grpc_cotea_endpoint, hosts, ansible_library, extra_vars, extra_env):
+        return grpc_cotea_endpoint, hosts, ansible_library, str(extra_vars), tuple(sorted(extra_env.items()))
+
+    def acquire(self, key):
+        """
+        :return: id of idle session or None
+        """
+        with self.lock:
+            sessions = self.idle.get(key)
+            if not sessions:
+                return None
+            session_id, _, _ = sessions.pop()
+            if not sessions:
+                del self.idle[key]
+        logging.debug("Reusing session %s of grpc cotea" % session_id)
+        return session_id
+
+    def release(self, key, session_id, idle_timeout):
+        with self.lock:
+            self.idle.setdefault(key, []).append((session_id, time.time(), idle_timeout))
+
+    def pop_expired(self, force=False):
+        """
+        Remove sessions which are idle longer than their timeout from the pool
+        :param force: remove all sessions
+        :return: list of tuples (endpoint, session id) which must be stopped by the caller
+        """
+        expired = []
+        now = time.time()
+        with self.lock:
+            for key in list(self.idle.keys()):
+                sessions = []
+                for session in self.idle[key]:
+                    (session_id, released_time, idle_timeout) = session
+                    if force or now - released_time > idle_timeout:
+                        expired.append((key[0], session_id))
+                    else:
+                        sessions.append(session)
+                if sessions:
+                    self.idle[key] = sessions
+                else:
+                    del self.idle[key]
+        return expired
+
+    def get_idle_count(self):
+        with self.lock:
+            return sum(len(sessions) for sessions in self.idle.values())
+
+
+session_pool = CoteaSessionPool()
 
+
+async def discard_session(session_id, stub):
+    try:
+        await close_session(session_id, stub, timeout=DISCARD_SESSION_TIMEOUT)
+    except Exception as e:
+        logging.warning("Failed to close session %s of grpc cotea: %s" % (session_id, e))
+
+
+def get_config_request(session_id, extra_env, extra_vars, hosts, ansible_library=None):
     request = Config()
     request.session_ID = session_id
     request.hosts = hosts
@@ -55,129 +322,462 @@ def run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts
         obj.key = key
         obj.value = val
         request.env_vars.add(obj)
-    response = stub.InitExecution(request, timeout=1000)
+    return request
+
+
+async def start_session(stub, extra_env, extra_vars, hosts, ansible_library=None):
+    request = EmptyMsg()
+    response = await stub.StartSession(request, timeout=1000)
+    if not response.ok:
+        logging.error("Can't init session with grpc cotea because of: %s", response.error_msg)
+        raise Exception(response.error_msg)
+    session_id = response.ID
+
+    request = get_config_request(session_id, extra_env, extra_vars, hosts, ansible_library=ansible_library)
+    response = await stub.InitExecution(request, timeout=1000)
     if not response.ok:
         logging.error("Can't init execution with grpc cotea because of: %s", response.error_msg)
+        await discard_session(session_id, stub)
         raise Exception(response.error_msg)
-    run_result = {
+    return session_id
+
+
+def is_batch_supported(grpc_cotea_endpoint):
+    return grpc_cotea_endpoint not in _batch_unsupported_endpoints
+
+
+def set_batch_unsupported(grpc_cotea_endpoint):
+    logging.info("Grpc cotea %s doesn't support RunTasks, tasks will be sent one by one" % grpc_cotea_endpoint)
+    _batch_unsupported_endpoints.add(grpc_cotea_endpoint)
+
+
+def get_task_request(session_id, task):
+    request = Task()
+    request.session_ID = session_id
+    request.is_dict = True
+    request.task_str = json.dumps(task)
+    return request
+
+
+def get_task_list_request(session_id, ansible_tasks):
+    request = TaskList()
+    request.session_ID = session_id
+    request.is_dict = True
+    request.task_strs.extend(json.dumps(task) for task in ansible_tasks)
+    return request
+
+
+def is_task_failed(response):
+    return not response.task_adding_ok or \
+        any(result.is_unreachable or result.is_failed for result in response.task_results)
+
+
+async def send_tasks(stub, grpc_cotea_endpoint, session_id, ansible_tasks):
+    """
+    Send tasks to cotea with one RunTasks call, gateways without RunTasks get a RunTask call per task
+    :return: list of TaskResults, one per executed task
+    """
+    if ansible_tasks and is_batch_supported(grpc_cotea_endpoint):
+        try:
+            response = await stub.RunTasks(get_task_list_request(session_id, ansible_tasks), timeout=1000)
+            return list(response.results)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                raise
+            set_batch_unsupported(grpc_cotea_endpoint)
+    responses = []
+    for task in ansible_tasks:
+        response = await stub.RunTask(get_task_request(session_id, task), timeout=1000)
+        responses.append(response)
+        if is_task_failed(response):
+            break
+    return responses
+
+
+def get_empty_run_result():
+    return {
         PROPERTIES: [],
         ATTRIBUTES: [],
         OUTPUTS: []
     }
-    for i in range(len(ansible_tasks)):
-        request = Task()
-        request.session_ID = session_id
-        request.is_dict = True
-        request.task_str = json.dumps(ansible_tasks[i])
-        response = stub.RunTask(request, timeout=1000)
-        if not response.task_adding_ok:
-            raise Exception(response.task_adding_error)
-        for result in response.task_results:
-            if result.is_unreachable or result.is_failed:
-                if result.stderr != '':
-                    error = result.stderr
-                elif result.msg != '':
-                    error = result.msg
-                elif result.stdout != '':
-                    error = result.stdout
-                else:
-                    error = result.results_dict_str
-                logging.error('Task with name %s failed with exception: %s' % (result.task_name, error))
-                close_session(session_id, stub)
-                raise Exception('Task with name %s failed with exception: %s' % (result.task_name, error))
+
+
+def process_task_results(i, response, ansible_tasks, run_result, ansible_config=None, target_parameter=None,
+                         operation=None, attributes=None, outputs=None, properties=None, is_reused=False):
+    """
+    Check results of i-th task and extract outputs, attributes and properties from them
+    :return: updated run result
+    """
+    if not response.task_adding_ok:
+        if is_reused and i == 0:
+            raise SessionUnusableError(response.task_adding_error)
+        raise Exception(response.task_adding_error)
+    extractor = None
+    if not target_parameter and operation and ansible_config and (outputs or attributes or properties):
+        extractor = get_result_extractor(ansible_config, operation)
+    for result in response.task_results:
+        if result.is_unreachable or result.is_failed:
+            if result.stderr != '':
+                error = result.stderr
+            elif result.msg != '':
+                error = result.msg
+            elif result.stdout != '':
+                error = result.stdout
             else:
-                if not target_parameter:
-                    if operation and ansible_config:
-                        if outputs:
-                            run_result[OUTPUTS].extend(get_outputs(ansible_tasks[i], result, outputs, ansible_config,
-                                                              operation))
-                        if attributes:
-                            run_result[ATTRIBUTES].extend(get_attributes_or_properties(ansible_tasks[i], result, attributes,
-                                                                                  ansible_config,
-                                                                                  operation))
-                        if properties:
-                            run_result[PROPERTIES].extend(get_attributes_or_properties(ansible_tasks[i], result, properties,
-                                                                                  ansible_config,
-                                                                                  operation))
-            if target_parameter:
-                result = json.loads(result.results_dict_str)
-                if 'ansible_facts' in result and target_parameter.split('.')[-1] in result['ansible_facts']:
-                    run_result = result['ansible_facts'][target_parameter.split('.')[-1]]
-    close_session(session_id, stub)
+                error = result.results_dict_str
+            logging.error('Task with name %s failed with exception: %s' % (result.task_name, error))
+            raise Exception('Task with name %s failed with exception: %s' % (result.task_name, error))
+        elif extractor is not None:
+            extractor.extract(ansible_tasks[i], result, run_result, outputs, attributes, properties)
+        if target_parameter:
+            result = json_loads(result.results_dict_str)
+            if 'ansible_facts' in result and target_parameter.split('.')[-1] in result['ansible_facts']:
+                run_result = result['ansible_facts'][target_parameter.split('.')[-1]]
     return run_result
 
 
-def get_outputs(task, result, parameters, ansible_config, operation):
-    run_result = []
-    tmp = {}
-    if 'include' in task.keys() and json.loads(result.results_dict_str).get('ansible_facts'):
-        operation_facts = json.loads(result.results_dict_str).get('ansible_facts')
-        for output in parameters:
-            if operation_facts.get(output):
-                tmp[output] = operation_facts.get(output)
-        if len(tmp) > 0:
-            run_result.append(tmp)
+def check_executed_count(executed, ansible_tasks):
+    if executed != len(ansible_tasks):
+        logging.error("Grpc cotea returned results of %s tasks instead of %s" % (executed, len(ansible_tasks)))
+        raise Exception("Grpc cotea returned results of %s tasks instead of %s" % (executed, len(ansible_tasks)))
+
+
+async def run_tasks(stub, grpc_cotea_endpoint, session_id, ansible_tasks, is_reused=False, **kwargs):
+    run_result = get_empty_run_result()
+    responses = await send_tasks(stub, grpc_cotea_endpoint, session_id, ansible_tasks)
+    for i, response in enumerate(responses):
+        run_result = process_task_results(i, response, ansible_tasks, run_result, is_reused=is_reused, **kwargs)
+    check_executed_count(len(responses), ansible_tasks)
     return run_result
 
 
-def get_attributes_or_properties(task, result, parameters, ansible_config, operation):
-    run_result = []
-    tmp = {}
-    if 'include' in task.keys() and json.loads(result.results_dict_str).get('ansible_facts'):
-        operation_facts = json.loads(result.results_dict_str).get('ansible_facts')
-        for par in parameters:
-            if operation_facts.get(par):
-                tmp[par] = operation_facts.get(par)
-        if len(tmp) > 0:
-            run_result.append(tmp)
-    if ansible_config.get('module_description' + '_' + operation.lower()) and \
-            ansible_config.get('module_description' + '_' + operation.lower()) in result.task_name:
-        attribute_matcher = None
+def select_parameters(values, parameters):
+    """
+    :return: dict with non-empty values of parameters or None if there are no such values
+    """
+    if not isinstance(values, dict):
+        return None
+    selected = {}
+    for par in parameters:
+        value = values.get(par)
+        if value:
+            selected[par] = value
+    return selected or None
+
+
+class TaskResultExtractor(object):
+    """
+    Extracts outputs, attributes and properties from results of tasks of one operation. Rules of the provider
+    are compiled once, result of the task is decoded only if something can be extracted from it.
+    Outputs are taken from facts of included tasks, attributes and properties - from facts of included tasks
+    and from results of the module of the provider
+    """
+    def __init__(self, ansible_config, operation):
+        self.module_description = ansible_config.get('module_description' + '_' + operation.lower())
+        self.module_prefix = ansible_config.get('module_prefix')
+        self.module_attribute_matcher = ansible_config.get('module_attribute_matcher') or {}
+        # NOTE: matchers in format {module: key of module result}
+        self.matchers = {}
+
+    def get_attribute_matcher(self, task):
+        module = None
         for elem in task.keys():
-            if ansible_config.get('module_prefix') in elem:
-                attribute_matcher = elem
-        module_attribute_matcher = ansible_config.get('module_attribute_matcher')
-        if attribute_matcher in module_attribute_matcher:
-            attribute_matcher = module_attribute_matcher.get(attribute_matcher)
+            if self.module_prefix in elem:
+                module = elem
+        if module is None:
+            return None
+        attribute_matcher = self.matchers.get(module)
+        if attribute_matcher is None:
+            attribute_matcher = self.module_attribute_matcher.get(module) or module.replace(self.module_prefix, '')
+            self.matchers[module] = attribute_matcher
+        return attribute_matcher
+
+    def extract(self, task, result, run_result, outputs=None, attributes=None, properties=None):
+        """
+        Add outputs, attributes and properties found in the result of the task to run_result
+        """
+        is_include = 'include' in task.keys()
+        attribute_matcher = None
+        if (attributes or properties) and self.module_description and self.module_prefix and \
+                self.module_description in result.task_name:
+            attribute_matcher = self.get_attribute_matcher(task)
+        if not is_include and attribute_matcher is None:
+            return
+        results_dict = json_loads(result.results_dict_str)
+        facts = results_dict.get('ansible_facts') if is_include else None
+        module_results = []
+        if attribute_matcher is not None:
+            module_results.append(results_dict.get(attribute_matcher))
+            for elem in results_dict.get('results') or []:
+                if isinstance(elem, dict):
+                    module_results.append(elem.get(attribute_matcher))
+        for key, parameters, sources in ((OUTPUTS, outputs, []), (ATTRIBUTES, attributes, module_results),
+                                         (PROPERTIES, properties, module_results)):
+            if not parameters:
+                continue
+            for source in [facts] + sources:
+                selected = select_parameters(source, parameters)
+                if selected:
+                    run_result[key].append(selected)
+
+
+def get_result_extractor(ansible_config, operation):
+    matcher = ansible_config.get('module_attribute_matcher') or {}
+    key = (ansible_config.get('module_prefix'), ansible_config.get('module_description' + '_' + operation.lower()),
+           tuple(sorted(matcher.items())), operation.lower())
+    extractor = _result_extractors.get(key)
+    if extractor is None:
+        extractor = TaskResultExtractor(ansible_config, operation)
+        _result_extractors[key] = extractor
+    return extractor
+
+
+class AsyncOperationRunner(object):
+    """
+    Runs operations with cotea as coroutines of one event loop in the background thread, so operations
+    in flight cost coroutines, not threads. Number of operations run at once is bounded by max_workers,
+    queued operations with lower priority value are started first, operations with equal priority - in order
+    of submission
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_PARALLEL_OPERATIONS):
+        self.max_workers = max_workers
+        self.counter = itertools.count()
+        self.in_flight = 0
+        self.closed = False
+        self.workers = set()
+        # NOTE: long-lived channels to cotea in format {endpoint: channel}, reused by all runs
+        self.channels = {}
+        self.loop = asyncio.new_event_loop()
+        started = Event()
+        self.thread = Thread(target=self._run_loop, args=(started,), name='cotea-event-loop', daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def _run_loop(self, started):
+        asyncio.set_event_loop(self.loop)
+        # NOTE: queue and channels must be created in the thread of the loop
+        self.queue = asyncio.PriorityQueue()
+        self._start_workers()
+        started.set()
+        self.loop.run_forever()
+
+    def _start_workers(self):
+        while len(self.workers) < self.max_workers:
+            worker = self.loop.create_task(self._work())
+            self.workers.add(worker)
+            worker.add_done_callback(self.workers.discard)
+
+    async def _work(self):
+        while True:
+            if len(self.workers) > self.max_workers:
+                # limit was decreased
+                return
+            _, _, coroutine_function, args = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await coroutine_function(self, *args)
+            except Exception:
+                logging.exception("Operation runner task failed")
+            finally:
+                self.in_flight -= 1
+
+    def set_max_workers(self, max_workers):
+        def update():
+            self.max_workers = max_workers
+            self._start_workers()
+        self.loop.call_soon_threadsafe(update)
+
+    def submit(self, coroutine_function, args, priority=0):
+        """
+        Queue coroutine_function(runner, *args), it's safe to call from any thread
+        """
+        self.loop.call_soon_threadsafe(self._put, (priority, next(self.counter), coroutine_function, args))
+
+    def _put(self, item):
+        self.queue.put_nowait(item)
+        logging.debug("Operation queued, queue depth %s, operations in flight %s" %
+                      (self.get_queue_depth(), self.get_in_flight()))
+
+    def run(self, coroutine):
+        """
+        Run coroutine in the loop and wait for its result, must not be called from the thread of the loop
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get_queue_depth(self):
+        return self.queue.qsize()
+
+    def get_in_flight(self):
+        return self.in_flight
+
+    def get_channel(self, grpc_cotea_endpoint):
+        channel = self.channels.get(grpc_cotea_endpoint)
+        if channel is None:
+            logging.debug("Opening channel to grpc cotea %s" % grpc_cotea_endpoint)
+            channel = aio.insecure_channel(grpc_cotea_endpoint, options=CHANNEL_OPTIONS)
+            self.channels[grpc_cotea_endpoint] = channel
+        return channel
+
+    def get_stub(self, grpc_cotea_endpoint):
+        return cotea_pb2_grpc.CoteaGatewayStub(self.get_channel(grpc_cotea_endpoint))
+
+    async def check_health(self, grpc_cotea_endpoint):
+        stub = self.get_stub(grpc_cotea_endpoint)
+        try:
+            response = await stub.HealthCheck(EmptyMsg(), timeout=HEALTH_CHECK_TIMEOUT)
+        except grpc.RpcError as e:
+            endpoint_balancer.set_health_error(grpc_cotea_endpoint, e)
+            return
+        endpoint_balancer.set_health(grpc_cotea_endpoint, response.ok, response.executions_count)
+
+    async def close_expired_sessions(self, force=False):
+        for grpc_cotea_endpoint, session_id in session_pool.pop_expired(force):
+            await discard_session(session_id, self.get_stub(grpc_cotea_endpoint))
+
+    async def run_ansible(self, ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, ansible_config=None,
+                          target_parameter=None, ansible_library=None, operation=None, attributes=None,
+                          outputs=None, properties=None, session_idle_timeout=0):
+        """
+        Run tasks in the session of grpc cotea
+        :param grpc_cotea_endpoint: endpoint of cotea or comma-separated list of endpoints, the least loaded is used
+        :param session_idle_timeout: seconds the session is kept initialized for next runs with the same hosts,
+        library, variables and environment, 0 - session is stopped after the run. Next runs see facts and
+        registered variables of this run
+        """
+        endpoints = get_endpoints(grpc_cotea_endpoint)
+        await asyncio.gather(*[self.check_health(endpoint)
+                               for endpoint in endpoint_balancer.get_endpoints_to_check(endpoints)])
+        if session_idle_timeout > 0:
+            await self.close_expired_sessions()
+        grpc_cotea_endpoint, session_key, session_id = acquire_endpoint(endpoints, hosts, ansible_library,
+                                                                        extra_vars, extra_env, session_idle_timeout)
+        kwargs = dict(ansible_config=ansible_config, target_parameter=target_parameter, operation=operation,
+                      attributes=attributes, outputs=outputs, properties=properties)
+        try:
+            run_result = await self.run_in_session(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts,
+                                                   session_key, session_id, session_idle_timeout,
+                                                   ansible_library=ansible_library, **kwargs)
+        except BaseException as e:
+            release_endpoint(grpc_cotea_endpoint, e)
+            raise
+        release_endpoint(grpc_cotea_endpoint)
+        return run_result
+
+    async def run_in_session(self, ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, session_key,
+                             session_id, session_idle_timeout, ansible_library=None, **kwargs):
+        """
+        Run tasks in the idle session or in the new one if session_id is None
+        """
+        stub = self.get_stub(grpc_cotea_endpoint)
+        is_reused = session_id is not None
+        if session_id is None:
+            session_id = await start_session(stub, extra_env, extra_vars, hosts, ansible_library=ansible_library)
+        try:
+            run_result = await run_tasks(stub, grpc_cotea_endpoint, session_id, ansible_tasks, is_reused=is_reused,
+                                         **kwargs)
+        except SessionUnusableError as e:
+            # NOTE: session which doesn't accept the first task is replaced, the task isn't executed in this case
+            logging.warning("Session %s of grpc cotea is unusable, starting new one: %s" % (session_id, e))
+            await discard_session(session_id, stub)
+            session_id = await start_session(stub, extra_env, extra_vars, hosts, ansible_library=ansible_library)
+            try:
+                run_result = await run_tasks(stub, grpc_cotea_endpoint, session_id, ansible_tasks, **kwargs)
+            except BaseException:
+                await discard_session(session_id, stub)
+                raise
+        except BaseException:
+            # NOTE: cancelled operations stop their sessions too
+            await discard_session(session_id, stub)
+            raise
+        if session_key is not None:
+            session_pool.release(session_key, session_id, session_idle_timeout)
         else:
-            attribute_matcher = attribute_matcher.replace(ansible_config.get('module_prefix'), '')
-        operation_output = json.loads(result.results_dict_str).get(attribute_matcher)
-        operation_output_results = json.loads(result.results_dict_str).get('results')
-        if operation_output:
-            tmp = {}
-            for par in parameters:
-                if operation_output.get(par):
-                    tmp[par] = operation_output.get(par)
-            if len(tmp) > 0:
-                run_result.append(tmp)
-        if operation_output_results:
-            for elem in operation_output_results:
-                match = elem.get(attribute_matcher)
-                tmp = {}
-                if match:
-                    for par in parameters:
-                        if match.get(par):
-                            tmp[par] = match.get(par)
-                    if len(tmp) > 0:
-                        run_result.append(tmp)
-    return run_result
+            await close_session(session_id, stub)
+        return run_result
+
+    async def _close(self):
+        self.closed = True
+        for worker in list(self.workers):
+            worker.cancel()
+        # NOTE: queued operations are started with closed flag set, so they can report that they weren't run
+        queued = []
+        while not self.queue.empty():
+            _, _, coroutine_function, args = self.queue.get_nowait()
+            queued.append(coroutine_function(self, *args))
+        await asyncio.gather(*queued, return_exceptions=True)
+        await self.close_expired_sessions(force=True)
+        for channel in self.channels.values():
+            await channel.close()
+        self.channels.clear()
+
+    def close(self):
+        """
+        Cancel operations in flight, stop idle sessions and close channels. Coroutine functions queued but not
+        started are called with runner.closed set to True and must return without running the operation
+        """
+        self.run(self._close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def get_async_runner(max_workers=None):
+    """
+    Get process-wide runner, so the limit of operations run with cotea is global for all deployments
+    :param max_workers: new limit of operations, the limit isn't changed if None
+    """
+    global _async_runner
+    with _async_runner_lock:
+        if _async_runner is None:
+            _async_runner = AsyncOperationRunner(max_workers or DEFAULT_MAX_PARALLEL_OPERATIONS)
+        elif max_workers is not None and _async_runner.max_workers != max_workers:
+            _async_runner.set_max_workers(max_workers)
+        return _async_runner
 
 
-def run_and_finish(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, name, op, q, ansible_config,
-                   ansible_library, attributes, outputs, properties):
-    result = {}
-    # time.sleep(random.randint(0, 30))
+def close_async_runner():
+    global _async_runner
+    with _async_runner_lock:
+        if _async_runner is not None:
+            _async_runner.close()
+            _async_runner = None
+
+
+# NOTE: idle sessions hold resources of cotea, so they are stopped when the process exits
+atexit.register(close_async_runner)
+
+
+async def run_and_finish(runner, ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, name, op, q,
+                         ansible_config, ansible_library, attributes, outputs, properties, session_idle_timeout=0):
     try:
-        result = run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts,
-                             ansible_config=ansible_config, ansible_library=ansible_library, operation=op,
-                             attributes=attributes, outputs=outputs, properties=properties)
-    except Exception as e:
-        q.put(e)
+        if runner.closed:
+            raise asyncio.CancelledError("Operation runner is closed")
+        result = await runner.run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts,
+                                          ansible_config=ansible_config, ansible_library=ansible_library,
+                                          operation=op, attributes=attributes, outputs=outputs,
+                                          properties=properties, session_idle_timeout=session_idle_timeout)
+    except BaseException as e:
+        # NOTE: exactly one item is put to q for every operation, even cancelled one, or to_dsl waits forever
+        q.put(OperationError(name, op, e))
+        if not isinstance(e, Exception):
+            raise
+        return
     q.put({name + SEPARATOR + op: result})
 
 
 def grpc_cotea_run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, name, op, q,
-                           ansible_config, ansible_library=None, attributes=None, outputs=None, properties=None):
-    Thread(target=run_and_finish, args=(
+                           ansible_config, ansible_library=None, attributes=None, outputs=None, properties=None,
+                           max_parallel_operations=DEFAULT_MAX_PARALLEL_OPERATIONS, priority=0, session_idle_timeout=0):
+    """
+    Queue the operation to the process-wide runner, result or OperationError is put to q when it's finished
+    """
+    get_async_runner(max_parallel_operations).submit(run_and_finish, (
         ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, name, op, q, ansible_config, ansible_library,
-        attributes, outputs, properties)).start()
+        attributes, outputs, properties, session_idle_timeout), priority=priority)
+
+
+def run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, **kwargs):
+    """
+    Blocking wrapper of AsyncOperationRunner.run_ansible for callers outside of the loop
+    """
+    runner = get_async_runner()
+    return runner.run(runner.run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, **kwargs))
@@ -10,6 +10,10 @@ OUTPUT_IDS = 'output_ids'
 OUTPUT_ID_RANGE_START = 1000
 OUTPUT_ID_RANGE_END = 9999
 
+# NOTE: types of events which are passed to progress_callback of to_dsl
+(OPERATION_STARTED, OPERATION_FINISHED, OPERATION_FAILED) = ('operation_started', 'operation_finished',
+                                                              'operation_failed')
+
 
 class ConfigurationTool(object):
 
@@ -24,17 +28,19 @@ class ConfigurationTool(object):
         self.tool_config = ConfigurationToolConfiguration(self.TOOL_NAME)
 
     def to_dsl(self, provider, nodes_relationships_queue, reversed_nodes_relationships_queue,
-               cluster_name, is_delete, target_directory=None, extra=None):
+               cluster_name, is_delete, target_directory=None, extra=None, progress_callback=None):
         """
         Generate scenarios for configuration tool to execute
         :param provider: provider type key name
-        :param reversed_nodes_relationships_queue: can be of class ProviderResource or RelationshipTemplate
-        :param nodes_relationships_queue: can be of class ProviderResource or RelationshipTemplate
+        :param reversed_nodes_relationships_queue: dict in format {ProviderOperation: list of operations which depend on it}
+        :param nodes_relationships_queue: dict in format {ProviderOperation: list of operations it depends on}
         :param cluster_name: unified name of cluster of template
         :param is_delete: boolean value that means if scenario should create or delete cluster
         :param artifacts: list of artifacts that are mentioned in template
         :param target_directory: directory where copy artifacts
         :param extra: extra parameters for configuration tool scenarios
+        :param progress_callback: function which is called with (event_type, name, operation, start_time,
+        finish_time, error) when operation of deployment is started, finished or failed
         :return: string with dsl scenario which is used to deploy
         """
         raise NotImplementedError()
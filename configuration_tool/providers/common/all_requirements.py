@@ -7,6 +7,11 @@ import logging, sys
 
 
 class ProviderRequirements (object):
+    """
+    Requirement definitions of node type, the object is shared by node templates of the type
+    """
+    __slots__ = ('provider', 'requirement_definitions', 'requirement_names_of_type_list',
+                 '_node_name_by_requirement_name', 'required_requirement_keys')
 
     def __init__(self, requirement_definitions, provider):
         """
@@ -0,0 +1,161 @@
+import copy
+import logging
+import threading
+from collections.abc import Mapping
+
+from toscaparser.imports import ImportsLoader
+
+from configuration_tool.common import utils
+from configuration_tool.common.tosca_reserved_keys import SERVICE_TEMPLATE_KEYS, DERIVED_FROM
+
+SOFTWARE_COMPONENT = 'SoftwareComponent'
+
+# NOTE: process-wide storage of definitions, one entry per provider
+# in format {provider: ProviderDefinitions}
+_definitions_cache = {}
+_definitions_cache_lock = threading.Lock()
+
+
+class LazyDefinitions(Mapping):
+    """
+    TOSCA definitions which are merged with definitions of their parents on the first access.
+    Definitions of base are used for types which are not defined here, types derived from types defined here
+    are flattened again. Flattened definitions must be used read-only
+    """
+
+    def __init__(self, raw_definitions, base=None):
+        """
+        :param raw_definitions: dict of definitions as they are in definition files
+        :param base: LazyDefinitions which are overridden by raw_definitions
+        """
+        self.raw_definitions = raw_definitions
+        self.base = base
+        # NOTE: flattened definitions in format {type name: definition}
+        self.flattened = {}
+        self.software_types = set()
+        self.lock = threading.Lock()
+
+    def __getitem__(self, def_name):
+        definition = self.flattened.get(def_name)
+        if definition is None:
+            definition = self._flatten(def_name)
+        return definition
+
+    def __contains__(self, def_name):
+        return def_name in self.raw_definitions or self.base is not None and def_name in self.base
+
+    def __iter__(self):
+        for def_name in self.raw_definitions:
+            yield def_name
+        if self.base is not None:
+            for def_name in self.base:
+                if def_name not in self.raw_definitions:
+                    yield def_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get_raw_definition(self, def_name):
+        definition = self.raw_definitions.get(def_name)
+        if definition is None and self.base is not None:
+            return self.base.get_raw_definition(def_name)
+        return definition
+
+    def is_software_type(self, def_name):
+        """
+        :return: True if type is derived from SoftwareComponent
+        """
+        if def_name not in self.flattened:
+            self._flatten(def_name)
+        return def_name in self.software_types
+
+    def _flatten(self, def_name):
+        with self.lock:
+            if def_name in self.flattened:
+                return self.flattened[def_name]
+            # NOTE: chain of types from def_name to the first type which doesn't depend on raw_definitions
+            chain = []
+            parent_def_name = def_name
+            while parent_def_name is not None and parent_def_name not in self.flattened:
+                definition = self.get_raw_definition(parent_def_name)
+                if definition is None:
+                    raise KeyError(parent_def_name)
+                if parent_def_name in chain:
+                    logging.critical("Invalid type \'%s\' is derived from itself" % parent_def_name)
+                    raise Exception("Invalid type \'%s\' is derived from itself" % parent_def_name)
+                chain.append(parent_def_name)
+                parent_def_name = definition.get(DERIVED_FROM)
+            while chain and chain[-1] not in self.raw_definitions:
+                base_def_name = chain.pop()
+                self.flattened[base_def_name] = self.base[base_def_name]
+                if self.base.is_software_type(base_def_name):
+                    self.software_types.add(base_def_name)
+            for chain_def_name in reversed(chain):
+                self._merge_with_parent(chain_def_name)
+            return self.flattened[def_name]
+
+    def _merge_with_parent(self, def_name):
+        definition = copy.deepcopy(self.get_raw_definition(def_name))
+        parent_def_name = definition.pop(DERIVED_FROM, None)
+        (_, _, def_type_short) = utils.tosca_type_parse(def_name)
+        is_software_type = def_type_short == SOFTWARE_COMPONENT
+        if parent_def_name is not None:
+            definition = utils.deep_update_dict(copy.deepcopy(self.flattened[parent_def_name]), definition)
+            is_software_type = is_software_type or parent_def_name in self.software_types
+        if is_software_type:
+            self.software_types.add(def_name)
+        self.flattened[def_name] = definition
+
+
+class ProviderDefinitions(object):
+    """
+    TOSCA definitions loaded from definition files of provider, they are flattened (merged with parents) on demand.
+    Objects are shared between requests and must be used read-only
+    """
+
+    def __init__(self, provider, fingerprint, raw_definitions):
+        self.provider = provider
+        self.fingerprint = fingerprint
+        self.raw_definitions = raw_definitions
+        self.definitions = LazyDefinitions(raw_definitions)
+
+    def is_software_type(self, def_name):
+        return self.definitions.is_software_type(def_name)
+
+
+def load_definition_files(definition_files):
+    definitions = {}
+    for definition_file in definition_files:
+        # NOTE: definition file is passed as path of main template, absolute paths are resolved as is
+        import_definition_file = ImportsLoader([definition_file], definition_file, list(SERVICE_TEMPLATE_KEYS))
+        definitions.update(import_definition_file.get_custom_defs())
+    return definitions
+
+
+def get_provider_definitions(provider, definition_files):
+    """
+    Get definitions of provider from process-wide cache, files are loaded only once until any of them is changed,
+    every type is flattened once on the first access
+    :param provider: provider name
+    :param definition_files: list of absolute paths to definition files, definitions of later files override
+    definitions of earlier ones
+    :return: ProviderDefinitions
+    """
+    fingerprint = tuple(utils.get_file_fingerprint(f) for f in definition_files)
+    cached = _definitions_cache.get(provider)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+
+    with _definitions_cache_lock:
+        cached = _definitions_cache.get(provider)
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached
+        logging.info("Loading TOSCA definitions of provider \'%s\' from files: %s" % (provider, definition_files))
+        cached = ProviderDefinitions(provider, fingerprint, load_definition_files(definition_files))
+        _definitions_cache[provider] = cached
+        return cached
+
+
+def clear_definitions_cache():
+    with _definitions_cache_lock:
+        _definitions_cache.clear()
@@ -1,6 +1,7 @@
 import copy
 import sys
 import logging
+import tempfile
 from multiprocessing import Queue
 
 from random import seed, randint
@@ -32,14 +33,14 @@ def generate_artifacts(executor, new_artifacts, directory, store=True):
         logging.error('Failed to generate artifact with executor <None>')
         raise Exception('Failed to generate artifact with executor <None>')
     tasks = []
-    filename = os.path.join(directory, '_'.join(['tasks', str(utils.get_random_int(1000, 9999))]) +
-                            get_artifact_extension(executor))
     for art in new_artifacts:
         tasks.extend(create_artifact_data(art, executor))
     if not os.path.isdir(directory):
-        os.makedirs(directory)
+        os.makedirs(directory, exist_ok=True)
 
-    with open(filename, "w") as f:
+    # NOTE: name is unique, so concurrent requests don't overwrite artifacts of each other
+    fd, filename = tempfile.mkstemp(dir=directory, prefix='tasks_', suffix=get_artifact_extension(executor))
+    with os.fdopen(fd, "w") as f:
         filedata = yaml.dump(tasks, default_flow_style=False)
         f.write(filedata)
         logging.info("Artifact for executor %s was created: %s" % (executor, filename))
@@ -16,10 +16,30 @@ SET_FACT_SOURCE = "set_fact"
 IMPORT_TASKS_MODULE = "include"
 DEPENDENCY = 'dependency'
 
+
+def get_requirement_definitions(type_definition):
+    """
+    Refactor the requirements as its definition is list, not dict
+    :param type_definition: flattened definition of node type
+    :return: list of requirement definitions with name added
+    """
+    requirement_defs_list = type_definition.get(REQUIREMENTS, None) or []
+    requirement_defs_list_with_name_added = []
+    for req_def in requirement_defs_list:
+        for req_name, req_params in req_def.items():
+            copy_req_def = copy.copy(req_params)
+            copy_req_def[NAME] = req_name
+            requirement_defs_list_with_name_added.append(copy_req_def)
+    return requirement_defs_list_with_name_added
+
+
 class ProviderResource(object):
+    __slots__ = ('provider', 'tmpl', 'grpc_cotea_endpoint', 'name', 'type', 'type_name', 'type_definition',
+                 'is_software_component', 'host', 'self', 'target', 'source', 'operation', 'is_delete',
+                 'configuration_args', 'requirements', 'node_filter_artifacts')
 
     def __init__(self, provider, is_delete, grpc_cotea_endpoint, configuration_tool, tmpl, node_name, host_ip_parameter, node_type, is_software_component=False, is_relationship=False,
-                 relation_target_source = dict()):
+                 relation_target_source = dict(), provider_requirements=None):
         """
 
         :param provider:
@@ -28,6 +48,7 @@ class ProviderResource(object):
         :param node_type:
         :param is_software_component:
         :param is_relationship:
+        :param provider_requirements: ProviderRequirements of node type, they are shared by templates of the type
         """
 
         self.provider = provider
@@ -71,7 +92,8 @@ class ProviderResource(object):
                         if value:
                             self.configuration_args[def_prop_key] = value
 
-            provider_requirements = ProviderRequirements(self.requirement_definitions, self.provider)
+            if provider_requirements is None:
+                provider_requirements = ProviderRequirements(self.requirement_definitions, self.provider)
             self.requirements = provider_requirements.get_requirements(tmpl)
 
             for req_name, reqs in self.requirements.items():
@@ -225,26 +247,9 @@ class ProviderResource(object):
     def requirement_definitions(self):
         """
         Refactor the requirements as its definition is list, not dict
-        :return: dict of key = name of category and value is a dict
+        :return: list of requirement definitions with name added
         """
-        requirement_defs_list = self.type_definition.get(REQUIREMENTS, None) or []
-        requirement_defs_dict = {}
-        requirement_defs_list_with_name_added = []
-        for req_def in requirement_defs_list:
-            for req_name, req_params in req_def.items():
-                cur_req_def = requirement_defs_dict.get(req_name)
-                if cur_req_def:
-                    if isinstance(cur_req_def, list):
-                        requirement_defs_dict[req_name].append(req_params)
-                    else:
-                        requirement_defs_dict[req_name] = [cur_req_def, req_params]
-                else:
-                    requirement_defs_dict[req_name] = req_params
-                copy_req_def = copy.copy(req_params)
-                copy_req_def[NAME] = req_name
-                requirement_defs_list_with_name_added.append(copy_req_def)
-
-        return requirement_defs_list_with_name_added
+        return get_requirement_definitions(self.type_definition)
 
     def set_defaults(self):
         for prop_name, prop_def in self.type_definition.get(PROPERTIES, {}).items():
@@ -253,3 +258,36 @@ class ProviderResource(object):
             if default is not None and value is None:
                 self.tmpl[PROPERTIES] = self.tmpl.get(PROPERTIES, {})
                 self.tmpl[PROPERTIES][prop_name] = default
+
+
+class ProviderOperation(object):
+    """
+    Operation of ProviderResource in the graph of operations. Template is shared with the resource
+    except interfaces, they are reduced to the operation. Other attributes are read from the resource
+    """
+    # NOTE: host is read from the resource until it's set for the operation
+    __slots__ = ('resource', 'operation', 'tmpl', 'host')
+
+    def __init__(self, resource, operation):
+        """
+
+        :param resource: ProviderResource
+        :param operation: name of operation
+        """
+        self.resource = resource
+        self.operation = operation
+        self.tmpl = resource.tmpl
+        interfaces = resource.tmpl.get(INTERFACES)
+        if interfaces is not None:
+            interfaces = dict(interfaces)
+            for interface_name in ('Configure', 'Standard'):
+                if interface_name in interfaces:
+                    interfaces[interface_name] = {operation: interfaces[interface_name][operation]}
+            self.tmpl = dict(resource.tmpl)
+            self.tmpl[INTERFACES] = interfaces
+
+    def __getattr__(self, name):
+        # NOTE: called only for attributes which are not set on the operation
+        if name.startswith('__') or name == 'resource':
+            raise AttributeError(name)
+        return getattr(self.resource, name)
@@ -3,12 +3,14 @@ from configuration_tool.common.tosca_reserved_keys import REQUIREMENT_DEFAULT_PA
     NAME_SUFFIX, ID_SUFFIX, NAME, ID, NODE_FILTER, CAPABILITIES, PROPERTIES, GET_FUNCTIONS, PARAMETERS, SOURCE, \
     VALUE, EXECUTOR, NODE
 
-import json, six, copy, sys, logging
+import json, six, sys, logging
 
 
 class ProviderRequirement (object):
+    __slots__ = ('provider', 'name', 'key', 'data', 'relationship', 'node_filter_key', 'value', 'artifact',
+                 'definition', 'requires')
 
-    DEFAULT_REQUIRED_PARAMS = list(REQUIREMENT_DEFAULT_PARAMS)
+    DEFAULT_REQUIRED_PARAMS = tuple(REQUIREMENT_DEFAULT_PARAMS)
 
     def __init__(self, provider, name, key, data, definition, node_filter_key=None):
         self.provider = provider
@@ -21,12 +23,12 @@ class ProviderRequirement (object):
         self.artifact = None
         self.definition = definition
 
-        self.requires = copy.deepcopy(self.DEFAULT_REQUIRED_PARAMS)
         if self.name[-5:] == NAME_SUFFIX:
-            self.requires = [NAME]
+            self.requires = (NAME, self.name)
         elif self.name[-3:] == ID_SUFFIX:
-            self.requires = [ID]
-        self.requires.append(self.name)
+            self.requires = (ID, self.name)
+        else:
+            self.requires = self.DEFAULT_REQUIRED_PARAMS + (self.name,)
 
         self.filter()
 
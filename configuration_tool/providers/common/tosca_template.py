@@ -1,17 +1,60 @@
-from toscaparser.imports import ImportsLoader
-
 from configuration_tool.common import utils
 from configuration_tool.common.configuration import Configuration
 from configuration_tool.common.tosca_reserved_keys import *
 
+from configuration_tool.providers.common.definitions_cache import get_provider_definitions, LazyDefinitions
 from configuration_tool.providers.common.provider_configuration import ProviderConfiguration
-from configuration_tool.providers.common.provider_resource import ProviderResource
+from configuration_tool.providers.common.all_requirements import ProviderRequirements
+from configuration_tool.providers.common.provider_resource import ProviderResource, ProviderOperation, \
+    get_requirement_definitions
 
 
 import os, copy, logging, sys
 
 SEPARATOR = ':'
 
+
+def get_base_definition_files(base_config):
+    file_definitions = base_config.config['main'][TOSCA_ELEMENTS_DEFINITION_FILE].split(',')
+    def_list = []
+    for file_definition in file_definitions:
+        if not os.path.isabs(file_definition):
+            file_definition = os.path.join(utils.get_project_root_path(), file_definition)
+            def_list.append(file_definition)
+
+        if not os.path.isfile(file_definition):
+            logging.error("TOSCA definition file not found: %s" % file_definition)
+            raise Exception("TOSCA definition file not found: %s" % file_definition)
+
+    return def_list
+
+
+def get_definition_file(provider_config):
+    file_definition = provider_config.config['main'][TOSCA_ELEMENTS_DEFINITION_FILE]
+    if not os.path.isabs(file_definition):
+        file_definition = os.path.join(provider_config.config_directory, file_definition)
+
+    if not os.path.isfile(file_definition):
+        logging.error("TOSCA definition file not found: %s" % file_definition)
+        raise Exception("TOSCA definition file not found: %s" % file_definition)
+
+    return file_definition
+
+
+def load_provider_definitions(provider, provider_config=None, base_config=None):
+    """
+    Get definitions from definition files of provider and common definition files, they are flattened on demand
+    :param provider: provider name
+    :return: ProviderDefinitions from process-wide cache
+    """
+    if provider_config is None:
+        provider_config = ProviderConfiguration(provider)
+    if base_config is None:
+        base_config = Configuration()
+    return get_provider_definitions(provider,
+                                    [get_definition_file(provider_config)] + get_base_definition_files(base_config))
+
+
 class ProviderToscaTemplate(object):
     REQUIRED_CONFIG_PARAMS = (TOSCA_ELEMENTS_MAP_FILE, TOSCA_ELEMENTS_DEFINITION_FILE)
     DEPENDENCY_FUNCTIONS = (GET_PROPERTY, GET_ATTRIBUTE, GET_OPERATION_OUTPUT)
@@ -27,7 +70,6 @@ class ProviderToscaTemplate(object):
         self.provider_config = ProviderConfiguration(self.provider)
         self.base_config = Configuration()
         self.cluster_name = cluster_name
-        self.software_types = set()
 
         for sec in self.REQUIRED_CONFIG_PARAMS:
             if not self.provider_config.config[self.provider_config.MAIN_SECTION].get(sec):
@@ -35,24 +77,14 @@ class ProviderToscaTemplate(object):
                 logging.error("Translating failed")
                 raise Exception("Provider configuration parameter \'%s\' has missing value" % sec)
 
-        self.definitions = {}
-        import_definition_file = ImportsLoader([self.definition_file()], None, list(SERVICE_TEMPLATE_KEYS),
-                                               template.get(TOPOLOGY_TEMPLATE))
-        self.definitions.update(import_definition_file.get_custom_defs())
-
-        import_definition_file = ImportsLoader(self.base_definition_file(), None, list(SERVICE_TEMPLATE_KEYS),
-                                               template.get(TOPOLOGY_TEMPLATE))
-        self.definitions.update(import_definition_file.get_custom_defs())
-
-        self.definitions.update(template.get(NODE_TYPES, {}))
-        self.definitions.update(template.get(RELATIONSHIP_TYPES, {}))
-        self.definitions.update(template.get(CAPABILITY_TYPES, {}))
-        self.definitions.update(template.get(DATA_TYPES, {}))
-        self.definitions.update(template.get(POLICY_TYPES, {}))
-        self.definitions.update(template.get(GROUP_TYPES, {}))
-        self.definitions.update(template.get(INTERFACE_TYPES, {}))
-
-        self.fulfil_definitions_with_parents()
+        # NOTE: types are flattened on the first access, types from definition files are flattened once per process
+        # and shared between requests, only types from the template and types derived from them are flattened here
+        provider_definitions = load_provider_definitions(self.provider, self.provider_config, self.base_config)
+        template_definitions = {}
+        for def_key in (NODE_TYPES, RELATIONSHIP_TYPES, CAPABILITY_TYPES, DATA_TYPES, POLICY_TYPES, GROUP_TYPES,
+                        INTERFACE_TYPES):
+            template_definitions.update(template.get(def_key, {}))
+        self.definitions = LazyDefinitions(template_definitions, provider_definitions.definitions)
 
         self.node_templates = {}
         self.relationship_templates = {}
@@ -87,6 +119,7 @@ class ProviderToscaTemplate(object):
         Changes all mentions of node_templates by name in requirements, places dictionary with node_filter instead
         :return:
         """
+        node_templates_by_type = self._node_templates_by_type()
         for node_name, node in self.node_templates.items():
             for req in node.get(REQUIREMENTS, []):
                 for req_name, req_body in req.items():
@@ -117,10 +150,20 @@ class ProviderToscaTemplate(object):
                     if req_def.get(NODE, None) is not None:
                         if req_def[NODE] != node[TYPE]:
                             node_types_from_requirements.add(req_def[NODE])
-            for req_node_name, req_node_tmpl in self.node_templates.items():
-                if req_node_tmpl[TYPE] in node_types_from_requirements:
+            for req_node_type in node_types_from_requirements:
+                for req_node_name in node_templates_by_type.get(req_node_type, []):
                     self.add_template_dependency(node_name, req_node_name)
 
+    def _node_templates_by_type(self):
+        """
+        Index node templates by type
+        :return: dict in format {type: list of node template names}
+        """
+        node_templates_by_type = dict()
+        for node_name, node in self.node_templates.items():
+            node_templates_by_type.setdefault(node[TYPE], []).append(node_name)
+        return node_templates_by_type
+
     def add_template_dependency(self, node_name, dependency_name):
         if not dependency_name == SELF and not node_name == dependency_name:
             if self.template_dependencies.get(node_name) is None:
@@ -129,29 +172,10 @@ class ProviderToscaTemplate(object):
                 self.template_dependencies[node_name].add(dependency_name)
 
     def base_definition_file(self):
-        file_definitions = self.base_config.config['main'][TOSCA_ELEMENTS_DEFINITION_FILE].split(',')
-        def_list = []
-        for file_definition in file_definitions:
-            if not os.path.isabs(file_definition):
-                file_definition = os.path.join(utils.get_project_root_path(), file_definition)
-                def_list.append(file_definition)
-
-            if not os.path.isfile(file_definition):
-                logging.error("TOSCA definition file not found: %s" % file_definition)
-                raise Exception("TOSCA definition file not found: %s" % file_definition)
-
-        return def_list
+        return get_base_definition_files(self.base_config)
 
     def definition_file(self):
-        file_definition = self.provider_config.config['main'][TOSCA_ELEMENTS_DEFINITION_FILE]
-        if not os.path.isabs(file_definition):
-            file_definition = os.path.join(self.provider_config.config_directory, file_definition)
-
-        if not os.path.isfile(file_definition):
-            logging.error("TOSCA definition file not found: %s" % file_definition)
-            raise Exception("TOSCA definition file not found: %s" % file_definition)
-
-        return file_definition
+        return get_definition_file(self.provider_config)
 
     def replace_requirements_with_node_filter(self):
         for node_name, node in self.node_templates.items():
@@ -188,17 +212,25 @@ class ProviderToscaTemplate(object):
         :return: list of class objects inherited from ProviderResource
         """
         provider_nodes = dict()
+        # NOTE: requirement definitions are prepared once per node type
+        provider_requirements_by_type = dict()
         for node_name, node in self.node_templates.items():
             (namespace, category, type_name) = utils.tosca_type_parse(node[TYPE])
-            is_software_component = node[TYPE] in self.software_types
+            is_software_component = self.definitions.is_software_type(node[TYPE])
             if namespace != self.provider and not is_software_component or category != NODES:
                 logging.error('Unexpected values: node \'%s\' not a software component and has a provider \'%s\'. '
                               'Node will be ignored' % (node.name, namespace))
             else:
+                provider_requirements = provider_requirements_by_type.get(node[TYPE])
+                if provider_requirements is None:
+                    provider_requirements = ProviderRequirements(
+                        get_requirement_definitions(self.definitions[node[TYPE]]), self.provider)
+                    provider_requirements_by_type[node[TYPE]] = provider_requirements
                 provider_node_instance = ProviderResource(self.provider, self.is_delete, self.grpc_cotea_endpoint, self.configuration_tool, node,
                                                           node_name,
                                                           self.host_ip_parameter, self.definitions[node[TYPE]],
-                                                          is_software_component=is_software_component)
+                                                          is_software_component=is_software_component,
+                                                          provider_requirements=provider_requirements)
                 provider_nodes[node_name] = provider_node_instance
         return provider_nodes
 
@@ -276,6 +308,12 @@ class ProviderToscaTemplate(object):
                         new_set.add(elem)
                         break
             new_dependencies[key] = new_set
+        # reversed new_dependencies in format {node.op: {node1.op1, node2.op2}}
+        # node1.op1 and node2.op2 require node.op, it's updated with new_dependencies
+        dependents = {}
+        for key, value in new_dependencies.items():
+            for elem in value:
+                dependents.setdefault(elem, set()).add(key)
 
         # Adding relationships operations pre_configure_source after create source node
         # pre_configure_target after create target node
@@ -291,46 +329,40 @@ class ProviderToscaTemplate(object):
             if element_type == RELATIONSHIPS:
                 if INTERFACES in templ.tmpl and 'Configure' in templ.tmpl[INTERFACES]:
                     if 'pre_configure_source' in templ.tmpl[INTERFACES]['Configure']:
-                        new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.source,
+                        new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.source,
                                                                      'pre_configure_source', 'create', ['add_source'])
                     if 'pre_configure_target' in templ.tmpl[INTERFACES]['Configure']:
-                        new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.target,
+                        new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.target,
                                                                      'pre_configure_target', 'create')
                     if 'post_configure_source' in templ.tmpl[INTERFACES]['Configure']:
                         if templ.source + SEPARATOR + 'configure' in new_dependencies:
-                            new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.source,
+                            new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.source,
                                                                          'post_configure_source', 'configure')
                         else:
-                            new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.source,
+                            new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.source,
                                                                          'post_configure_source', 'create')
                     if 'post_configure_target' in templ.tmpl[INTERFACES]['Configure']:
                         if templ.target + SEPARATOR + 'configure' in new_dependencies:
-                            new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.target,
+                            new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.target,
                                                                          'post_configure_target', 'configure')
                         else:
-                            new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.target,
+                            new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name, templ.target,
                                                                          'post_configure_target', 'create')
                     if 'add_source' in templ.tmpl[INTERFACES]['Configure']:
-                        new_dependencies = self.update_relationships(new_dependencies, templ.name, templ.source,
-                                                                     'add_source', 'create', ['pre_configure_source'])
+                        new_dependencies = self.update_relationships(new_dependencies, dependents, templ.name,
+                                                                     templ.source, 'add_source', 'create', ['pre_configure_source'])
                     if 'add_target' in templ.tmpl[INTERFACES]['Configure']:
                         logging.warning('Operation add_target not supported, it will be skipped')
                     if 'target_changed' in templ.tmpl[INTERFACES]['Configure']:
                         logging.warning('Operation target_changed not supported, it will be skipped')
                     if 'remove_target' in templ.tmpl[INTERFACES]['Configure']:
                         logging.warning('Operation remove_target not supported, it will be skipped')
-        # mapping strings 'node.op' to provider template of this node with this operation
+        # mapping strings 'node.op' to operation of provider template of this node
         templ_mappling = {}
         for elem in new_dependencies:
-            templ_name = elem.split(SEPARATOR)[0]
-            templ = copy.deepcopy(self.provider_nodes.get(templ_name, self.provider_relations.get(templ_name)))
-            templ.operation = elem.split(SEPARATOR)[1]
-            if INTERFACES in templ.tmpl:
-                if 'Configure' in templ.tmpl[INTERFACES]:
-                    templ.tmpl[INTERFACES]['Configure'] = {templ.operation: templ.tmpl[INTERFACES]['Configure'][templ.operation]}
-                if 'Standard' in templ.tmpl[INTERFACES]:
-                    templ.tmpl[INTERFACES]['Standard'] = {templ.operation: templ.tmpl[INTERFACES]['Standard'][templ.operation]}
-            templ_mappling[elem] = templ
+            templ_name, operation = elem.split(SEPARATOR)[:2]
+            templ = self.provider_nodes.get(templ_name, self.provider_relations.get(templ_name))
+            templ_mappling[elem] = ProviderOperation(templ, operation)
         templ_dependencies = {}
         reversed_templ_dependencies = {}
         # create dict where all elements will be replaced with provider template from templ_mappling
@@ -339,54 +371,29 @@ class ProviderToscaTemplate(object):
             new_list = []
             for elem in value:
                 new_list.append(templ_mappling[elem])
-                if templ_mappling[elem] not in reversed_templ_dependencies:
-                    reversed_templ_dependencies[templ_mappling[elem]] = [templ_mappling[key]]
-                elif templ_mappling[key] not in reversed_templ_dependencies[templ_mappling[elem]]:
-                    reversed_templ_dependencies[templ_mappling[elem]].append(templ_mappling[key])
+                # NOTE: every pair of operations is met once, value is a set
+                reversed_templ_dependencies.setdefault(templ_mappling[elem], []).append(templ_mappling[key])
             templ_dependencies[templ_mappling[key]] = new_list
         if len(templ_dependencies) <= 1:
             reversed_templ_dependencies = copy.copy(templ_dependencies)
         return templ_dependencies, reversed_templ_dependencies
 
-    def update_relationships(self, new_dependencies, templ_name, direction, rel_name, post_op, banned_ops=[]):
-        utils.deep_update_dict(new_dependencies, {
-            templ_name + SEPARATOR + rel_name: {direction + SEPARATOR + post_op}})
-        for key, value in new_dependencies.items():
-            for elem in value:
-                if elem == direction + SEPARATOR + post_op and key != templ_name + SEPARATOR + rel_name and \
-                        key not in [templ_name + SEPARATOR + x for x in banned_ops]:
-                    utils.deep_update_dict(new_dependencies,
-                                           {key: {templ_name + SEPARATOR + rel_name}})
+    def update_relationships(self, new_dependencies, dependents, templ_name, direction, rel_name, post_op,
+                             banned_ops=[]):
+        """
+        Add relationship operation executed after operation post_op of node direction, operations which depend on
+        direction.post_op depend on relationship operation too
+        :param dependents: reversed new_dependencies, it's updated with new_dependencies
+        """
+        rel_operation = templ_name + SEPARATOR + rel_name
+        post_operation = direction + SEPARATOR + post_op
+        banned_operations = {templ_name + SEPARATOR + x for x in banned_ops}
+        self.add_operation_dependency(new_dependencies, dependents, rel_operation, post_operation)
+        for key in list(dependents.get(post_operation, [])):
+            if key != rel_operation and key not in banned_operations:
+                self.add_operation_dependency(new_dependencies, dependents, key, rel_operation)
         return new_dependencies
 
-    def _get_full_defintion(self, definition, def_type, ready_set):
-        if def_type in ready_set:
-            return definition, def_type in self.software_types
-
-        (_, _, def_type_short) = utils.tosca_type_parse(def_type)
-        is_software_type = def_type_short == 'SoftwareComponent'
-        is_software_parent = False
-        parent_def_name = definition.get(DERIVED_FROM, None)
-        if parent_def_name is not None:
-            if def_type == parent_def_name:
-                logging.critical("Invalid type \'%s\' is derived from itself" % def_type)
-                raise Exception("Invalid type \'%s\' is derived from itself" % def_type)
-            if parent_def_name in ready_set:
-                parent_definition = self.definitions[parent_def_name]
-                is_software_parent = parent_def_name in self.software_types
-            else:
-                parent_definition, is_software_parent = \
-                    self._get_full_defintion(self.definitions[parent_def_name], parent_def_name, ready_set)
-            parent_definition = copy.deepcopy(parent_definition)
-            definition = utils.deep_update_dict(parent_definition, definition)
-        if is_software_type or is_software_parent:
-            self.software_types.add(def_type)
-        ready_set.add(def_type)
-        return definition, def_type in self.software_types
-
-    def fulfil_definitions_with_parents(self):
-        ready_definitions = set()
-        for def_name, definition in self.definitions.items():
-            self.definitions[def_name], _ = self._get_full_defintion(definition, def_name, ready_definitions)
-            if self.definitions[def_name].get(DERIVED_FROM):
-                del self.definitions[def_name][DERIVED_FROM]
+    def add_operation_dependency(self, new_dependencies, dependents, operation, dependency):
+        new_dependencies.setdefault(operation, set()).add(dependency)
+        dependents.setdefault(dependency, set()).add(operation)
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\tapi.proto\"\xe8\x02\n\x19\x43louniProviderToolRequest\x12\x1d\n\x15template_file_content\x18\x01 \x01(\t\x12\x14\n\x0c\x63luster_name\x18\x02 \x01(\t\x12\x15\n\rvalidate_only\x18\x03 \x01(\x08\x12\x0e\n\x06\x64\x65lete\x18\x04 \x01(\x08\x12\x10\n\x08provider\x18\x05 \x01(\t\x12\x1a\n\x12\x63onfiguration_tool\x18\x06 \x01(\t\x12\r\n\x05\x65xtra\x18\x07 \x01(\t\x12\x11\n\tlog_level\x18\x08 \x01(\t\x12\r\n\x05\x64\x65\x62ug\x18\t \x01(\x08\x12\x16\n\x0ehost_parameter\x18\n \x01(\t\x12\x17\n\x0fpublic_key_path\x18\x0b \x01(\t\x12#\n\x1b\x63onfiguration_tool_endpoint\x18\x0c \x01(\t\x12\x1b\n\x13grpc_cotea_endpoint\x18\r \x01(\t\x12\x1d\n\x15\x64\x61tabase_api_endpoint\x18\x0e \x01(\t\"\xb7\x01\n\x1a\x43louniProviderToolResponse\x12\x32\n\x06status\x18\x01 \x01(\x0e\x32\".ClouniProviderToolResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\"E\n\x06Status\x12\x12\n\x0eTEMPLATE_VALID\x10\x00\x12\x14\n\x10TEMPLATE_INVALID\x10\x01\x12\x06\n\x02OK\x10\x02\x12\t\n\x05\x45RROR\x10\x03\"\x99\x02\n\x1e\x43louniConfigurationToolRequest\x12\x19\n\x11provider_template\x18\x01 \x01(\t\x12\x14\n\x0c\x63luster_name\x18\x02 \x01(\t\x12\x15\n\rvalidate_only\x18\x03 \x01(\x08\x12\x0e\n\x06\x64\x65lete\x18\x04 \x01(\x08\x12\x1a\n\x12\x63onfiguration_tool\x18\x05 \x01(\t\x12\r\n\x05\x65xtra\x18\x06 \x01(\t\x12\x11\n\tlog_level\x18\x07 \x01(\t\x12\r\n\x05\x64\x65\x62ug\x18\x08 \x01(\x08\x12\x1d\n\x15\x64\x61tabase_api_endpoint\x18\t \x01(\t\x12\x1b\n\x13grpc_cotea_endpoint\x18\n \x01(\t\x12\x16\n\x0ehost_parameter\x18\x0b \x01(\t\"\xc1\x01\n\x1f\x43louniConfigurationToolResponse\x12\x37\n\x06status\x18\x01 \x01(\x0e\x32\'.ClouniConfigurationToolResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\"E\n\x06Status\x12\x12\n\x0eTEMPLATE_VALID\x10\x00\x12\x14\n\x10TEMPLATE_INVALID\x10\x01\x12\x06\n\x02OK\x10\x02\x12\t\n\x05\x45RROR\x10\x03\x32\x65\n\x12\x43louniProviderTool\x12O\n\x12\x43louniProviderTool\x12\x1a.ClouniProviderToolRequest\x1a\x1b.ClouniProviderToolResponse\"\x00\x32y\n\x17\x43louniConfigurationTool\x12^\n\x17\x43louniConfigurationTool\x12\x1f.ClouniConfigurationToolRequest\x1a .ClouniConfigurationToolResponse\"\x00\x62\x06proto3'
+  serialized_pb=b'\n\tapi.proto\"\xe8\x02\n\x19\x43louniProviderToolRequest\x12\x1d\n\x15template_file_content\x18\x01 \x01(\t\x12\x14\n\x0c\x63luster_name\x18\x02 \x01(\t\x12\x15\n\rvalidate_only\x18\x03 \x01(\x08\x12\x0e\n\x06\x64\x65lete\x18\x04 \x01(\x08\x12\x10\n\x08provider\x18\x05 \x01(\t\x12\x1a\n\x12\x63onfiguration_tool\x18\x06 \x01(\t\x12\r\n\x05\x65xtra\x18\x07 \x01(\t\x12\x11\n\tlog_level\x18\x08 \x01(\t\x12\r\n\x05\x64\x65\x62ug\x18\t \x01(\x08\x12\x16\n\x0ehost_parameter\x18\n \x01(\t\x12\x17\n\x0fpublic_key_path\x18\x0b \x01(\t\x12#\n\x1b\x63onfiguration_tool_endpoint\x18\x0c \x01(\t\x12\x1b\n\x13grpc_cotea_endpoint\x18\r \x01(\t\x12\x1d\n\x15\x64\x61tabase_api_endpoint\x18\x0e \x01(\t\"\xb7\x01\n\x1a\x43louniProviderToolResponse\x12\x32\n\x06status\x18\x01 \x01(\x0e\x32\".ClouniProviderToolResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\"E\n\x06Status\x12\x12\n\x0eTEMPLATE_VALID\x10\x00\x12\x14\n\x10TEMPLATE_INVALID\x10\x01\x12\x06\n\x02OK\x10\x02\x12\t\n\x05\x45RROR\x10\x03\"\x99\x02\n\x1e\x43louniConfigurationToolRequest\x12\x19\n\x11provider_template\x18\x01 \x01(\t\x12\x14\n\x0c\x63luster_name\x18\x02 \x01(\t\x12\x15\n\rvalidate_only\x18\x03 \x01(\x08\x12\x0e\n\x06\x64\x65lete\x18\x04 \x01(\x08\x12\x1a\n\x12\x63onfiguration_tool\x18\x05 \x01(\t\x12\r\n\x05\x65xtra\x18\x06 \x01(\t\x12\x11\n\tlog_level\x18\x07 \x01(\t\x12\r\n\x05\x64\x65\x62ug\x18\x08 \x01(\x08\x12\x1d\n\x15\x64\x61tabase_api_endpoint\x18\t \x01(\t\x12\x1b\n\x13grpc_cotea_endpoint\x18\n \x01(\t\x12\x16\n\x0ehost_parameter\x18\x0b \x01(\t\"\xc1\x01\n\x1f\x43louniConfigurationToolResponse\x12\x37\n\x06status\x18\x01 \x01(\x0e\x32\'.ClouniConfigurationToolResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\"E\n\x06Status\x12\x12\n\x0eTEMPLATE_VALID\x10\x00\x12\x14\n\x10TEMPLATE_INVALID\x10\x01\x12\x06\n\x02OK\x10\x02\x12\t\n\x05\x45RROR\x10\x03\"\x88\x01\n\x18SubmitDeploymentResponse\x12\x30\n\x06status\x18\x01 \x01(\x0e\x32 .SubmitDeploymentResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x0e\n\x06job_id\x18\x03 \x01(\t\"\x1b\n\x06Status\x12\x06\n\x02OK\x10\x00\x12\t\n\x05\x45RROR\x10\x01\"(\n\x16WatchDeploymentRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xc8\x02\n\x0f\x44\x65ploymentEvent\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12#\n\x04type\x18\x02 \x01(\x0e\x32\x15.DeploymentEvent.Type\x12\x15\n\rtemplate_name\x18\x03 \x01(\t\x12\x11\n\toperation\x18\x04 \x01(\t\x12\x12\n\nstart_time\x18\x05 \x01(\x01\x12\x13\n\x0b\x66inish_time\x18\x06 \x01(\x01\x12\x10\n\x08\x64uration\x18\x07 \x01(\x01\x12\r\n\x05\x65rror\x18\x08 \x01(\t\x12\x0f\n\x07\x63ontent\x18\t \x01(\t\"{\n\x04Type\x12\x15\n\x11OPERATION_STARTED\x10\x00\x12\x16\n\x12OPERATION_FINISHED\x10\x01\x12\x14\n\x10OPERATION_FAILED\x10\x02\x12\x17\n\x13\x44\x45PLOYMENT_FINISHED\x10\x03\x12\x15\n\x11\x44\x45PLOYMENT_FAILED\x10\x04\"\xbe\x01\n\x16OperationsGraphRequest\x12\x19\n\x11provider_template\x18\x01 \x01(\t\x12\x14\n\x0c\x63luster_name\x18\x02 \x01(\t\x12\x0e\n\x06\x64\x65lete\x18\x03 \x01(\x08\x12\x1a\n\x12\x63onfiguration_tool\x18\x04 \x01(\t\x12\x11\n\tlog_level\x18\x05 \x01(\t\x12\x16\n\x0ehost_parameter\x18\x06 \x01(\t\x12\x1c\n\x14historical_durations\x18\x07 \x01(\x08\"\xa3\x01\n\x17OperationsGraphResponse\x12/\n\x06status\x18\x01 \x01(\x0e\x32\x1f.OperationsGraphResponse.Status\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\r\n\x05graph\x18\x03 \x01(\t\x12\x0b\n\x03\x64ot\x18\x04 \x01(\t\x12\x0f\n\x07metrics\x18\x05 \x01(\t\"\x1b\n\x06Status\x12\x06\n\x02OK\x10\x00\x12\t\n\x05\x45RROR\x10\x01\x32\x65\n\x12\x43louniProviderTool\x12O\n\x12\x43louniProviderTool\x12\x1a.ClouniProviderToolRequest\x1a\x1b.ClouniProviderToolResponse\"\x00\x32\xd8\x02\n\x17\x43louniConfigurationTool\x12^\n\x17\x43louniConfigurationTool\x12\x1f.ClouniConfigurationToolRequest\x1a .ClouniConfigurationToolResponse\"\x00\x12P\n\x10SubmitDeployment\x12\x1f.ClouniConfigurationToolRequest\x1a\x19.SubmitDeploymentResponse\"\x00\x12@\n\x0fWatchDeployment\x12\x17.WatchDeploymentRequest\x1a\x10.DeploymentEvent\"\x00\x30\x01\x12I\n\x12GetOperationsGraph\x12\x17.OperationsGraphRequest\x1a\x18.OperationsGraphResponse\"\x00\x62\x06proto3'
 )
 
 
@@ -94,6 +94,96 @@ _CLOUNICONFIGURATIONTOOLRESPONSE_STATUS = _descriptor.EnumDescriptor(
 )
 _sym_db.RegisterEnumDescriptor(_CLOUNICONFIGURATIONTOOLRESPONSE_STATUS)
 
+_SUBMITDEPLOYMENTRESPONSE_STATUS = _descriptor.EnumDescriptor(
+  name='Status',
+  full_name='SubmitDeploymentResponse.Status',
+  filename=None,
+  file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='OK', index=0, number=0,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='ERROR', index=1, number=1,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1152,
+  serialized_end=1179,
+)
+_sym_db.RegisterEnumDescriptor(_SUBMITDEPLOYMENTRESPONSE_STATUS)
+
+_DEPLOYMENTEVENT_TYPE = _descriptor.EnumDescriptor(
+  name='Type',
+  full_name='DeploymentEvent.Type',
+  filename=None,
+  file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='OPERATION_STARTED', index=0, number=0,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='OPERATION_FINISHED', index=1, number=1,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='OPERATION_FAILED', index=2, number=2,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='DEPLOYMENT_FINISHED', index=3, number=3,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='DEPLOYMENT_FAILED', index=4, number=4,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1429,
+  serialized_end=1552,
+)
+_sym_db.RegisterEnumDescriptor(_DEPLOYMENTEVENT_TYPE)
+
+_OPERATIONSGRAPHRESPONSE_STATUS = _descriptor.EnumDescriptor(
+  name='Status',
+  full_name='OperationsGraphResponse.Status',
+  filename=None,
+  file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='OK', index=0, number=0,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='ERROR', index=1, number=1,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1152,
+  serialized_end=1179,
+)
+_sym_db.RegisterEnumDescriptor(_OPERATIONSGRAPHRESPONSE_STATUS)
+
 
 _CLOUNIPROVIDERTOOLREQUEST = _descriptor.Descriptor(
   name='ClouniProviderToolRequest',
@@ -413,14 +503,328 @@ _CLOUNICONFIGURATIONTOOLRESPONSE = _descriptor.Descriptor(
   serialized_end=1040,
 )
 
+
+_SUBMITDEPLOYMENTRESPONSE = _descriptor.Descriptor(
+  name='SubmitDeploymentResponse',
+  full_name='SubmitDeploymentResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='status', full_name='SubmitDeploymentResponse.status', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='SubmitDeploymentResponse.error', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='job_id', full_name='SubmitDeploymentResponse.job_id', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _SUBMITDEPLOYMENTRESPONSE_STATUS,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1043,
+  serialized_end=1179,
+)
+
+
+_WATCHDEPLOYMENTREQUEST = _descriptor.Descriptor(
+  name='WatchDeploymentRequest',
+  full_name='WatchDeploymentRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='job_id', full_name='WatchDeploymentRequest.job_id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1181,
+  serialized_end=1221,
+)
+
+
+_DEPLOYMENTEVENT = _descriptor.Descriptor(
+  name='DeploymentEvent',
+  full_name='DeploymentEvent',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='job_id', full_name='DeploymentEvent.job_id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='type', full_name='DeploymentEvent.type', index=1,
+      number=2, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='template_name', full_name='DeploymentEvent.template_name', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='operation', full_name='DeploymentEvent.operation', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='start_time', full_name='DeploymentEvent.start_time', index=4,
+      number=5, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='finish_time', full_name='DeploymentEvent.finish_time', index=5,
+      number=6, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='duration', full_name='DeploymentEvent.duration', index=6,
+      number=7, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='DeploymentEvent.error', index=7,
+      number=8, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='content', full_name='DeploymentEvent.content', index=8,
+      number=9, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _DEPLOYMENTEVENT_TYPE,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1224,
+  serialized_end=1552,
+)
+
+
+_OPERATIONSGRAPHREQUEST = _descriptor.Descriptor(
+  name='OperationsGraphRequest',
+  full_name='OperationsGraphRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='provider_template', full_name='OperationsGraphRequest.provider_template', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='cluster_name', full_name='OperationsGraphRequest.cluster_name', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='delete', full_name='OperationsGraphRequest.delete', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='configuration_tool', full_name='OperationsGraphRequest.configuration_tool', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='log_level', full_name='OperationsGraphRequest.log_level', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='host_parameter', full_name='OperationsGraphRequest.host_parameter', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='historical_durations', full_name='OperationsGraphRequest.historical_durations', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1555,
+  serialized_end=1745,
+)
+
+
+_OPERATIONSGRAPHRESPONSE = _descriptor.Descriptor(
+  name='OperationsGraphResponse',
+  full_name='OperationsGraphResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='status', full_name='OperationsGraphResponse.status', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='OperationsGraphResponse.error', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='graph', full_name='OperationsGraphResponse.graph', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='dot', full_name='OperationsGraphResponse.dot', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='metrics', full_name='OperationsGraphResponse.metrics', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _OPERATIONSGRAPHRESPONSE_STATUS,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1748,
+  serialized_end=1911,
+)
+
 _CLOUNIPROVIDERTOOLRESPONSE.fields_by_name['status'].enum_type = _CLOUNIPROVIDERTOOLRESPONSE_STATUS
 _CLOUNIPROVIDERTOOLRESPONSE_STATUS.containing_type = _CLOUNIPROVIDERTOOLRESPONSE
 _CLOUNICONFIGURATIONTOOLRESPONSE.fields_by_name['status'].enum_type = _CLOUNICONFIGURATIONTOOLRESPONSE_STATUS
 _CLOUNICONFIGURATIONTOOLRESPONSE_STATUS.containing_type = _CLOUNICONFIGURATIONTOOLRESPONSE
+_SUBMITDEPLOYMENTRESPONSE.fields_by_name['status'].enum_type = _SUBMITDEPLOYMENTRESPONSE_STATUS
+_SUBMITDEPLOYMENTRESPONSE_STATUS.containing_type = _SUBMITDEPLOYMENTRESPONSE
+_DEPLOYMENTEVENT.fields_by_name['type'].enum_type = _DEPLOYMENTEVENT_TYPE
+_DEPLOYMENTEVENT_TYPE.containing_type = _DEPLOYMENTEVENT
+_OPERATIONSGRAPHRESPONSE.fields_by_name['status'].enum_type = _OPERATIONSGRAPHRESPONSE_STATUS
+_OPERATIONSGRAPHRESPONSE_STATUS.containing_type = _OPERATIONSGRAPHRESPONSE
 DESCRIPTOR.message_types_by_name['ClouniProviderToolRequest'] = _CLOUNIPROVIDERTOOLREQUEST
 DESCRIPTOR.message_types_by_name['ClouniProviderToolResponse'] = _CLOUNIPROVIDERTOOLRESPONSE
 DESCRIPTOR.message_types_by_name['ClouniConfigurationToolRequest'] = _CLOUNICONFIGURATIONTOOLREQUEST
 DESCRIPTOR.message_types_by_name['ClouniConfigurationToolResponse'] = _CLOUNICONFIGURATIONTOOLRESPONSE
+DESCRIPTOR.message_types_by_name['SubmitDeploymentResponse'] = _SUBMITDEPLOYMENTRESPONSE
+DESCRIPTOR.message_types_by_name['WatchDeploymentRequest'] = _WATCHDEPLOYMENTREQUEST
+DESCRIPTOR.message_types_by_name['DeploymentEvent'] = _DEPLOYMENTEVENT
+DESCRIPTOR.message_types_by_name['OperationsGraphRequest'] = _OPERATIONSGRAPHREQUEST
+DESCRIPTOR.message_types_by_name['OperationsGraphResponse'] = _OPERATIONSGRAPHRESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 ClouniProviderToolRequest = _reflection.GeneratedProtocolMessageType('ClouniProviderToolRequest', (_message.Message,), {
@@ -451,6 +855,41 @@ ClouniConfigurationToolResponse = _reflection.GeneratedProtocolMessageType('Clou
   })
 _sym_db.RegisterMessage(ClouniConfigurationToolResponse)
 
+SubmitDeploymentResponse = _reflection.GeneratedProtocolMessageType('SubmitDeploymentResponse', (_message.Message,), {
+  'DESCRIPTOR' : _SUBMITDEPLOYMENTRESPONSE,
+  '__module__' : 'api_pb2'
+  # @@protoc_insertion_point(class_scope:SubmitDeploymentResponse)
+  })
+_sym_db.RegisterMessage(SubmitDeploymentResponse)
+
+WatchDeploymentRequest = _reflection.GeneratedProtocolMessageType('WatchDeploymentRequest', (_message.Message,), {
+  'DESCRIPTOR' : _WATCHDEPLOYMENTREQUEST,
+  '__module__' : 'api_pb2'
+  # @@protoc_insertion_point(class_scope:WatchDeploymentRequest)
+  })
+_sym_db.RegisterMessage(WatchDeploymentRequest)
+
+DeploymentEvent = _reflection.GeneratedProtocolMessageType('DeploymentEvent', (_message.Message,), {
+  'DESCRIPTOR' : _DEPLOYMENTEVENT,
+  '__module__' : 'api_pb2'
+  # @@protoc_insertion_point(class_scope:DeploymentEvent)
+  })
+_sym_db.RegisterMessage(DeploymentEvent)
+
+OperationsGraphRequest = _reflection.GeneratedProtocolMessageType('OperationsGraphRequest', (_message.Message,), {
+  'DESCRIPTOR' : _OPERATIONSGRAPHREQUEST,
+  '__module__' : 'api_pb2'
+  # @@protoc_insertion_point(class_scope:OperationsGraphRequest)
+  })
+_sym_db.RegisterMessage(OperationsGraphRequest)
+
+OperationsGraphResponse = _reflection.GeneratedProtocolMessageType('OperationsGraphResponse', (_message.Message,), {
+  'DESCRIPTOR' : _OPERATIONSGRAPHRESPONSE,
+  '__module__' : 'api_pb2'
+  # @@protoc_insertion_point(class_scope:OperationsGraphResponse)
+  })
+_sym_db.RegisterMessage(OperationsGraphResponse)
+
 
 
 _CLOUNIPROVIDERTOOL = _descriptor.ServiceDescriptor(
@@ -460,8 +899,8 @@ _CLOUNIPROVIDERTOOL = _descriptor.ServiceDescriptor(
   index=0,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1042,
-  serialized_end=1143,
+  serialized_start=1913,
+  serialized_end=2014,
   methods=[
   _descriptor.MethodDescriptor(
     name='ClouniProviderTool',
@@ -486,8 +925,8 @@ _CLOUNICONFIGURATIONTOOL = _descriptor.ServiceDescriptor(
   index=1,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1145,
-  serialized_end=1266,
+  serialized_start=2017,
+  serialized_end=2361,
   methods=[
   _descriptor.MethodDescriptor(
     name='ClouniConfigurationTool',
@@ -499,6 +938,36 @@ _CLOUNICONFIGURATIONTOOL = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='SubmitDeployment',
+    full_name='ClouniConfigurationTool.SubmitDeployment',
+    index=1,
+    containing_service=None,
+    input_type=_CLOUNICONFIGURATIONTOOLREQUEST,
+    output_type=_SUBMITDEPLOYMENTRESPONSE,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='WatchDeployment',
+    full_name='ClouniConfigurationTool.WatchDeployment',
+    index=2,
+    containing_service=None,
+    input_type=_WATCHDEPLOYMENTREQUEST,
+    output_type=_DEPLOYMENTEVENT,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='GetOperationsGraph',
+    full_name='ClouniConfigurationTool.GetOperationsGraph',
+    index=3,
+    containing_service=None,
+    input_type=_OPERATIONSGRAPHREQUEST,
+    output_type=_OPERATIONSGRAPHRESPONSE,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_CLOUNICONFIGURATIONTOOL)
 
@@ -80,6 +80,21 @@ class ClouniConfigurationToolStub(object):
                 request_serializer=api__pb2.ClouniConfigurationToolRequest.SerializeToString,
                 response_deserializer=api__pb2.ClouniConfigurationToolResponse.FromString,
                 )
+        self.SubmitDeployment = channel.unary_unary(
+                '/ClouniConfigurationTool/SubmitDeployment',
+                request_serializer=api__pb2.ClouniConfigurationToolRequest.SerializeToString,
+                response_deserializer=api__pb2.SubmitDeploymentResponse.FromString,
+                )
+        self.WatchDeployment = channel.unary_stream(
+                '/ClouniConfigurationTool/WatchDeployment',
+                request_serializer=api__pb2.WatchDeploymentRequest.SerializeToString,
+                response_deserializer=api__pb2.DeploymentEvent.FromString,
+                )
+        self.GetOperationsGraph = channel.unary_unary(
+                '/ClouniConfigurationTool/GetOperationsGraph',
+                request_serializer=api__pb2.OperationsGraphRequest.SerializeToString,
+                response_deserializer=api__pb2.OperationsGraphResponse.FromString,
+                )
 
 
 class ClouniConfigurationToolServicer(object):
@@ -91,6 +106,24 @@ class ClouniConfigurationToolServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubmitDeployment(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchDeployment(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetOperationsGraph(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ClouniConfigurationToolServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -99,6 +132,21 @@ def add_ClouniConfigurationToolServicer_to_server(servicer, server):
                     request_deserializer=api__pb2.ClouniConfigurationToolRequest.FromString,
                     response_serializer=api__pb2.ClouniConfigurationToolResponse.SerializeToString,
             ),
+            'SubmitDeployment': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitDeployment,
+                    request_deserializer=api__pb2.ClouniConfigurationToolRequest.FromString,
+                    response_serializer=api__pb2.SubmitDeploymentResponse.SerializeToString,
+            ),
+            'WatchDeployment': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchDeployment,
+                    request_deserializer=api__pb2.WatchDeploymentRequest.FromString,
+                    response_serializer=api__pb2.DeploymentEvent.SerializeToString,
+            ),
+            'GetOperationsGraph': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetOperationsGraph,
+                    request_deserializer=api__pb2.OperationsGraphRequest.FromString,
+                    response_serializer=api__pb2.OperationsGraphResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ClouniConfigurationTool', rpc_method_handlers)
@@ -125,3 +173,54 @@ class ClouniConfigurationTool(object):
             api__pb2.ClouniConfigurationToolResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubmitDeployment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ClouniConfigurationTool/SubmitDeployment',
+            api__pb2.ClouniConfigurationToolRequest.SerializeToString,
+            api__pb2.SubmitDeploymentResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchDeployment(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/ClouniConfigurationTool/WatchDeployment',
+            api__pb2.WatchDeploymentRequest.SerializeToString,
+            api__pb2.DeploymentEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetOperationsGraph(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ClouniConfigurationTool/GetOperationsGraph',
+            api__pb2.OperationsGraphRequest.SerializeToString,
+            api__pb2.OperationsGraphResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -3,31 +3,52 @@ import yaml
 from toscaparser.common.exception import ValidationError
 from yaml import Loader
 
-from configuration_tool.common.translator_to_configuration_dsl import translate
-from grpc_server.api_pb2 import ClouniConfigurationToolResponse, ClouniConfigurationToolRequest
+from configuration_tool.common.translator_to_configuration_dsl import translate, preload_translation_resources, \
+    get_operations_graph
+from configuration_tool.configuration_tools.common.configuration_tool import OPERATION_STARTED, OPERATION_FINISHED, \
+    OPERATION_FAILED
+from configuration_tool.configuration_tools.ansible.runner.runner import close_async_runner
+from grpc_server.api_pb2 import ClouniConfigurationToolResponse, ClouniConfigurationToolRequest, \
+    SubmitDeploymentResponse, DeploymentEvent, OperationsGraphResponse
 import grpc_server.api_pb2_grpc as api_pb2_grpc
 from concurrent import futures
+from collections import deque
 import logging
 import grpc
 import argparse
 import sys
 import atexit
+import multiprocessing
 import os
 import signal
-from time import sleep
+import threading
+import uuid
+from time import sleep, time
 from functools import partial
+import json
 
 SEPARATOR = ':'
 
-def exit_gracefully(server, logger, x, y):
+EVENT_TYPES = {
+    OPERATION_STARTED: DeploymentEvent.Type.OPERATION_STARTED,
+    OPERATION_FINISHED: DeploymentEvent.Type.OPERATION_FINISHED,
+    OPERATION_FAILED: DeploymentEvent.Type.OPERATION_FAILED
+}
+FINAL_EVENT_TYPES = (DeploymentEvent.Type.DEPLOYMENT_FINISHED, DeploymentEvent.Type.DEPLOYMENT_FAILED)
+
+def exit_gracefully(server, logger, translation_pool, deployments, x, y):
     server.stop(None)
+    if translation_pool:
+        translation_pool.close()
+    deployments.close()
+    close_async_runner()
     logger.info("Server stopped")
     print("Server stopped")
     sys.exit(0)
 
 
 class TranslatorServer(object):
-    def __init__(self, argv):
+    def __init__(self, argv, progress_callback=None):
         self.provider_template = argv['provider_template']
         self.cluster_name = argv['cluster_name']
         self.is_delete = argv['delete']
@@ -63,13 +84,181 @@ class TranslatorServer(object):
         self.output = translate(self.provider_template, self.validate_only, self.configuration_tool,
                                 self.cluster_name, is_delete=self.is_delete, extra=self.extra,
                                 log_level=self.log_level, debug=self.debug,
-                                database_api_endpoint=self.database_api_endpoint, grpc_cotea_endpoint=self.grpc_cotea_endpoint, host_ip_parameter=self.host_parameter)
+                                database_api_endpoint=self.database_api_endpoint, grpc_cotea_endpoint=self.grpc_cotea_endpoint, host_ip_parameter=self.host_parameter,
+                                progress_callback=progress_callback)
+
+
+def init_translation_worker():
+    # NOTE: workers are stopped by the server, not by terminal signals
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    preload_translation_resources()
+
+
+def translate_request(argv):
+    return TranslatorServer(argv).output
+
+
+def build_operations_graph(argv):
+    """
+    Builds graph of operations of the template without deployment
+    :return: dict returned by get_operations_graph
+    """
+    return get_operations_graph(argv['provider_template'], argv['configuration_tool'], argv['cluster_name'],
+                                is_delete=argv['delete'], log_level=argv['log_level'],
+                                host_ip_parameter=argv['host_parameter'],
+                                use_durations=argv['historical_durations'])
+
+
+def run_in_worker(function, argv):
+    """
+    Runs function of request in the worker process, exceptions are returned as text because
+    tosca-parser exceptions can't be pickled
+    :return: tuple (output, error, is_validation_error)
+    """
+    try:
+        return function(argv), None, False
+    except ValidationError as err:
+        logging.exception("Translation failed")
+        return None, str(err), True
+    except Exception as err:
+        logging.exception("Translation failed")
+        return None, str(err), False
+
+
+class TranslationPool(object):
+    """
+    Pool of pre-warmed processes which run translations, so gRPC threads only wait for results.
+    Worker is replaced with a new one after max_requests translations to bound memory growth
+    """
+    def __init__(self, processes, max_requests, logger):
+        self.logger = logger
+        # NOTE: workers are forked from clean forkserver process, not from the process with running gRPC server
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['configuration_tool.common.translator_to_configuration_dsl'])
+        if max_requests < 1:
+            max_requests = None
+        self.pool = context.Pool(processes, initializer=init_translation_worker, maxtasksperchild=max_requests)
+        self.logger.info("Translation pool with %s processes started", processes)
+
+    def run(self, function, argv):
+        """
+        Runs function of request in the worker process
+        :param function: module-level function, which takes dict of request arguments
+        """
+        output, error, is_validation_error = self.pool.apply(run_in_worker, (function, argv))
+        if error is not None:
+            if is_validation_error:
+                raise ValidationError(message=error)
+            raise Exception(error)
+        return output
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+        self.logger.info("Translation pool stopped")
+
+
+class DeploymentJob(object):
+    """
+    Events of the deployment, readers wait for new events on the condition
+    """
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.events = []
+        self.finished = False
+        self.condition = threading.Condition()
+
+    def add_event(self, event):
+        with self.condition:
+            self.events.append(event)
+            if event.type in FINAL_EVENT_TYPES:
+                self.finished = True
+            self.condition.notify_all()
+
+    def get_events(self, start, timeout=None):
+        """
+        Wait for events after start index
+        :return: tuple (list of new events, is deployment finished)
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > start or self.finished, timeout)
+            return self.events[start:], self.finished
+
+
+class DeploymentManager(object):
+    """
+    Runs deployments on the separate bounded executor, so they don't hold gRPC threads.
+    Only the last max_finished_jobs finished jobs are kept for watching
+    """
+    def __init__(self, max_deployments, max_finished_jobs, logger):
+        self.logger = logger
+        self.max_finished_jobs = max_finished_jobs
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_deployments,
+                                                   thread_name_prefix='deployment')
+        self.jobs = {}
+        self.finished_jobs = deque()
+        self.lock = threading.Lock()
+
+    def submit(self, args):
+        job = DeploymentJob(str(uuid.uuid4()))
+        with self.lock:
+            self.jobs[job.job_id] = job
+        self.executor.submit(self._run, job, args)
+        self.logger.info("Deployment job %s queued", job.job_id)
+        return job.job_id
+
+    def get_job(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job, args):
+        def progress_callback(event_type, name, operation, start_time, finish_time, error):
+            event = DeploymentEvent(job_id=job.job_id, type=EVENT_TYPES[event_type], template_name=name,
+                                    operation=operation)
+            if start_time is not None:
+                event.start_time = start_time
+            if finish_time is not None:
+                event.finish_time = finish_time
+                if start_time is not None:
+                    event.duration = finish_time - start_time
+            if error is not None:
+                event.error = error
+            job.add_event(event)
+
+        self.logger.info("Deployment job %s started", job.job_id)
+        start_time = time()
+        try:
+            output = TranslatorServer(args, progress_callback).output
+            event = DeploymentEvent(job_id=job.job_id, type=DeploymentEvent.Type.DEPLOYMENT_FINISHED, content=output)
+            self.logger.info("Deployment job %s finished", job.job_id)
+        except Exception as err:
+            self.logger.exception("Deployment job %s failed", job.job_id)
+            event = DeploymentEvent(job_id=job.job_id, type=DeploymentEvent.Type.DEPLOYMENT_FAILED, error=str(err))
+        event.start_time = start_time
+        event.finish_time = time()
+        event.duration = event.finish_time - start_time
+        job.add_event(event)
+        with self.lock:
+            self.finished_jobs.append(job.job_id)
+            while len(self.finished_jobs) > self.max_finished_jobs:
+                self.jobs.pop(self.finished_jobs.popleft(), None)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.logger.info("Deployment executor stopped")
 
 
 class ClouniConfigurationToolServicer(api_pb2_grpc.ClouniConfigurationToolServicer):
-    def __init__(self, logger):
+    def __init__(self, logger, translation_pool=None, deployments=None):
         super().__init__()
         self.logger = logger
+        self.translation_pool = translation_pool
+        self.deployments = deployments
+
+    def _Run(self, function, args):
+        if self.translation_pool:
+            return self.translation_pool.run(function, args)
+        return function(args)
 
     def ClouniConfigurationTool(self, request, context):
         self.logger.info("Request received")
@@ -83,7 +272,7 @@ class ClouniConfigurationToolServicer(api_pb2_grpc.ClouniConfigurationToolServic
             else:
                 self.logger.info("Request - status OK")
                 response.status = ClouniConfigurationToolResponse.Status.OK
-            response.content = TranslatorServer(args).output
+            response.content = self._Run(translate_request, args)
 
             self.logger.info("Response send")
             return response
@@ -107,6 +296,85 @@ class ClouniConfigurationToolServicer(api_pb2_grpc.ClouniConfigurationToolServic
             return response
 
 
+    def SubmitDeployment(self, request, context):
+        self.logger.info("Deployment request received")
+        self.logger.debug("Request content: %s", str(request))
+        response = SubmitDeploymentResponse()
+        try:
+            if request.validate_only:
+                raise Exception("Validate only request can't be submitted as deployment")
+            args = self._RequestParse(request)
+            response.job_id = self.deployments.submit(args)
+            response.status = SubmitDeploymentResponse.Status.OK
+            self.logger.info("Deployment request - status OK")
+        except Exception as err:
+            self.logger.exception("\n")
+            self.logger.info("Deployment request - status ERROR")
+            response.status = SubmitDeploymentResponse.Status.ERROR
+            response.error = str(err)
+        self.logger.info("Response send")
+        return response
+
+    def WatchDeployment(self, request, context):
+        self.logger.info("Watch request for deployment job %s received", request.job_id)
+        job = self.deployments.get_job(request.job_id)
+        if job is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Deployment job %s not found" % request.job_id)
+            return
+        index = 0
+        while context.is_active():
+            events, finished = job.get_events(index, timeout=1)
+            for event in events:
+                yield event
+            index += len(events)
+            if finished:
+                self.logger.info("Watch of deployment job %s finished", request.job_id)
+                return
+
+    def GetOperationsGraph(self, request, context):
+        self.logger.info("Operations graph request received")
+        self.logger.debug("Request content: %s", str(request))
+        response = OperationsGraphResponse()
+        try:
+            args = self._OperationsGraphRequestParse(request)
+            result = self._Run(build_operations_graph, args)
+            response.graph = json.dumps(result['graph'])
+            response.dot = result['dot']
+            response.metrics = json.dumps(result['metrics'])
+            response.status = OperationsGraphResponse.Status.OK
+            self.logger.info("Operations graph request - status OK")
+        except Exception as err:
+            self.logger.exception("\n")
+            self.logger.info("Operations graph request - status ERROR")
+            response.status = OperationsGraphResponse.Status.ERROR
+            response.error = str(err)
+        self.logger.info("Response send")
+        return response
+
+    def _OperationsGraphRequestParse(self, request):
+        args = {}
+        if request.provider_template == "":
+            raise Exception("Request field 'provider_template' is required")
+        args['provider_template'] = request.provider_template
+        # NOTE: instance model of cluster isn't changed, so the name is optional
+        args['cluster_name'] = request.cluster_name
+        args['delete'] = bool(request.delete)
+        if request.configuration_tool != "":
+            args['configuration_tool'] = request.configuration_tool
+        else:
+            args['configuration_tool'] = 'ansible'
+        if request.host_parameter != "":
+            args['host_parameter'] = request.host_parameter
+        else:
+            args['host_parameter'] = 'public_address'
+        if request.log_level != "":
+            args['log_level'] = request.log_level
+        else:
+            args['log_level'] = 'info'
+        args['historical_durations'] = bool(request.historical_durations)
+        return args
+
     def _RequestParse(self, request):
         args = {}
         if request.provider_template == "":
@@ -163,6 +431,26 @@ def parse_args(argv):
                         default=10,
                         type=int,
                         help='Maximum of working gRPC threads, default 10')
+    parser.add_argument('--translation-processes',
+                        metavar='<number of processes>',
+                        default=0,
+                        type=int,
+                        help='Number of worker processes for translation, by default translation runs in gRPC threads')
+    parser.add_argument('--translation-process-max-requests',
+                        metavar='<number of requests>',
+                        default=100,
+                        type=int,
+                        help='Number of translations after which worker process is replaced, 0 - never, default 100')
+    parser.add_argument('--max-deployments',
+                        metavar='<number of deployments>',
+                        default=4,
+                        type=int,
+                        help='Maximum of deployments submitted with SubmitDeployment running at once, default 4')
+    parser.add_argument('--max-finished-deployments',
+                        metavar='<number of deployments>',
+                        default=100,
+                        type=int,
+                        help='Number of finished deployment jobs kept for WatchDeployment, default 100')
     parser.add_argument('--host',
                         metavar='<host_name/host_address>',
                         action='append',
@@ -193,7 +481,9 @@ def parse_args(argv):
     except argparse.ArgumentError:
         logging.critical("Failed to parse arguments. Exiting")
         raise Exception("Failed to parse arguments. Exiting")
-    return args.max_workers, args.host, args.port, args.verbose, args.no_host_error, args.stop, args.foreground
+    return args.max_workers, args.host, args.port, args.verbose, args.no_host_error, args.stop, args.foreground, \
+        args.translation_processes, args.translation_process_max_requests, args.max_deployments, \
+        args.max_finished_deployments
 
 def serve(argv =  None):
     # Log init
@@ -207,7 +497,8 @@ def serve(argv =  None):
     # Argparse
     if argv is None:
         argv = sys.argv[1:]
-    max_workers, hosts, port, verbose, no_host_error, stop, foreground = parse_args(argv)
+    max_workers, hosts, port, verbose, no_host_error, stop, foreground, translation_processes, \
+        translation_process_max_requests, max_deployments, max_finished_deployments = parse_args(argv)
     if stop:
         try:
             with open("/tmp/.clouni-configuration-tool.pid", mode='r') as f:
@@ -247,16 +538,30 @@ def serve(argv =  None):
     if max_workers < 1:
         logger.critical("Invalid max_workers argument: should be greater than 0. Exiting")
         raise Exception("Invalid max_workers argument: should be greater than 0. Exiting")
+    if translation_processes < 0:
+        logger.critical("Invalid translation_processes argument: should be greater or equal than 0. Exiting")
+        raise Exception("Invalid translation_processes argument: should be greater or equal than 0. Exiting")
+    if max_deployments < 1:
+        logger.critical("Invalid max_deployments argument: should be greater than 0. Exiting")
+        raise Exception("Invalid max_deployments argument: should be greater than 0. Exiting")
+    if max_finished_deployments < 0:
+        logger.critical("Invalid max_finished_deployments argument: should be greater or equal than 0. Exiting")
+        raise Exception("Invalid max_finished_deployments argument: should be greater or equal than 0. Exiting")
     if port == 0:
         logger.warning("Port 0 given - port will be runtime chosen - may be an error")
     if port < 0:
         logger.critical("Invalid port argument: should be greater or equal than 0. Exiting")
         raise Exception("Invalid port argument: should be greater or equal than 0. Exiting")
+    # Starting translation processes before gRPC server
+    translation_pool = None
+    if translation_processes > 0:
+        translation_pool = TranslationPool(translation_processes, translation_process_max_requests, logger)
+    deployments = DeploymentManager(max_deployments, max_finished_deployments, logger)
     # Starting server
     try:
         server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
         api_pb2_grpc.add_ClouniConfigurationToolServicer_to_server(
-            ClouniConfigurationToolServicer(logger), server)
+            ClouniConfigurationToolServicer(logger, translation_pool, deployments), server)
         host_exist = False
         for host in hosts:
             try:
@@ -281,8 +586,8 @@ def serve(argv =  None):
     except Exception:
         logger.critical("Unable to start the server")
         raise Exception("Unable to start the server")
-    signal.signal(signal.SIGINT, partial(exit_gracefully, server, logger))
-    signal.signal(signal.SIGTERM, partial(exit_gracefully, server, logger))
+    signal.signal(signal.SIGINT, partial(exit_gracefully, server, logger, translation_pool, deployments))
+    signal.signal(signal.SIGTERM, partial(exit_gracefully, server, logger, translation_pool, deployments))
     while True:
         sleep(100)
 
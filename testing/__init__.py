@@ -1,3 +1,15 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# NOTE: persistent state of translations, like instance model database, is written to the temporary directory
+# removed after tests, not to the data directory of user. Worker processes inherit the directory of tests
+if 'CLOUNI_TEST_DATA_HOME' not in os.environ:
+    os.environ['CLOUNI_TEST_DATA_HOME'] = tempfile.mkdtemp(prefix='clouni_test_data_')
+    atexit.register(shutil.rmtree, os.environ['CLOUNI_TEST_DATA_HOME'], True)
+os.environ['XDG_DATA_HOME'] = os.environ['CLOUNI_TEST_DATA_HOME']
+
 '''
 Asserts:
   assertEqual(a, b)
@@ -0,0 +1,58 @@
+"""
+Memory benchmark of ProviderToscaTemplate on a synthetic template: one network and ports connected to it,
+every port has create and configure operations.
+
+Usage: python -m testing.bench_memory [--nodes 2000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from configuration_tool.common.tosca_reserved_keys import TOSCA_DEFINITIONS_VERSION, TOPOLOGY_TEMPLATE, \
+    NODE_TEMPLATES, TYPE, PROPERTIES, REQUIREMENTS, INTERFACES, NODE, NAME
+from configuration_tool.providers.common.tosca_template import ProviderToscaTemplate, load_provider_definitions
+
+PROVIDER = 'openstack'
+NETWORK = 'network'
+
+
+def get_template(nodes):
+    node_templates = {NETWORK: {TYPE: 'openstack.nodes.Network', PROPERTIES: {NAME: NETWORK}}}
+    for i in range(nodes - 1):
+        node_templates['port_%s' % i] = {
+            TYPE: 'openstack.nodes.Port',
+            PROPERTIES: {NAME: 'port_%s' % i, 'fixed_ips': [{'ip_address': '192.168.0.%s' % (i % 250 + 2)}]},
+            REQUIREMENTS: [{'network': {NODE: NETWORK}}],
+            INTERFACES: {'Standard': {
+                'create': {'implementation': 'create.yaml', 'inputs': {'port': 'port_%s' % i}},
+                'configure': {'implementation': 'configure.yaml', 'inputs': {'port': 'port_%s' % i}}
+            }}
+        }
+    return {TOSCA_DEFINITIONS_VERSION: 'tosca_simple_yaml_1_0', TOPOLOGY_TEMPLATE: {NODE_TEMPLATES: node_templates}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory benchmark of ProviderToscaTemplate')
+    parser.add_argument('--nodes', type=int, default=2000, help='number of node templates')
+    args = parser.parse_args()
+
+    # NOTE: process-wide caches are filled before measurement
+    load_provider_definitions(PROVIDER)
+    ProviderToscaTemplate(get_template(2), PROVIDER, 'ansible', 'bench', None, False, None)
+    template = get_template(args.nodes)
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.time()
+    tosca = ProviderToscaTemplate(template, PROVIDER, 'ansible', 'bench', None, False, None)
+    duration = time.time() - start_time
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('Nodes: %s, operations: %s' % (args.nodes, len(tosca.provider_operations)))
+    print('Time: %.2f s' % duration)
+    print('Retained: %.1f MiB, peak: %.1f MiB' % (retained / 2 ** 20, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import yaml
+from yaml import Loader
+
+from configuration_tool.common.operations_graph import OperationDurations
+from configuration_tool.common.translator_to_configuration_dsl import translate
+from configuration_tool.configuration_tools.ansible.configuration_tool import AnsibleConfigurationTool
+from configuration_tool.configuration_tools.ansible.instance_model.instance_model import \
+    delete_cluster_from_instance_model
+from configuration_tool.configuration_tools.common.configuration_tool import OPERATION_STARTED, OPERATION_FINISHED
+
+TEST = 'test'
+OPERATION_DURATION = 0.2
+
+
+def fake_run(self, ansible_tasks, grpc_cotea_endpoint, hosts, name, op, q, extra, ansible_config, attributes,
+             outputs, properties, priority=0):
+    result = {name + '.' + op: {'outputs': [], 'attributes': [], 'properties': []}}
+    threading.Timer(OPERATION_DURATION, q.put, (result,)).start()
+
+
+class TestAnsibleScheduling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.durations = OperationDurations(os.path.join(self.directory, 'durations.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        delete_cluster_from_instance_model(TEST)
+
+    def translate(self, filename):
+        with open(os.path.join('testing', 'examples', filename), 'r') as f:
+            template = yaml.load(f, Loader=Loader)
+        events = []
+        with mock.patch.object(AnsibleConfigurationTool, 'run', fake_run), \
+                mock.patch('configuration_tool.configuration_tools.ansible.configuration_tool.operation_durations',
+                           self.durations):
+            translate(yaml.dump(template), False, 'ansible', TEST, extra={'global': {}}, grpc_cotea_endpoint='test',
+                      progress_callback=lambda *args: events.append(args))
+        return events
+
+    def test_successor_starts_without_delay(self):
+        events = self.translate('test_server_name_openstack.yaml')
+        self.assertEqual([e[0] for e in events], [OPERATION_STARTED, OPERATION_FINISHED] * 2)
+        keypair_finished = events[1]
+        server_started = events[2]
+        self.assertEqual(keypair_finished[1], 'tosca_server_example_keypair')
+        self.assertEqual(server_started[1], 'tosca_server_example_server')
+        self.assertLess(server_started[3] - keypair_finished[4], 0.5)
+        self.assertGreaterEqual(keypair_finished[4] - keypair_finished[3], OPERATION_DURATION)
+
+    def test_durations_are_recorded(self):
+        self.translate('test_server_name_openstack.yaml')
+        durations = OperationDurations(self.durations.filename)
+        self.assertGreaterEqual(durations.get_weight('openstack.nodes.Server', 'create'), OPERATION_DURATION)
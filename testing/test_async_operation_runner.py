@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import unittest
+from queue import Queue
+
+from configuration_tool.configuration_tools.ansible.runner.runner import AsyncOperationRunner, OperationError, \
+    run_and_finish
+
+
+async def wait_and_append(runner, started, release, finished, value):
+    started.put(value)
+    while not release.is_set():
+        await asyncio.sleep(0.01)
+    finished.put(value)
+
+
+async def get_counters(runner):
+    return runner.get_in_flight(), runner.get_queue_depth()
+
+
+class TestAsyncOperationRunner(unittest.TestCase):
+
+    def tearDown(self):
+        if not self.runner.closed:
+            self.runner.close()
+
+    def get_counters(self):
+        # NOTE: coroutine is scheduled after all submitted operations are queued, counters are read in the loop
+        return self.runner.run(get_counters(self.runner))
+
+    def test_in_flight_operations_are_bounded(self):
+        self.runner = AsyncOperationRunner(max_workers=2)
+        release = threading.Event()
+        started = Queue()
+        finished = Queue()
+        for i in range(5):
+            self.runner.submit(wait_and_append, (started, release, finished, i))
+        started.get(timeout=5)
+        started.get(timeout=5)
+        self.assertEqual(self.get_counters(), (2, 3))
+        self.assertTrue(started.empty())
+        release.set()
+        self.assertEqual(sorted(finished.get(timeout=5) for _ in range(5)), list(range(5)))
+        self.assertEqual(self.get_counters(), (0, 0))
+
+    def test_queued_operations_are_started_by_priority(self):
+        self.runner = AsyncOperationRunner(max_workers=1)
+        release = threading.Event()
+        done = threading.Event()
+        started = Queue()
+        finished = Queue()
+        self.runner.submit(wait_and_append, (started, release, finished, None))
+        self.assertIsNone(started.get(timeout=5))
+        self.runner.submit(wait_and_append, (started, done, finished, 'low'), priority=2)
+        self.runner.submit(wait_and_append, (started, done, finished, 'high'), priority=0)
+        self.runner.submit(wait_and_append, (started, done, finished, 'middle'), priority=1)
+        self.assertEqual(self.get_counters(), (1, 3))
+        done.set()
+        release.set()
+        self.assertEqual([started.get(timeout=5) for _ in range(3)], ['high', 'middle', 'low'])
+
+    def test_closed_runner_reports_operations(self):
+        self.runner = AsyncOperationRunner(max_workers=1)
+        started = threading.Event()
+
+        async def run_forever(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        self.runner.run_ansible = run_forever
+        q = Queue()
+        for name in ('in_flight', 'queued'):
+            self.runner.submit(run_and_finish, ([], 'localhost:50151', {}, {}, {}, name, 'create', q, {}, None,
+                                                None, None, None))
+        self.assertTrue(started.wait(5))
+        self.runner.close()
+        results = [q.get(timeout=5), q.get(timeout=5)]
+        self.assertTrue(all(isinstance(result, OperationError) for result in results))
+        self.assertEqual(sorted(result.name for result in results), ['in_flight', 'queued'])
+        self.assertTrue(q.empty())
+
+    def test_queued_operation_is_logged(self):
+        self.runner = AsyncOperationRunner(max_workers=1)
+        release = threading.Event()
+        started = Queue()
+        with self.assertLogs(level='DEBUG') as logs:
+            self.runner.submit(wait_and_append, (started, release, Queue(), None))
+            started.get(timeout=5)
+        release.set()
+        self.assertIn('Operation queued, queue depth 1, operations in flight 0', '\n'.join(logs.output))
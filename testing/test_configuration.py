@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from configuration_tool.common.configuration import Configuration
+from configuration_tool.providers.common.provider_configuration import ProviderConfiguration
+
+
+class TestConfigurationRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'test.cfg')
+        self.write_config('first')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_config(self, value):
+        with open(self.filename, 'w') as f:
+            f.write('[main]\nparam = %s\nlist_param = a,b\n' % value)
+
+    def test_file_is_parsed_once(self):
+        first = Configuration(self.filename)
+        second = Configuration(self.filename)
+        self.assertIs(first.config, second.config)
+        self.assertEqual(first.get_section('main'), {'param': 'first', 'list_param': ['a', 'b']})
+
+    def test_section_copy_is_returned(self):
+        config = Configuration(self.filename)
+        section = config.get_section('main')
+        section['list_param'].append('c')
+        self.assertEqual(config.get_section('main')['list_param'], ['a', 'b'])
+
+    def test_changed_file_is_parsed_again(self):
+        first = Configuration(self.filename)
+        self.write_config('second')
+        os.utime(self.filename, (time.time() + 10, time.time() + 10))
+        second = Configuration(self.filename)
+        self.assertIsNot(first.config, second.config)
+        self.assertEqual(second.get_section('main')['param'], 'second')
+
+    def test_provider_configuration(self):
+        first = ProviderConfiguration('openstack')
+        second = ProviderConfiguration('openstack')
+        self.assertIs(first.config, second.config)
+        self.assertEqual(first.get_section('ansible')['module_prefix'], 'os_')
@@ -0,0 +1,378 @@
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent import futures
+from queue import Queue
+
+import grpc
+
+from configuration_tool.configuration_tools.ansible.runner import runner, cotea_pb2_grpc
+from configuration_tool.configuration_tools.ansible.runner.cotea_pb2 import StartSessionMSG, Status, TaskResults, \
+    TaskResult, TaskListResults, GatewayHealthStatus
+
+
+class FakeCoteaGateway(cotea_pb2_grpc.CoteaGatewayServicer):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.active_sessions = set()
+        self.tasks = []
+        self.calls = 0
+        self.ok = True
+        self.executions_count = 0
+
+    def StartSession(self, request, context):
+        with self.lock:
+            self.sessions += 1
+            session_id = str(self.sessions)
+            self.active_sessions.add(session_id)
+        return StartSessionMSG(ok=True, ID=session_id)
+
+    def InitExecution(self, request, context):
+        return Status(ok=request.session_ID in self.active_sessions)
+
+    def run_task(self, session_id, task_str):
+        if session_id not in self.active_sessions:
+            return TaskResults(task_adding_ok=False, task_adding_error='Session not found')
+        task = json.loads(task_str)
+        self.tasks.append(task)
+        result = TaskResult(ok=True, task_name=task.get('name', ''), results_dict_str=json.dumps({}))
+        if task.get('fail'):
+            result.is_failed = True
+            result.msg = task['fail']
+        return TaskResults(task_adding_ok=True, task_results=[result])
+
+    def RunTask(self, request, context):
+        self.calls += 1
+        return self.run_task(request.session_ID, request.task_str)
+
+    def RunTasks(self, request, context):
+        self.calls += 1
+        response = TaskListResults()
+        for task_str in request.task_strs:
+            task_results = self.run_task(request.session_ID, task_str)
+            response.results.append(task_results)
+            if not task_results.task_adding_ok or any(r.is_failed for r in task_results.task_results):
+                break
+        return response
+
+    def StopExecution(self, request, context):
+        with self.lock:
+            self.active_sessions.discard(request.session_ID)
+        return Status(ok=True)
+
+    def HealthCheck(self, request, context):
+        return GatewayHealthStatus(ok=self.ok, executions_count=self.executions_count)
+
+
+class LegacyCoteaGateway(FakeCoteaGateway):
+
+    def RunTasks(self, request, context):
+        self.calls += 1
+        context.abort(grpc.StatusCode.UNIMPLEMENTED, 'Method not implemented!')
+
+    def HealthCheck(self, request, context):
+        context.abort(grpc.StatusCode.UNIMPLEMENTED, 'Method not implemented!')
+
+
+class TestCoteaRunner(unittest.TestCase):
+    GATEWAY = FakeCoteaGateway
+
+    def setUp(self):
+        self.gateway = self.GATEWAY()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        cotea_pb2_grpc.add_CoteaGatewayServicer_to_server(self.gateway, self.server)
+        port = self.server.add_insecure_port('localhost:0')
+        self.server.start()
+        self.endpoint = 'localhost:%s' % port
+
+    def tearDown(self):
+        runner.close_async_runner()
+        self.server.stop(None)
+
+    def run_ansible(self, *args, **kwargs):
+        return runner.run_ansible(*args, **kwargs)
+
+    def close_sessions(self):
+        runner.close_async_runner()
+
+    def get_channel(self, grpc_cotea_endpoint):
+        async_runner = runner.get_async_runner()
+
+        async def get_channel():
+            return async_runner.get_channel(grpc_cotea_endpoint)
+        return async_runner.run(get_channel())
+
+    def test_channel_is_reused(self):
+        first = self.get_channel(self.endpoint)
+        self.assertIs(first, self.get_channel(self.endpoint))
+        self.assertIsNot(first, self.get_channel('localhost:1'))
+
+    def test_channels_are_closed(self):
+        first = self.get_channel(self.endpoint)
+        runner.close_async_runner()
+        self.assertIsNone(runner._async_runner)
+        self.assertIsNot(first, self.get_channel(self.endpoint))
+
+    def test_run_ansible(self):
+        self.run_ansible([{'name': 'first'}, {'name': 'second'}], self.endpoint, {}, {}, 'localhost')
+        self.run_ansible([{'name': 'third'}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual([t['name'] for t in self.gateway.tasks], ['first', 'second', 'third'])
+        self.assertEqual(self.gateway.active_sessions, set())
+
+    def test_failed_task(self):
+        with self.assertRaises(Exception) as e:
+            self.run_ansible([{'name': 'first', 'fail': 'error message'}], self.endpoint, {}, {}, 'localhost')
+        self.assertIn('error message', str(e.exception))
+        self.assertEqual(self.gateway.active_sessions, set())
+
+    def test_session_is_reused(self):
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.run_ansible([{'name': 'third'}], self.endpoint, {}, {}, 'server', session_idle_timeout=60)
+        self.assertEqual(self.gateway.sessions, 2)
+        self.assertEqual(len(self.gateway.active_sessions), 2)
+        self.close_sessions()
+        self.assertEqual(self.gateway.active_sessions, set())
+
+    def test_failed_session_is_not_reused(self):
+        with self.assertRaises(Exception):
+            self.run_ansible([{'name': 'first', 'fail': 'error'}], self.endpoint, {}, {}, 'localhost',
+                               session_idle_timeout=60)
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.assertEqual(self.gateway.sessions, 2)
+        self.assertEqual(len(self.gateway.active_sessions), 1)
+
+    def test_unusable_session_is_replaced(self):
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.gateway.active_sessions.clear()
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.assertEqual(self.gateway.sessions, 2)
+        self.assertEqual([t['name'] for t in self.gateway.tasks], ['first', 'second'])
+
+    def test_idle_session_is_evicted(self):
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=0.01)
+        time.sleep(0.05)
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=0.01)
+        self.assertEqual(self.gateway.sessions, 2)
+        self.assertEqual(len(self.gateway.active_sessions), 1)
+
+    def test_tasks_are_sent_at_once(self):
+        tasks = [{'name': str(i)} for i in range(7)]
+        self.run_ansible(tasks, self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.assertEqual(self.gateway.calls, 1)
+        self.assertEqual(self.gateway.tasks, tasks)
+
+    def test_tasks_after_failed_are_not_run(self):
+        with self.assertRaises(Exception):
+            self.run_ansible([{'name': 'first', 'fail': 'error'}, {'name': 'second'}], self.endpoint, {}, {},
+                               'localhost')
+        self.assertEqual([t['name'] for t in self.gateway.tasks], ['first'])
+
+
+class TestLegacyCoteaRunner(TestCoteaRunner):
+    GATEWAY = LegacyCoteaGateway
+
+    def tearDown(self):
+        super(TestLegacyCoteaRunner, self).tearDown()
+        runner._batch_unsupported_endpoints.discard(self.endpoint)
+
+    def test_tasks_are_sent_at_once(self):
+        tasks = [{'name': str(i)} for i in range(7)]
+        self.run_ansible(tasks, self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        # failed RunTasks and RunTask per task
+        self.assertEqual(self.gateway.calls, 8)
+        self.assertEqual(self.gateway.tasks, tasks)
+        self.run_ansible(tasks, self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.assertEqual(self.gateway.calls, 15)
+
+
+class TestAsyncCoteaRunner(TestCoteaRunner):
+
+    def setUp(self):
+        super(TestAsyncCoteaRunner, self).setUp()
+        self.runner = runner.AsyncOperationRunner(max_workers=2)
+
+    def tearDown(self):
+        self.runner.close()
+        super(TestAsyncCoteaRunner, self).tearDown()
+
+    def run_ansible(self, ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, **kwargs):
+        return self.runner.run(self.runner.run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars,
+                                                       hosts, **kwargs))
+
+    def close_sessions(self):
+        self.runner.run(self.runner.close_expired_sessions(force=True))
+
+    def test_operations_are_run(self):
+        q = Queue()
+        for i in range(5):
+            self.runner.submit(runner.run_and_finish, (
+                [{'name': str(i)}], self.endpoint, {}, {}, 'localhost', 'node_' + str(i), 'create', q, None, None,
+                None, None, None, 60), priority=-i)
+        results = [q.get(timeout=5) for _ in range(5)]
+        self.assertEqual(sorted(list(r.keys())[0] for r in results), ['node_%s.create' % i for i in range(5)])
+        self.assertLessEqual(self.gateway.sessions, 2)
+        self.assertEqual(self.runner.get_in_flight(), 0)
+
+    def test_failed_operation(self):
+        q = Queue()
+        self.runner.submit(runner.run_and_finish, (
+            [{'name': 'first', 'fail': 'error'}], self.endpoint, {}, {}, 'localhost', 'node', 'create', q, None, None,
+            None, None, None, 60))
+        error = q.get(timeout=5)
+        self.assertIsInstance(error, runner.OperationError)
+        self.assertEqual(error.name, 'node')
+        self.assertEqual(self.gateway.active_sessions, set())
+
+
+class TestCoteaEndpointBalancer(unittest.TestCase):
+
+    def setUp(self):
+        self.gateways = []
+        self.servers = []
+        self.endpoints = []
+        # NOTE: the second gateway doesn't implement HealthCheck
+        for gateway_class in (FakeCoteaGateway, LegacyCoteaGateway):
+            gateway = gateway_class()
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+            cotea_pb2_grpc.add_CoteaGatewayServicer_to_server(gateway, server)
+            port = server.add_insecure_port('localhost:0')
+            server.start()
+            self.gateways.append(gateway)
+            self.servers.append(server)
+            self.endpoints.append('localhost:%s' % port)
+        self.endpoint = ','.join(self.endpoints)
+        runner.endpoint_balancer.check_interval = 0
+        runner.endpoint_balancer.ejection_time = 0.1
+
+    def tearDown(self):
+        runner.close_async_runner()
+        runner.endpoint_balancer.states.clear()
+        runner.endpoint_balancer.check_interval = runner.HEALTH_CHECK_INTERVAL
+        runner.endpoint_balancer.ejection_time = runner.EJECTION_TIME
+        for server in self.servers:
+            server.stop(None)
+
+    def run_ansible(self, *args, **kwargs):
+        return runner.run_ansible(*args, **kwargs)
+
+    def test_endpoints_are_parsed(self):
+        self.assertEqual(runner.get_endpoints(' first:1, second:2,'), ['first:1', 'second:2'])
+        self.assertEqual(runner.get_endpoints('first:1'), ['first:1'])
+
+    def test_least_loaded_endpoint_is_used(self):
+        self.gateways[0].executions_count = 5
+        for i in range(3):
+            self.run_ansible([{'name': str(i)}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual(self.gateways[0].sessions, 0)
+        self.assertEqual(self.gateways[1].sessions, 3)
+        self.gateways[0].executions_count = 0
+        self.run_ansible([{'name': 'last'}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual(self.gateways[0].sessions, 1)
+
+    def test_running_operations_are_spread(self):
+        balancer = runner.CoteaEndpointBalancer()
+        first = balancer.acquire(self.endpoints)
+        second = balancer.acquire(self.endpoints)
+        self.assertEqual(sorted([first, second]), sorted(self.endpoints))
+        balancer.release(first)
+        self.assertEqual(balancer.acquire(self.endpoints), first)
+
+    def test_load_of_endpoints_is_comparable(self):
+        balancer = runner.CoteaEndpointBalancer()
+        first = balancer.acquire(self.endpoints[:1])
+        # NOTE: executions of this process reported by gateway are not counted twice
+        balancer.set_health(first, True, 3)
+        self.assertEqual(balancer.get_load(balancer.states[first]), 3)
+        balancer.set_health(self.endpoints[1], True)
+        balancer.acquire(self.endpoints[1:])
+        self.assertEqual(balancer.acquire(self.endpoints), self.endpoints[1])
+
+    def test_unhealthy_endpoint_is_ejected_and_admitted(self):
+        self.gateways[0].ok = False
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost')
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual(self.gateways[0].sessions, 0)
+        self.assertEqual(self.gateways[1].sessions, 2)
+        self.gateways[0].ok = True
+        time.sleep(0.2)
+        self.run_ansible([{'name': 'third'}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual(self.gateways[0].sessions, 1)
+
+    def test_unavailable_endpoint_is_ejected(self):
+        self.servers[0].stop(None)
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost')
+        self.assertEqual(self.gateways[1].sessions, 1)
+        self.assertEqual(runner.endpoint_balancer.get_available(self.endpoints), self.endpoints[1:])
+
+    def test_idle_session_is_reused_on_its_endpoint(self):
+        self.gateways[0].executions_count = 5
+        self.run_ansible([{'name': 'first'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.gateways[0].executions_count = 0
+        self.run_ansible([{'name': 'second'}], self.endpoint, {}, {}, 'localhost', session_idle_timeout=60)
+        self.assertEqual(self.gateways[0].sessions, 0)
+        self.assertEqual(self.gateways[1].sessions, 1)
+        self.assertEqual([t['name'] for t in self.gateways[1].tasks], ['first', 'second'])
+
+
+class TestAsyncCoteaEndpointBalancer(TestCoteaEndpointBalancer):
+
+    def setUp(self):
+        super(TestAsyncCoteaEndpointBalancer, self).setUp()
+        self.runner = runner.AsyncOperationRunner(max_workers=2)
+
+    def tearDown(self):
+        self.runner.close()
+        super(TestAsyncCoteaEndpointBalancer, self).tearDown()
+
+    def run_ansible(self, ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars, hosts, **kwargs):
+        return self.runner.run(self.runner.run_ansible(ansible_tasks, grpc_cotea_endpoint, extra_env, extra_vars,
+                                                       hosts, **kwargs))
+
+
+class TestTaskResultExtractor(unittest.TestCase):
+    ANSIBLE_CONFIG = {'module_prefix': 'os_', 'module_description_create': 'Create OpenStack component',
+                      'module_attribute_matcher': {'os_keypair': 'key'}}
+
+    def extract(self, task, results_dict, task_name='Create OpenStack component server', **parameters):
+        run_result = runner.get_empty_run_result()
+        response = TaskResults(task_adding_ok=True, task_results=[
+            TaskResult(ok=True, task_name=task_name, results_dict_str=json.dumps(results_dict))])
+        return runner.process_task_results(0, response, [task], run_result, ansible_config=self.ANSIBLE_CONFIG,
+                                           operation='create', **parameters)
+
+    def test_module_results(self):
+        results_dict = {'server': {'id': 'server_id', 'name': 'server', 'empty': ''},
+                        'results': [{'server': {'id': 'first_id'}}, {'server': {'name': 'second'}}, 'skipped']}
+        run_result = self.extract({'os_server': {}}, results_dict, attributes=['id'], properties=['name', 'empty'])
+        self.assertEqual(run_result['attributes'], [{'id': 'server_id'}, {'id': 'first_id'}])
+        self.assertEqual(run_result['properties'], [{'name': 'server'}, {'name': 'second'}])
+        self.assertEqual(run_result['outputs'], [])
+
+    def test_attribute_matcher(self):
+        run_result = self.extract({'os_keypair': {}}, {'key': {'id': 'key_id'}, 'keypair': {'id': 'other'}},
+                                  attributes=['id'])
+        self.assertEqual(run_result['attributes'], [{'id': 'key_id'}])
+
+    def test_facts_of_included_tasks(self):
+        results_dict = {'ansible_facts': {'id': 'fact_id', 'ip': '10.0.0.1'}}
+        run_result = self.extract({'include': 'file.yaml'}, results_dict, task_name='include', outputs=['ip'],
+                                  attributes=['id'])
+        self.assertEqual(run_result['outputs'], [{'ip': '10.0.0.1'}])
+        self.assertEqual(run_result['attributes'], [{'id': 'fact_id'}])
+
+    def test_other_results_are_not_decoded(self):
+        with mock.patch.object(runner, 'json_loads') as json_loads:
+            run_result = self.extract({'set_fact': {}}, {'server': {'id': 'id'}}, task_name='set_fact',
+                                      attributes=['id'], outputs=['id'])
+        json_loads.assert_not_called()
+        self.assertEqual(run_result, runner.get_empty_run_result())
+
+    def test_extractor_is_compiled_once(self):
+        first = runner.get_result_extractor(self.ANSIBLE_CONFIG, 'create')
+        self.assertIs(first, runner.get_result_extractor(dict(self.ANSIBLE_CONFIG), 'create'))
+        self.assertIsNot(first, runner.get_result_extractor(self.ANSIBLE_CONFIG, 'delete'))
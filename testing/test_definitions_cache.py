@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import yaml
+
+from configuration_tool.providers.common.definitions_cache import get_provider_definitions, clear_definitions_cache, \
+    LazyDefinitions
+
+BASE_DEFINITIONS = {
+    'tosca_definitions_version': 'tosca_simple_yaml_1_0',
+    'node_types': {
+        'tosca.nodes.Root': {
+            'attributes': {
+                'state': {'type': 'string'}
+            }
+        },
+        'tosca.nodes.SoftwareComponent': {
+            'derived_from': 'tosca.nodes.Root'
+        }
+    }
+}
+
+PROVIDER_DEFINITIONS = {
+    'tosca_definitions_version': 'tosca_simple_yaml_1_0',
+    'node_types': {
+        'test.nodes.Application': {
+            'derived_from': 'tosca.nodes.SoftwareComponent',
+            'properties': {
+                'name': {'type': 'string'}
+            }
+        }
+    }
+}
+
+
+class TestDefinitionsCache(unittest.TestCase):
+    PROVIDER = 'test'
+
+    def setUp(self):
+        clear_definitions_cache()
+        self.directory = tempfile.mkdtemp()
+        self.base_file = os.path.join(self.directory, 'base.yaml')
+        self.provider_file = os.path.join(self.directory, 'provider.yaml')
+        self.write_definitions(self.base_file, BASE_DEFINITIONS)
+        self.write_definitions(self.provider_file, PROVIDER_DEFINITIONS)
+
+    def tearDown(self):
+        clear_definitions_cache()
+        shutil.rmtree(self.directory)
+
+    def write_definitions(self, filename, definitions):
+        with open(filename, 'w') as f:
+            yaml.dump(definitions, f)
+
+    def test_definitions_are_flattened(self):
+        definitions = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file])
+        application = definitions.definitions['test.nodes.Application']
+        self.assertIn('state', application['attributes'])
+        self.assertIn('name', application['properties'])
+        self.assertNotIn('derived_from', application)
+        self.assertTrue(definitions.is_software_type('test.nodes.Application'))
+
+    def test_definitions_are_cached(self):
+        first = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file])
+        second = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file])
+        self.assertIs(first, second)
+
+    def test_changed_file_is_reloaded(self):
+        first = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file])
+        changed_definitions = yaml.safe_load(yaml.dump(PROVIDER_DEFINITIONS))
+        changed_definitions['node_types']['test.nodes.Application']['properties']['port'] = {'type': 'integer'}
+        self.write_definitions(self.provider_file, changed_definitions)
+        os.utime(self.provider_file, (time.time() + 10, time.time() + 10))
+        second = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file])
+        self.assertIsNot(first, second)
+        self.assertIn('port', second.definitions['test.nodes.Application']['properties'])
+
+    def test_definitions_are_flattened_on_demand(self):
+        definitions = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file]).definitions
+        self.assertEqual(definitions.flattened, {})
+        self.assertIn('test.nodes.Application', definitions)
+        definitions['tosca.nodes.SoftwareComponent']
+        self.assertEqual(set(definitions.flattened), {'tosca.nodes.SoftwareComponent', 'tosca.nodes.Root'})
+        self.assertEqual(set(definitions), {'tosca.nodes.Root', 'tosca.nodes.SoftwareComponent',
+                                            'test.nodes.Application'})
+
+    def test_template_definitions_override_parents(self):
+        base = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file]).definitions
+        definitions = LazyDefinitions({
+            'tosca.nodes.Root': {'attributes': {'id': {'type': 'string'}}},
+            'test.nodes.Service': {'derived_from': 'test.nodes.Application'}
+        }, base)
+        self.assertEqual(set(definitions['test.nodes.Service']['attributes']), {'id'})
+        self.assertIn('name', definitions['test.nodes.Service']['properties'])
+        self.assertTrue(definitions.is_software_type('test.nodes.Service'))
+        self.assertEqual(set(definitions['test.nodes.Application']['attributes']), {'id'})
+        self.assertEqual(set(base['test.nodes.Application']['attributes']), {'state'})
+
+    def test_base_definitions_are_shared(self):
+        base = get_provider_definitions(self.PROVIDER, [self.provider_file, self.base_file]).definitions
+        definitions = LazyDefinitions({'test.nodes.Service': {'derived_from': 'test.nodes.Application'}}, base)
+        self.assertTrue(definitions.is_software_type('test.nodes.Service'))
+        self.assertIs(definitions['test.nodes.Application'], base['test.nodes.Application'])
+        self.assertNotIn('test.nodes.Service', base.flattened)
+
+    def test_type_derived_from_itself(self):
+        definitions = LazyDefinitions({'test.nodes.A': {'derived_from': 'test.nodes.B'},
+                                       'test.nodes.B': {'derived_from': 'test.nodes.A'}})
+        with self.assertRaises(Exception):
+            definitions['test.nodes.A']
+        with self.assertRaises(KeyError):
+            definitions['test.nodes.C']
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import unittest
+from concurrent import futures
+from unittest import mock
+
+import grpc
+
+from configuration_tool.configuration_tools.ansible.configuration_tool import AnsibleConfigurationTool
+from configuration_tool.configuration_tools.ansible.instance_model.instance_model import \
+    delete_cluster_from_instance_model
+from configuration_tool.configuration_tools.ansible.runner.runner import OperationError
+from grpc_server.api_pb2 import ClouniConfigurationToolRequest, ClouniConfigurationToolResponse, \
+    SubmitDeploymentResponse, WatchDeploymentRequest, DeploymentEvent, OperationsGraphRequest, \
+    OperationsGraphResponse
+import grpc_server.api_pb2_grpc as api_pb2_grpc
+from grpc_server.clouni_configuration_tool import ClouniConfigurationToolServicer, TranslationPool, \
+    DeploymentManager
+
+TEST = 'test'
+
+
+def read_example(filename):
+    with open(os.path.join('testing', 'examples', filename), 'r') as f:
+        return f.read()
+
+
+def get_pid(argv):
+    return os.getpid()
+
+
+def fail(argv):
+    raise Exception("Request failed in worker")
+
+
+def fake_run(self, ansible_tasks, grpc_cotea_endpoint, hosts, name, op, q, extra, ansible_config, attributes,
+             outputs, properties, priority=0):
+    q.put({name + '.' + op: {'outputs': [], 'attributes': [], 'properties': []}})
+
+
+def fake_failed_run(self, ansible_tasks, grpc_cotea_endpoint, hosts, name, op, q, extra, ansible_config, attributes,
+                    outputs, properties, priority=0):
+    q.put(OperationError(name, op, Exception("Task failed")))
+
+
+class TestTranslationPool(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger(__name__)
+        self.pool = TranslationPool(1, 2, self.logger)
+
+    def tearDown(self):
+        self.pool.close()
+        delete_cluster_from_instance_model(TEST)
+
+    def request(self, template, **kwargs):
+        servicer = ClouniConfigurationToolServicer(self.logger, self.pool)
+        request = ClouniConfigurationToolRequest(provider_template=template, cluster_name=TEST, extra='global: {}',
+                                                 **kwargs)
+        return servicer.ClouniConfigurationTool(request, None)
+
+    def test_translate(self):
+        response = self.request(read_example('test_server_name_openstack.yaml'))
+        self.assertEqual(response.status, ClouniConfigurationToolResponse.Status.OK, response.error)
+        self.assertIn('tosca_server_example_server', response.content)
+
+    def test_validate_only(self):
+        response = self.request(read_example('test_server_name_openstack.yaml'), validate_only=True)
+        self.assertEqual(response.status, ClouniConfigurationToolResponse.Status.TEMPLATE_VALID, response.error)
+        self.assertIn('successfully passed validation', response.content)
+
+    def test_error_of_worker(self):
+        with self.assertRaises(Exception) as e:
+            self.pool.run(fail, {})
+        self.assertEqual(str(e.exception), "Request failed in worker")
+        invalid = read_example('test_server_name_openstack.yaml').replace('openstack.nodes.Server',
+                                                                         'openstack.nodes.Unknown')
+        response = self.request(invalid)
+        self.assertEqual(response.status, ClouniConfigurationToolResponse.Status.ERROR)
+        self.assertIn('openstack.nodes.Unknown', response.error)
+        # NOTE: worker is still usable after the error
+        self.assertNotEqual(self.pool.run(get_pid, {}), os.getpid())
+
+    def test_worker_is_replaced(self):
+        pids = [self.pool.run(get_pid, {}) for _ in range(4)]
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertNotEqual(pids[1], pids[2])
+
+
+class TestDeployments(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger(__name__)
+        self.deployments = DeploymentManager(2, 10, self.logger)
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        api_pb2_grpc.add_ClouniConfigurationToolServicer_to_server(
+            ClouniConfigurationToolServicer(self.logger, deployments=self.deployments), self.server)
+        port = self.server.add_insecure_port('localhost:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel('localhost:%s' % port)
+        self.stub = api_pb2_grpc.ClouniConfigurationToolStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+        self.deployments.close()
+        delete_cluster_from_instance_model(TEST)
+
+    def deploy(self, run):
+        request = ClouniConfigurationToolRequest(provider_template=read_example('test_server_name_openstack.yaml'),
+                                                 cluster_name=TEST, extra='global: {}', grpc_cotea_endpoint='test')
+        with mock.patch.object(AnsibleConfigurationTool, 'run', run):
+            response = self.stub.SubmitDeployment(request)
+            self.assertEqual(response.status, SubmitDeploymentResponse.Status.OK, response.error)
+            self.assertNotEqual(response.job_id, '')
+            events = list(self.stub.WatchDeployment(WatchDeploymentRequest(job_id=response.job_id), timeout=60))
+        self.assertTrue(all(event.job_id == response.job_id for event in events))
+        return events
+
+    def test_deployment_events(self):
+        events = self.deploy(fake_run)
+        self.assertEqual([event.type for event in events],
+                         [DeploymentEvent.Type.OPERATION_STARTED, DeploymentEvent.Type.OPERATION_FINISHED] * 2 +
+                         [DeploymentEvent.Type.DEPLOYMENT_FINISHED])
+        self.assertEqual([event.template_name for event in events[:4:2]],
+                         ['tosca_server_example_keypair', 'tosca_server_example_server'])
+        self.assertEqual(events[1].operation, 'create')
+        self.assertGreaterEqual(events[1].duration, 0)
+        self.assertNotEqual(events[-1].content, '')
+
+    def test_failed_deployment_events(self):
+        events = self.deploy(fake_failed_run)
+        self.assertEqual([event.type for event in events],
+                         [DeploymentEvent.Type.OPERATION_STARTED, DeploymentEvent.Type.OPERATION_FAILED,
+                          DeploymentEvent.Type.DEPLOYMENT_FAILED])
+        self.assertIn('Task failed', events[1].error)
+        self.assertIn('Task failed', events[-1].error)
+
+    def test_finished_deployment_is_watched_again(self):
+        first = self.deploy(fake_run)
+        job_id = first[0].job_id
+        events = list(self.stub.WatchDeployment(WatchDeploymentRequest(job_id=job_id), timeout=60))
+        self.assertEqual(events, first)
+
+    def test_invalid_deployment_request(self):
+        response = self.stub.SubmitDeployment(ClouniConfigurationToolRequest(cluster_name=TEST))
+        self.assertEqual(response.status, SubmitDeploymentResponse.Status.ERROR)
+        self.assertIn('provider_template', response.error)
+
+    def test_unknown_job(self):
+        with self.assertRaises(grpc.RpcError) as e:
+            list(self.stub.WatchDeployment(WatchDeploymentRequest(job_id='unknown'), timeout=60))
+        self.assertEqual(e.exception.code(), grpc.StatusCode.NOT_FOUND)
+        self.assertIn('unknown', e.exception.details())
+
+    def test_operations_graph(self):
+        response = self.stub.GetOperationsGraph(OperationsGraphRequest(
+            provider_template=read_example('test_server_name_openstack.yaml'), cluster_name=TEST))
+        self.assertEqual(response.status, OperationsGraphResponse.Status.OK, response.error)
+        graph = json.loads(response.graph)
+        metrics = json.loads(response.metrics)
+        self.assertIn('tosca_server_example_server:create', json.dumps(graph))
+        self.assertEqual(metrics['operations'], 2)
+        self.assertEqual(metrics['depth'], 2)
+        self.assertTrue(response.dot.startswith('digraph'))
+
+    def test_operations_graph_error(self):
+        response = self.stub.GetOperationsGraph(OperationsGraphRequest())
+        self.assertEqual(response.status, OperationsGraphResponse.Status.ERROR)
+        self.assertIn('provider_template', response.error)
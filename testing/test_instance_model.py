@@ -0,0 +1,326 @@
+import copy
+import fcntl
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from configuration_tool.configuration_tools.ansible.instance_model import instance_model
+from configuration_tool.configuration_tools.ansible.instance_model.instance_model import YamlInstanceModelStore, \
+    SqliteInstanceModelStore, CachedInstanceModelStore, update_instance_model, get_actual_state_of_instance_model, \
+    delete_cluster_from_instance_model, flush_instance_model, release_instance_model, compact_instance_model, \
+    read_yaml_instance_model, get_cluster_lock, init_instance_model, get_instance_model_store
+
+CLUSTER = 'test_instance_model'
+SERVER = {'type': 'openstack.nodes.Server', 'properties': {'name': 'server'}}
+CONNECTION = {'type': 'tosca.relationships.ConnectsTo', 'properties': {'credential': {'user': 'root'}}}
+
+
+class InstanceModelTests(object):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.store = self.get_store()
+        self.patcher = mock.patch.object(instance_model, 'get_instance_model_store', lambda: self.store)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def deploy(self):
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [], [], False, init=True)
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'first'}, {'id': 'second'}],
+                              [{'name': 'first'}], False)
+
+    def test_states_of_instances(self):
+        self.deploy()
+        first = get_actual_state_of_instance_model(CLUSTER, 'server', 1)
+        self.assertEqual(first['attributes'], {'id': 'first'})
+        self.assertEqual(first['properties'], {'name': 'first'})
+        second = get_actual_state_of_instance_model(CLUSTER, 'server', 2)
+        self.assertEqual(second['attributes'], {'id': 'second'})
+        self.assertEqual(second['properties'], {'name': 'server'})
+        self.assertIsNone(get_actual_state_of_instance_model(CLUSTER, 'server', 3))
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 3, init=True), first)
+
+    def test_last_state_is_returned(self):
+        self.deploy()
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'updated'}], [], False)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['properties'], {'name': 'first'})
+
+    def test_delete_is_not_saved(self):
+        self.deploy()
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'deleted'}], [], True)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'first'})
+
+    def test_concurrent_updates(self):
+        self.deploy()
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'other', [], [], False, init=True)
+
+        def update(name):
+            for i in range(20):
+                update_instance_model(CLUSTER, SERVER, SERVER['type'], name, [{'id': name + str(i)}], [], False)
+        threads = [threading.Thread(target=update, args=(name,)) for name in ('server', 'other')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        flush_instance_model(CLUSTER)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'server19'})
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'other', 1)['attributes'], {'id': 'other19'})
+
+    def test_unknown_type(self):
+        with self.assertRaises(Exception):
+            update_instance_model(CLUSTER, SERVER, 'openstack.groups.Server', 'server', [], [], False, init=True)
+
+    def test_compaction(self):
+        self.deploy()
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'updated'}], [], False)
+        compact_instance_model(CLUSTER)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+
+    def test_bulk_init(self):
+        topology_template = {'node_templates': {'server_%s' % i: copy.deepcopy(SERVER) for i in range(10)},
+                             'relationship_templates': {'connection': CONNECTION}}
+        with mock.patch.object(self.store, 'add_states', wraps=self.store.add_states) as add_states:
+            init_instance_model(CLUSTER, topology_template, False)
+        self.assertEqual(add_states.call_count, 0)
+        topology_template['node_templates']['server_0']['properties']['name'] = 'changed'
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server_9', 1), SERVER)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server_0', 1)['properties'], {'name': 'server'})
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'connection', 1), CONNECTION)
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server_1', [{'id': 'first'}], [], False)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server_1', 1)['attributes'], {'id': 'first'})
+
+    def test_node_and_relationship_with_the_same_name(self):
+        init_instance_model(CLUSTER, {'node_templates': {'server': SERVER},
+                                      'relationship_templates': {'server': CONNECTION}}, False)
+        update_instance_model(CLUSTER, CONNECTION, CONNECTION['type'], 'server', [{'id': 'connection'}], [], False)
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'server'}], [], False)
+        flush_instance_model(CLUSTER)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1),
+                         dict(SERVER, attributes={'id': 'server'}))
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1, elem_type='relationship_templates'),
+                         dict(CONNECTION, attributes={'id': 'connection'}))
+
+    def test_bulk_init_on_delete(self):
+        with mock.patch.object(self.store, 'add_batches') as add_batches:
+            init_instance_model(CLUSTER, {'node_templates': {'server': SERVER}}, True)
+        add_batches.assert_not_called()
+
+
+class TestYamlInstanceModel(InstanceModelTests, unittest.TestCase):
+
+    def get_store(self):
+        return YamlInstanceModelStore()
+
+    def get_yaml_states(self):
+        return [(key, state['attributes']['id']) for key, _, state in
+                read_yaml_instance_model(instance_model.get_yaml_filename(CLUSTER)) if state.get('attributes')]
+
+    def test_compaction_keeps_history(self):
+        self.deploy()
+        for i in range(3):
+            update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': str(i)}], [], False)
+        compact_instance_model(CLUSTER, history=1)
+        self.assertEqual(self.get_yaml_states(), [(('server', 2), 'second'), (('server', 1), '1'),
+                                                  (('server', 1), '2')])
+        compact_instance_model(CLUSTER)
+        self.assertEqual(self.get_yaml_states(), [(('server', 2), 'second'), (('server', 1), '2')])
+
+    def test_automatic_compaction(self):
+        self.store = YamlInstanceModelStore(compaction_size=0, compaction_ratio=1.5)
+        self.deploy()
+        for i in range(10):
+            update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': str(i)}], [], False)
+            self.assertLessEqual(len(self.get_yaml_states()), 3)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': '9'})
+
+    def test_bulk_init_is_one_document(self):
+        with mock.patch('os.fsync', wraps=os.fsync) as fsync:
+            init_instance_model(CLUSTER, {'node_templates': {'server': SERVER},
+                                          'relationship_templates': {'connection': CONNECTION}}, False)
+        self.assertEqual(fsync.call_count, 1)
+        self.assertEqual([(key, elem_type) for key, elem_type, _ in
+                          read_yaml_instance_model(instance_model.get_yaml_filename(CLUSTER))],
+                         [(('server', 1), 'node_templates'), (('connection', 1), 'relationship_templates')])
+
+
+class TestSqliteInstanceModel(InstanceModelTests, unittest.TestCase):
+
+    def get_store(self):
+        return SqliteInstanceModelStore(os.path.join(self.directory, 'instance_model.sqlite'))
+
+    def test_cluster_is_deleted(self):
+        self.deploy()
+        delete_cluster_from_instance_model(CLUSTER)
+        self.assertIsNone(get_actual_state_of_instance_model(CLUSTER, 'server', 1))
+
+    def test_yaml_instance_model_is_migrated(self):
+        self.store, store = YamlInstanceModelStore(), self.store
+        self.deploy()
+        update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'updated'}], [], False)
+        self.store = store
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+        # NOTE: the file is imported once and renamed, it's removed with the cluster
+        filename = instance_model.get_yaml_filename(CLUSTER)
+        self.assertFalse(os.path.exists(filename))
+        self.assertTrue(os.path.exists(filename + instance_model.MIGRATED_SUFFIX))
+        self.store = SqliteInstanceModelStore(store.database)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        delete_cluster_from_instance_model(CLUSTER)
+        self.assertFalse(os.path.exists(filename + instance_model.MIGRATED_SUFFIX))
+        self.assertIsNone(get_actual_state_of_instance_model(CLUSTER, 'server', 1))
+
+    def test_outdated_yaml_is_not_imported_again(self):
+        self.store, store = YamlInstanceModelStore(), self.store
+        self.deploy()
+        self.store = store
+        get_actual_state_of_instance_model(CLUSTER, 'server', 1)
+        os.remove(store.database)
+        self.store = SqliteInstanceModelStore(store.database)
+        self.assertIsNone(get_actual_state_of_instance_model(CLUSTER, 'server', 1))
+
+    def test_default_database_is_persistent(self):
+        with mock.patch.object(instance_model, '_stores', {}), mock.patch.object(instance_model, '_current_store', None), \
+                mock.patch.dict(os.environ, {'XDG_DATA_HOME': self.directory}):
+            store = get_instance_model_store()
+        database = store.store.database if isinstance(store, CachedInstanceModelStore) else store.database
+        self.assertEqual(database,
+                         os.path.join(self.directory, 'clouni', instance_model.DEFAULT_INSTANCE_MODEL_DATABASE))
+
+
+class TestCachedInstanceModel(InstanceModelTests, unittest.TestCase):
+
+    def get_store(self):
+        self.sqlite_store = SqliteInstanceModelStore(os.path.join(self.directory, 'instance_model.sqlite'))
+        return CachedInstanceModelStore(self.sqlite_store, flush_interval=60)
+
+    def test_writes_are_buffered(self):
+        self.deploy()
+        self.assertIsNone(self.sqlite_store.get_state(CLUSTER, 'server', 2))
+        flush_instance_model(CLUSTER)
+        self.assertEqual(self.sqlite_store.get_state(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+        self.assertEqual(self.sqlite_store.get_state(CLUSTER, 'server', 1)['properties'], {'name': 'first'})
+
+    def test_writes_are_flushed_by_interval(self):
+        self.store.flush_interval = 0
+        self.deploy()
+        self.assertEqual(self.sqlite_store.get_state(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+
+    def test_cluster_is_loaded_once(self):
+        self.deploy()
+        release_instance_model(CLUSTER)
+        with mock.patch.object(self.sqlite_store, 'load_cluster', wraps=self.sqlite_store.load_cluster) as load:
+            for index in (1, 2, 3, 1):
+                get_actual_state_of_instance_model(CLUSTER, 'server', index)
+            update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'updated'}], [], False)
+            self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        self.assertEqual(load.call_count, 1)
+
+    def test_own_flush_keeps_cluster_loaded(self):
+        self.deploy()
+        flush_instance_model(CLUSTER)
+        with mock.patch.object(self.sqlite_store, 'load_cluster', wraps=self.sqlite_store.load_cluster) as load:
+            update_instance_model(CLUSTER, SERVER, SERVER['type'], 'server', [{'id': 'updated'}], [], False)
+            flush_instance_model(CLUSTER)
+            compact_instance_model(CLUSTER)
+            self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'updated'})
+        self.assertEqual(load.call_count, 0)
+
+    def test_states_written_by_other_process_are_loaded(self):
+        self.deploy()
+        flush_instance_model(CLUSTER)
+        other = CachedInstanceModelStore(SqliteInstanceModelStore(self.sqlite_store.database), flush_interval=60)
+        other.add_states(CLUSTER, 'node_templates', [('server', 1, {'attributes': {'id': 'other'}})])
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'first'})
+        other.flush(CLUSTER)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'other'})
+
+    def test_pending_states_are_kept_when_cluster_is_loaded_again(self):
+        self.deploy()
+        other = SqliteInstanceModelStore(self.sqlite_store.database)
+        other.add_states(CLUSTER, 'relationship_templates', [('connection', 1, CONNECTION)])
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'connection', 1), CONNECTION)
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+        flush_instance_model(CLUSTER)
+        self.assertEqual(other.get_state(CLUSTER, 'server', 2)['attributes'], {'id': 'second'})
+
+    def test_released_cluster_is_loaded_again(self):
+        self.deploy()
+        release_instance_model(CLUSTER)
+        self.sqlite_store.add_states(CLUSTER, 'node_templates', [('server', 1, {'attributes': {'id': 'other'}})])
+        self.assertEqual(get_actual_state_of_instance_model(CLUSTER, 'server', 1)['attributes'], {'id': 'other'})
+
+
+class TestInstanceModelStoreResolution(unittest.TestCase):
+
+    def setUp(self):
+        self.patchers = [mock.patch.object(instance_model, '_stores', {}),
+                         mock.patch.object(instance_model, '_current_store', None)]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_store_is_resolved_once(self):
+        with mock.patch.object(instance_model, 'ConfigurationToolConfiguration',
+                               wraps=instance_model.ConfigurationToolConfiguration) as configuration:
+            store = get_instance_model_store()
+            for _ in range(10):
+                self.assertIs(get_instance_model_store(), store)
+        self.assertEqual(configuration.call_count, 1)
+
+    def test_store_is_resolved_again_when_configuration_is_changed(self):
+        store = get_instance_model_store()
+        _, mtime, _ = instance_model._current_store
+        with mock.patch('os.path.getmtime', return_value=mtime + 1), \
+                mock.patch.object(instance_model, 'resolve_instance_model_store') as resolve:
+            self.assertIs(get_instance_model_store(), resolve.return_value)
+        self.assertIs(get_instance_model_store(), store)
+
+
+class TestClusterLock(unittest.TestCase):
+
+    def try_lock(self, filename):
+        with open(filename, 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            fcntl.flock(f, fcntl.LOCK_UN)
+            return True
+
+    def test_lock_is_shared_with_other_processes(self):
+        cluster_lock = get_cluster_lock(CLUSTER)
+        self.assertIs(cluster_lock, get_cluster_lock(CLUSTER))
+        with cluster_lock:
+            with cluster_lock:
+                self.assertFalse(self.try_lock(cluster_lock.filename))
+            self.assertFalse(self.try_lock(cluster_lock.filename))
+        self.assertTrue(self.try_lock(cluster_lock.filename))
+
+    def test_lock_is_exclusive_for_threads(self):
+        cluster_lock = get_cluster_lock(CLUSTER)
+        acquired = threading.Event()
+
+        def lock():
+            with cluster_lock:
+                acquired.set()
+        with cluster_lock:
+            thread = threading.Thread(target=lock)
+            thread.start()
+            self.assertFalse(acquired.wait(0.2))
+        self.assertTrue(acquired.wait(5))
+        thread.join()
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from configuration_tool.common.operations_graph import get_critical_path_lengths, OperationDurations, \
+    DEFAULT_OPERATION_WEIGHT, get_graph_levels, get_critical_path, get_graph_metrics, graph_to_dot, \
+    export_operations_graph
+from configuration_tool.common.translator_to_configuration_dsl import get_operations_graph
+
+# network -> subnet -> port -> server -> software, keypair -> server
+GRAPH = {
+    'network': [],
+    'subnet': ['network'],
+    'port': ['subnet'],
+    'keypair': [],
+    'server': ['port', 'keypair'],
+    'software': ['server']
+}
+
+
+class TestCriticalPath(unittest.TestCase):
+
+    def test_unit_weights(self):
+        lengths = get_critical_path_lengths(GRAPH, lambda x: 1)
+        self.assertEqual(lengths['network'], 5)
+        self.assertEqual(lengths['keypair'], 3)
+        self.assertEqual(lengths['software'], 1)
+
+    def test_weights(self):
+        graph = {
+            'a': [],
+            'b': [],
+            'c': ['a'],
+            'd': ['b']
+        }
+        weights = {'a': 1, 'b': 1, 'c': 1, 'd': 10}
+        lengths = get_critical_path_lengths(graph, weights.get)
+        self.assertGreater(lengths['b'], lengths['a'])
+
+    def test_deep_graph(self):
+        graph = {0: []}
+        for i in range(1, 5000):
+            graph[i] = [i - 1]
+        lengths = get_critical_path_lengths(graph, lambda x: 1)
+        self.assertEqual(lengths[0], 5000)
+
+
+    def test_critical_path(self):
+        self.assertEqual(get_critical_path(GRAPH, lambda x: 1),
+                         (['network', 'subnet', 'port', 'server', 'software'], 5))
+        weights = {'network': 1, 'subnet': 1, 'port': 1, 'keypair': 10, 'server': 2, 'software': 1}
+        self.assertEqual(get_critical_path(GRAPH, weights.get), (['keypair', 'server', 'software'], 13))
+        self.assertEqual(get_critical_path({}, lambda x: 1), ([], 0))
+
+
+class TestGraphMetrics(unittest.TestCase):
+
+    def test_levels(self):
+        levels = get_graph_levels(GRAPH)
+        self.assertEqual(levels, {'network': 1, 'keypair': 1, 'subnet': 2, 'port': 3, 'server': 4, 'software': 5})
+
+    def test_cycle(self):
+        with self.assertRaises(Exception):
+            get_graph_levels({'a': ['b'], 'b': ['a'], 'c': []})
+
+    def test_metrics(self):
+        metrics = get_graph_metrics(GRAPH, lambda x: 1)
+        self.assertEqual(metrics['operations'], 6)
+        self.assertEqual(metrics['dependencies'], 5)
+        self.assertEqual(metrics['depth'], 5)
+        self.assertEqual(metrics['widths'], [2, 1, 1, 1, 1])
+        self.assertEqual(metrics['max_parallelism'], 2)
+        self.assertEqual(metrics['total_weight'], 6)
+        self.assertEqual(metrics['critical_path_length'], 5)
+        self.assertAlmostEqual(metrics['average_parallelism'], 1.2)
+
+    def test_dependencies_only_graph(self):
+        # NOTE: reversed graphs of operations don't contain keys for operations without dependents
+        metrics = get_graph_metrics({'b': ['a'], 'c': ['a']}, lambda x: 1)
+        self.assertEqual(metrics['operations'], 3)
+        self.assertEqual(metrics['widths'], [1, 2])
+
+    def test_dot(self):
+        dot = graph_to_dot({'b': ['a"1'], 'c': ['a"1', 'b'], 'a"1': []}, str, ['a"1', 'b', 'c'])
+        self.assertTrue(dot.startswith('digraph operations {'))
+        self.assertIn('"a\\"1" -> "b" [color=red];', dot)
+        self.assertIn('"a\\"1" -> "c";', dot)
+        self.assertIn('"c" [color=red];', dot)
+
+    def test_export(self):
+        result = export_operations_graph(GRAPH, str.upper, lambda x: 2)
+        json.dumps(result)
+        operations = result['graph']['operations']
+        self.assertEqual([x['name'] for x in operations[:2]], ['KEYPAIR', 'NETWORK'])
+        self.assertEqual(operations[-2], {'name': 'SERVER', 'dependencies': ['KEYPAIR', 'PORT'],
+                                          'level': 4, 'weight': 2})
+        self.assertEqual(result['metrics']['critical_path'], ['NETWORK', 'SUBNET', 'PORT', 'SERVER', 'SOFTWARE'])
+        self.assertIn('"SERVER" -> "SOFTWARE" [color=red];', result['dot'])
+        self.assertIn('"KEYPAIR" -> "SERVER";', result['dot'])
+
+    def test_template_graph(self):
+        with open(os.path.join('testing', 'examples', 'test_relationships_interfaces_operations_openstack.yaml')) as f:
+            template = f.read()
+        result = get_operations_graph(template, 'ansible', 'test')
+        operations = {x['name']: x for x in result['graph']['operations']}
+        self.assertEqual(operations['tosca_server_example_server:configure']['level'],
+                         operations['test_relationship_hosted_on:pre_configure_target']['level'] + 1)
+        metrics = result['metrics']
+        self.assertEqual(metrics['operations'], len(operations))
+        self.assertEqual(sum(metrics['widths']), len(operations))
+        self.assertEqual(metrics['critical_path_length'], metrics['depth'])
+        path = metrics['critical_path']
+        self.assertEqual(operations[path[0]]['dependencies'], [])
+        for dependency, operation in zip(path, path[1:]):
+            self.assertIn(dependency, operations[operation]['dependencies'])
+
+    def test_template_delete_graph(self):
+        with open(os.path.join('testing', 'examples', 'test_relationships_interfaces_operations_openstack.yaml')) as f:
+            template = f.read()
+        result = get_operations_graph(template, 'ansible', 'test', is_delete=True)
+        operations = result['graph']['operations']
+        # NOTE: only create operations are executed on deletion
+        self.assertEqual(result['metrics']['total_weight'],
+                         len([x for x in operations if x['name'].endswith(':create')]))
+
+
+class TestOperationDurations(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'durations.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_default_weight(self):
+        durations = OperationDurations(self.filename)
+        self.assertEqual(durations.get_weight('openstack.nodes.Server', 'create'), DEFAULT_OPERATION_WEIGHT)
+
+    def test_durations_of_processes_are_merged(self):
+        first = OperationDurations(self.filename)
+        second = OperationDurations(self.filename)
+        first.get_weight('openstack.nodes.Server', 'create')
+        second.get_weight('openstack.nodes.Server', 'create')
+        first.record('openstack.nodes.Server', 'create', 30.0)
+        second.record('openstack.nodes.Network', 'create', 5.0)
+        first.save()
+        second.save()
+        durations = OperationDurations(self.filename)
+        self.assertEqual(durations.get_weight('openstack.nodes.Server', 'create'), 30.0)
+        self.assertEqual(durations.get_weight('openstack.nodes.Network', 'create'), 5.0)
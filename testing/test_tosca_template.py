@@ -0,0 +1,102 @@
+import os
+import unittest
+from unittest import mock
+
+import yaml
+
+from configuration_tool.common.tosca_reserved_keys import INTERFACES, PROPERTIES
+from configuration_tool.configuration_tools.ansible.configuration_tool import AnsibleConfigurationTool
+from configuration_tool.providers.common.tosca_template import ProviderToscaTemplate, SEPARATOR
+
+
+def get_operations_graph(operations):
+    return {templ.name + SEPARATOR + templ.operation: {x.name + SEPARATOR + x.operation for x in dependencies}
+            for templ, dependencies in operations.items()}
+
+
+class TestOperationsGraph(unittest.TestCase):
+
+    def get_tosca_template(self, template):
+        return ProviderToscaTemplate(template, 'openstack', 'ansible', 'test', None, False, None)
+
+    def test_dependencies_by_type(self):
+        node_templates = {}
+        for i in range(3):
+            node_templates['keypair_%s' % i] = {'type': 'openstack.nodes.Keypair', 'properties': {'name': str(i)}}
+            node_templates['server_%s' % i] = {'type': 'openstack.nodes.Server', 'properties': {'name': str(i)}}
+        node_templates['network'] = {'type': 'openstack.nodes.Network', 'properties': {'name': 'network'}}
+        node_templates['server_0']['requirements'] = [{'network': {'node': 'network'}}]
+        tosca = self.get_tosca_template({'tosca_definitions_version': 'tosca_simple_yaml_1_0',
+                                         'topology_template': {'node_templates': node_templates}})
+        graph = get_operations_graph(tosca.provider_operations)
+        keypairs = {'keypair_%s:create' % i for i in range(3)}
+        self.assertEqual(graph['server_0:create'], keypairs | {'network:create'})
+        self.assertEqual(graph['server_1:create'], keypairs | {'network:create'})
+        self.assertEqual(graph['keypair_0:create'], set())
+        reversed_graph = get_operations_graph(tosca.reversed_provider_operations)
+        self.assertEqual(reversed_graph['keypair_0:create'], {'server_%s:create' % i for i in range(3)})
+
+    def test_relationship_operations(self):
+        with open(os.path.join('testing', 'examples', 'test_relationships_interfaces_operations_openstack.yaml')) as f:
+            tosca = self.get_tosca_template(yaml.load(f, Loader=yaml.Loader))
+        graph = get_operations_graph(tosca.provider_operations)
+        relationship = 'test_relationship_hosted_on' + SEPARATOR
+        self.assertEqual(graph[relationship + 'pre_configure_target'], {'tosca_server_example_server:create'})
+        self.assertIn(relationship + 'pre_configure_target', graph['tosca_server_example_server:configure'])
+        self.assertEqual(graph[relationship + 'post_configure_target'], {'tosca_server_example_server:configure'})
+        self.assertIn(relationship + 'post_configure_target', graph['service_1_server_example:create'])
+        self.assertIn(relationship + 'post_configure_target', graph['tosca_server_example_floating_ip:create'])
+        # NOTE: add_source and pre_configure_source are executed in parallel
+        self.assertEqual(graph[relationship + 'add_source'], {'service_1_server_example:create'})
+        self.assertEqual(graph[relationship + 'pre_configure_source'], {'service_1_server_example:create'})
+        self.assertEqual(graph['service_1_server_example:configure'],
+                         {'service_1_server_example:create', relationship + 'add_source',
+                          relationship + 'pre_configure_source'})
+        reversed_graph = get_operations_graph(tosca.reversed_provider_operations)
+        for operation, dependencies in graph.items():
+            for dependency in dependencies:
+                self.assertIn(operation, reversed_graph[dependency])
+
+    def test_operations_share_resource(self):
+        with open(os.path.join('testing', 'examples', 'test_relationships_interfaces_operations_openstack.yaml')) as f:
+            tosca = self.get_tosca_template(yaml.load(f, Loader=yaml.Loader))
+        operations = {(templ.name, templ.operation): templ for templ in tosca.provider_operations}
+        create = operations[('tosca_server_example_server', 'create')]
+        configure = operations[('tosca_server_example_server', 'configure')]
+        resource = tosca.provider_nodes['tosca_server_example_server']
+        self.assertIs(create.resource, resource)
+        self.assertIs(configure.resource, resource)
+        self.assertEqual(list(create.tmpl[INTERFACES]['Standard']), ['create'])
+        self.assertEqual(list(configure.tmpl[INTERFACES]['Standard']), ['configure'])
+        self.assertEqual(set(resource.tmpl[INTERFACES]['Standard']), {'create', 'configure'})
+        self.assertIs(configure.tmpl[PROPERTIES], resource.tmpl[PROPERTIES])
+        self.assertIs(configure.configuration_args, resource.configuration_args)
+        configure.host = 'other'
+        self.assertEqual(create.host, resource.host)
+        relationship = operations[('test_relationship_hosted_on', 'add_source')]
+        self.assertEqual(list(relationship.tmpl[INTERFACES]['Configure']), ['add_source'])
+        self.assertEqual(relationship.source, 'service_1_server_example')
+
+    def test_arguments_of_shared_template_are_not_replaced(self):
+        tool = AnsibleConfigurationTool('openstack')
+        tool.cluster_name = 'test'
+        args = ['SELF', 'id']
+        with mock.patch('configuration_tool.configuration_tools.ansible.configuration_tool.'
+                        'get_actual_state_of_instance_model', return_value={'type': 'openstack.nodes.Server'}):
+            self.assertEqual(tool._resolve_tosca_travers(args, 'tosca_server_example_server'),
+                             ['tosca_server_example_server', 'id'])
+        self.assertEqual(args, ['SELF', 'id'])
+
+    def test_requirement_definitions_are_shared(self):
+        node_templates = {'network': {'type': 'openstack.nodes.Network', 'properties': {'name': 'network'}}}
+        for i in range(2):
+            node_templates['port_%s' % i] = {'type': 'openstack.nodes.Port', 'properties': {'name': str(i)},
+                                             'requirements': [{'network': {'node': 'network'}}]}
+        tosca = self.get_tosca_template({'tosca_definitions_version': 'tosca_simple_yaml_1_0',
+                                         'topology_template': {'node_templates': node_templates}})
+        first = tosca.provider_nodes['port_0'].requirements['network']
+        second = tosca.provider_nodes['port_1'].requirements['network']
+        self.assertIs(first.definition, second.definition)
+        self.assertEqual(first.get_value(), 'network')
+        for obj in (tosca.provider_nodes['port_0'], first, next(iter(tosca.provider_operations))):
+            self.assertFalse(hasattr(obj, '__dict__'))
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from configuration_tool.common import utils
+from configuration_tool.common.translator_to_configuration_dsl import translate
+from configuration_tool.common.validation_cache import ValidationCache
+
+
+class TestValidationCache(unittest.TestCase):
+
+    def test_key_does_not_depend_on_order(self):
+        cache = ValidationCache()
+        first = cache.get_key({'a': 1, 'b': {'c': 2, 'd': 3}}, [])
+        second = cache.get_key({'b': {'d': 3, 'c': 2}, 'a': 1}, [])
+        self.assertEqual(first, second)
+
+    def test_key_of_missing_import(self):
+        cache = ValidationCache()
+        self.assertIsNone(cache.get_key({'a': 1}, ['/nonexistent/definitions.yaml']))
+
+    def test_key_depends_on_nested_imports(self):
+        directory = tempfile.mkdtemp()
+        try:
+            nested = os.path.join(directory, 'nested.yaml')
+            imported = os.path.join(directory, 'imported.yaml')
+            with open(nested, 'w') as f:
+                f.write('node_types: {}\n')
+            with open(imported, 'w') as f:
+                f.write('imports:\n- nested: nested.yaml\n')
+            cache = ValidationCache()
+            first = cache.get_key({'a': 1}, [imported])
+            with open(nested, 'w') as f:
+                f.write('node_types:\n  test.nodes.Test: {}\n')
+            self.assertNotEqual(cache.get_key({'a': 1}, [imported]), first)
+            with open(imported, 'w') as f:
+                f.write('imports:\n- http://example.com/definitions.yaml\n')
+            self.assertIsNone(cache.get_key({'a': 1}, [imported]))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_outcomes_and_counters(self):
+        cache = ValidationCache()
+        cache.put('valid')
+        cache.put('invalid', 'InvalidTypeError')
+        self.assertEqual(cache.get('valid'), (True, None))
+        self.assertEqual(cache.get('invalid'), (True, 'InvalidTypeError'))
+        self.assertEqual(cache.get('unknown'), (False, None))
+        stats = cache.get_stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 2)
+
+    def test_lru_eviction_by_entries(self):
+        cache = ValidationCache(max_entries=2)
+        cache.put('first')
+        cache.put('second')
+        cache.get('first')
+        cache.put('third')
+        self.assertTrue(cache.get('first')[0])
+        self.assertFalse(cache.get('second')[0])
+        self.assertTrue(cache.get('third')[0])
+
+    def test_eviction_by_memory(self):
+        cache = ValidationCache(max_memory=4096)
+        cache.put('first', 'e' * 2000)
+        cache.put('second', 'e' * 2000)
+        self.assertFalse(cache.get('first')[0])
+        self.assertTrue(cache.get('second')[0])
+        self.assertLessEqual(cache.get_stats()['memory'], 4096)
+
+
+class TestDatabaseTemplate(unittest.TestCase):
+
+    def test_translate_with_database(self):
+        loaded = []
+
+        def post(url, files):
+            loaded.append(yaml.safe_load(files['file'][1].read()))
+            return mock.Mock(**{'json.return_value': {'status': 200}})
+
+        with open(os.path.join('testing', 'examples', 'test_server_name_openstack.yaml')) as f:
+            template = f.read()
+        get_response = mock.Mock(**{'json.return_value': {'status': 200, 'result': {}}})
+        with mock.patch('requests.get', return_value=get_response), mock.patch('requests.post', side_effect=post):
+            msg = translate(template, True, 'ansible', 'test', database_api_endpoint='http://database')
+        self.assertIn('successfully passed validation', msg)
+        self.assertEqual(len(loaded), 1)
+        self.assertNotIn('imports', loaded[0])
+
+    def test_database_error(self):
+        with open(os.path.join('testing', 'examples', 'test_server_name_openstack.yaml')) as f:
+            template = f.read()
+        get_response = mock.Mock(**{'json.return_value': {'status': 200, 'result': {}}})
+        with mock.patch('requests.get', return_value=get_response), \
+                mock.patch('requests.post', side_effect=ConnectionError('database is unavailable')):
+            with self.assertRaisesRegex(ConnectionError, 'database is unavailable'):
+                translate(template, True, 'ansible', 'test', database_api_endpoint='http://database')
+        self.assertEqual([x for x in os.listdir(utils.get_tmp_clouni_dir()) if x.startswith('template_')], [])